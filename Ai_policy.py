@@ -0,0 +1,103 @@
+# ai_policy.py
+import random
+import time
+from Constants import *
+
+# ======================================================================================
+# --- AI POLICIES ---
+# ======================================================================================
+# Uma política decide para onde a IA quer levar o centro do jogador; AI.move só anda
+# até lá com a velocidade da dificuldade. Cada decisão é cronometrada e comparada com
+# AI_MOVE_BUDGET_US, para saber se uma política cabe no frame do jogo com janela.
+class Policy:
+    name = None
+    STATE_FIELDS = ()  # Estado que muda a decisão (entra no snapshot da partida, ver Entities)
+    STATE_FORMAT = ""
+
+    def __init__(self, difficulty="Hard", rng=random, budget_us=AI_MOVE_BUDGET_US):
+        self.difficulty = difficulty
+        self.rng = rng  # Sorteios da política (o jogo passa um gerador com a seed da partida)
+        self.budget_ns = budget_us * 1000
+        self.decisions = 0
+        self.total_ns = 0
+        self.worst_ns = 0
+        self.over_budget = 0
+
+    def target_y(self, paddle, ball):
+        """y que a IA quer alcançar com o centro do jogador neste tick."""
+        start = time.perf_counter_ns()
+        target = self.decide(paddle, ball)
+        elapsed = time.perf_counter_ns() - start
+        self.decisions += 1
+        self.total_ns += elapsed
+        if elapsed > self.worst_ns: self.worst_ns = elapsed
+        if elapsed > self.budget_ns: self.over_budget += 1
+        return target
+
+    def decide(self, paddle, ball):
+        raise NotImplementedError
+
+    def stats(self):
+        """Custo das decisões até aqui, em microssegundos."""
+        return {"policy": self.name, "decisions": self.decisions,
+                "mean_us": round(self.total_ns / self.decisions / 1000, 3) if self.decisions else None,
+                "worst_us": round(self.worst_ns / 1000, 3), "over_budget": self.over_budget}
+
+class ChasePolicy(Policy):
+    """Segue a altura atual da bola (a IA original; é a que o simulador em lote reproduz)."""
+    name = "chase"
+
+    def decide(self, paddle, ball):
+        return ball.y + ball.height / 2
+
+class PredictivePolicy(Policy):
+    """
+    Vai direto ao ponto onde a bola vai cruzar a frente do jogador, com os quiques nas
+    paredes resolvidos de forma analítica (a trajetória é "desdobrada" e dobrada de
+    volta no campo). Com a bola indo para o outro lado, volta para o meio.
+    A previsão só é refeita quando a velocidade da bola muda: um quique na parede só
+    troca o sinal de velocity_y e não muda o ponto de chegada. Para não ser imbatível,
+    cada previsão erra por até AI_PREDICTION_ERROR[dificuldade] pixels.
+    """
+    name = "predictive"
+    STATE_FIELDS = ("velocity_x", "velocity_y", "prediction")
+    STATE_FORMAT = "3d"
+
+    def __init__(self, difficulty="Hard", rng=random, budget_us=AI_MOVE_BUDGET_US):
+        super().__init__(difficulty, rng, budget_us)
+        self.error = AI_PREDICTION_ERROR[difficulty]
+        # Velocidade (x, |y|) da última previsão; velocity_x = 0 quando não há previsão
+        self.velocity_x = self.velocity_y = 0.0
+        self.prediction = WINDOW_HEIGHT / 2
+
+    def decide(self, paddle, ball):
+        velocity_x = ball.velocity_x
+        if (velocity_x > 0) != (paddle.side == "right") or velocity_x == 0:
+            self.velocity_x = 0.0
+            return WINDOW_HEIGHT / 2
+
+        velocity_y = abs(ball.velocity_y)
+        if velocity_x != self.velocity_x or velocity_y != self.velocity_y:
+            self.velocity_x, self.velocity_y = velocity_x, velocity_y
+            self.prediction = self._intercept(paddle, ball)
+        return self.prediction
+
+    def _intercept(self, paddle, ball):
+        if paddle.side == "right": face_x = paddle.x - ball.width
+        else: face_x = paddle.x + paddle.original_width
+        time_to_face = (face_x - ball.x) / ball.velocity_x
+        if time_to_face < 0:
+            # A bola já passou da frente do jogador: não há o que prever
+            self.velocity_x = 0.0
+            return ball.y + ball.height / 2
+
+        # Desdobrada, a bola anda em linha reta; o campo se repete espelhado a cada 2 * span
+        span = WINDOW_HEIGHT - ball.height
+        y = (ball.y + ball.velocity_y * time_to_face) % (2 * span)
+        if y > span: y = 2 * span - y
+        return y + ball.height / 2 + self.rng.uniform(-self.error, self.error)
+
+POLICIES = {policy.name: policy for policy in (ChasePolicy, PredictivePolicy)}
+
+def create_policy(name, difficulty="Hard", rng=random):
+    return POLICIES[name](difficulty, rng)
@@ -0,0 +1,321 @@
+# asset_loader.py
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from PPlay import subsystems
+from Constants import *
+
+# ======================================================================================
+# --- ASSET BUNDLE (COMPILE + RUNTIME LOADER) ---
+# ======================================================================================
+# "python Asset_loader.py" decodifica as imagens de Assets/ uma vez, já no tamanho em que
+# o jogo usa (placar, power-ups, sombras, bandeiras...), e grava os pixels crus num único
+# arquivo com um manifesto. Em tempo de execução o arquivo é mapeado em memória (mmap) e
+# as superfícies saem direto dele, sem decodificar PNG/GIF. Se uma imagem original for
+# mais nova que o pacote (ou não estiver nele), ela é carregada do arquivo de origem.
+MANIFEST_VERSION = 1
+
+def scaled_size_for_height(size, height):
+    """Tamanho de uma imagem redimensionada para a altura dada, mantendo a proporção."""
+    width, source_height = size
+    return (int(height * (width / source_height)), height)
+
+def _key(path, size=None):
+    path = os.path.normpath(path)
+    return f"{path}|{size[0]}x{size[1]}" if size else f"{path}|original"
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+# --------------------------------------------------------------------------------------
+# Compilação
+# --------------------------------------------------------------------------------------
+def asset_specs():
+    """(caminho, tamanho final ou None, tem transparência) de cada imagem usada pelo jogo."""
+    specs = [(BACKGROUND_IMAGE, None, False), (MENU_BACKGROUND_IMAGE, None, False),
+             (SCOREBOARD_IMAGE, SCOREBOARD_SIZE, True), (BALL_IMAGE, None, True)]
+    for powerup_image in (BOOST_IMAGE, SLOW_BALL_IMAGE):
+        specs += [(powerup_image, None, True), (powerup_image, POWERUP_SIZE, True)]
+
+    # As sombras dependem do tamanho de quem as projeta
+    shadow_sizes = set()
+    ball_width = pygame.image.load(BALL_IMAGE).get_width()
+    shadow_sizes.add(int(ball_width * BALL_SHADOW_SCALE))
+    for char in CHARACTERS:
+        specs.append((char["image_path"], None, True))
+        shadow_sizes.add(int(pygame.image.load(char["image_path"]).get_width() * PADDLE_SHADOW_SCALE))
+        flag_size = pygame.image.load(char["flag_path"]).get_size()
+        specs.append((char["flag_path"], None, True))
+        for height in (HUD_FLAG_HEIGHT, GAME_OVER_FLAG_HEIGHT):
+            specs.append((char["flag_path"], scaled_size_for_height(flag_size, height), True))
+    for shadow_size in sorted(shadow_sizes):
+        specs.append((SHADOW_IMAGE, (shadow_size, shadow_size), True))
+    return specs
+
+def compile_assets(bundle_file=ASSET_BUNDLE_FILE, manifest_file=ASSET_MANIFEST_FILE):
+    """Gera o pacote e o manifesto; devolve o manifesto."""
+    os.makedirs(os.path.dirname(bundle_file), exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "sources": {}, "images": {}, "animations": {}}
+    offset = 0
+    with open(bundle_file + ".tmp", "wb") as bundle:
+        def write_pixels(source, surface, alpha):
+            nonlocal offset
+            pixel_format = "RGBA" if alpha else "RGB"
+            data = pygame.image.tostring(surface, pixel_format)
+            bundle.write(data)
+            entry = {"offset": offset, "length": len(data), "size": list(surface.get_size()),
+                     "format": pixel_format, "source": os.path.normpath(source)}
+            offset += len(data)
+            manifest["sources"][entry["source"]] = _source_stamp(source)
+            return entry
+
+        decoded = {}
+        for path, size, alpha in asset_specs():
+            if path not in decoded: decoded[path] = pygame.image.load(path)
+            surface = decoded[path]
+            if size: surface = pygame.transform.scale(surface, size)
+            manifest["images"][_key(path, size)] = write_pixels(path, surface, alpha)
+
+        try:
+            from PIL import Image
+            with Image.open(GOAL_ANIMATION_GIF) as img:
+                frames = []
+                for i in range(img.n_frames):
+                    img.seek(i)
+                    frame = img.copy().convert("RGBA")
+                    surface = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+                    frames.append(write_pixels(GOAL_ANIMATION_GIF, surface, True))
+            manifest["animations"][os.path.normpath(GOAL_ANIMATION_GIF)] = frames
+        except ImportError:
+            print("WARNING: Pillow not installed, the goal GIF was not compiled.")
+
+    # Troca atômica: um jogo abrindo o pacote nunca vê um arquivo pela metade
+    os.replace(bundle_file + ".tmp", bundle_file)
+    with open(manifest_file + ".tmp", "w") as output:
+        json.dump(manifest, output, indent=1)
+    os.replace(manifest_file + ".tmp", manifest_file)
+    return manifest
+
+# --------------------------------------------------------------------------------------
+# Carregamento
+# --------------------------------------------------------------------------------------
+class AssetBundle:
+    """O pacote compilado, mapeado em memória. Só entrega imagens cujas origens não mudaram."""
+    def __init__(self, bundle_file=ASSET_BUNDLE_FILE, manifest_file=ASSET_MANIFEST_FILE):
+        self.images = {}
+        self.animations = {}
+        self.data = None
+        self.stale_sources = set()
+        try:
+            with open(manifest_file) as manifest_input:
+                manifest = json.load(manifest_input)
+            if manifest.get("version") != MANIFEST_VERSION: return
+            with open(bundle_file, "rb") as bundle:
+                self.data = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        self.images = manifest["images"]
+        self.animations = manifest["animations"]
+        for source, stamp in manifest["sources"].items():
+            try:
+                if _source_stamp(source) != stamp: self.stale_sources.add(source)
+            except OSError:
+                self.stale_sources.add(source)
+        if self.stale_sources:
+            print(f"WARNING: Asset bundle is stale for {len(self.stale_sources)} file(s), "
+                  "loading them from the original files. Run 'python Asset_loader.py' to rebuild it.")
+
+    def _usable(self, entry):
+        return entry is not None and self.data is not None and entry["source"] not in self.stale_sources
+
+    def _raw_surface(self, entry):
+        # Aponta direto para o mmap; quem usar converte (convert copia os pixels)
+        data = memoryview(self.data)[entry["offset"]:entry["offset"] + entry["length"]]
+        return pygame.image.frombuffer(data, entry["size"], entry["format"])
+
+    def image(self, path, size=None):
+        """Superfície ainda não convertida para a tela, ou None se não estiver no pacote."""
+        entry = self.images.get(_key(path, size))
+        return self._raw_surface(entry) if self._usable(entry) else None
+
+    def image_size(self, path):
+        entry = self.images.get(_key(path))
+        return tuple(entry["size"]) if self._usable(entry) else None
+
+    def animation(self, path):
+        frames = self.animations.get(os.path.normpath(path))
+        if not frames or not all(self._usable(frame) for frame in frames): return None
+        return [self._raw_surface(frame) for frame in frames]
+
+_bundle = None
+_images = {}
+use_bundle = USE_ASSET_BUNDLE  # False força o carregamento dos arquivos originais
+
+def get_bundle():
+    """O pacote aberto no primeiro uso, ou None com use_bundle = False."""
+    global _bundle
+    if not use_bundle: return None
+    if _bundle is None: _bundle = AssetBundle()
+    return _bundle
+
+def decode_image(path, size=None):
+    """
+    Decodifica a imagem no tamanho dado, sem converter para o formato da tela.
+    Pode rodar fora da thread principal (o pacote precisa ter sido aberto antes).
+    """
+    bundle = get_bundle()
+    surface = bundle.image(path, size) if bundle else None
+    if surface is None:
+        surface = pygame.image.load(path)
+        if size: surface = pygame.transform.scale(surface, size)
+    return surface
+
+def decode_animation(path):
+    """Decodifica os quadros do GIF animado, sem convertê-los. Lança ImportError sem o Pillow."""
+    bundle = get_bundle()
+    frames = bundle.animation(path) if bundle else None
+    if frames is not None: return frames
+    from PIL import Image
+    frames = []
+    with Image.open(path) as img:
+        for i in range(img.n_frames):
+            img.seek(i)
+            frame = img.copy().convert("RGBA")
+            frames.append(pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode))
+    return frames
+
+def store_image(path, size, alpha, surface):
+    """Converte uma imagem decodificada para o formato da tela e a guarda no cache de load_image."""
+    surface = surface.convert_alpha() if alpha else surface.convert()
+    _images[(path, size and tuple(size), alpha)] = surface
+    return surface
+
+def load_image(path, size=None, alpha=True):
+    """
+    Superfície (já convertida para a tela) da imagem no tamanho dado, vinda do pacote ou,
+    se preciso, do arquivo original. O resultado é compartilhado: quem for alterá-lo
+    deve trabalhar numa cópia. Lança pygame.error/FileNotFoundError se a imagem não existir.
+    """
+    surface = _images.get((path, size and tuple(size), alpha))
+    if surface is None:
+        surface = store_image(path, size, alpha, decode_image(path, size))
+    return surface
+
+def image_size(path):
+    """Tamanho original da imagem, sem decodificá-la quando o pacote está em dia."""
+    bundle = get_bundle()
+    return (bundle and bundle.image_size(path)) or pygame.image.load(path).get_size()
+
+def load_animation_frames(path):
+    """Quadros do GIF animado, ou None se não for possível carregá-los."""
+    try:
+        return [frame.convert_alpha() for frame in decode_animation(path)]
+    except (ImportError, FileNotFoundError) as e:
+        print(f"WARNING: Could not load goal GIF. Pillow not installed or file not found. Error: {e}")
+        return None
+
+class BackgroundLoader:
+    """
+    Carrega assets em segundo plano: a decodificação roda num pool de threads e a
+    conversão para o formato da tela (que precisa da thread principal) acontece em
+    poll(), chamado a cada frame, ou em wait(), quando um grupo é necessário já.
+    Cada pedido pertence a um grupo (ex.: "menu", "match") e termina chamando
+    callback(resultado) na thread principal, na ordem em que foi feito; se o
+    arquivo não puder ser carregado, o resultado é None.
+    """
+    def __init__(self, workers=ASSET_LOADER_WORKERS):
+        get_bundle()  # abre o pacote antes que as threads o usem
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.queue = deque()  # (grupo, future ou None, finish)
+        self.totals = {}
+        self.finished = {}
+
+    def _submit(self, group, decode, finish):
+        future = self.executor.submit(decode) if decode else None
+        self.queue.append((group, future, finish))
+        self.totals[group] = self.totals.get(group, 0) + 1
+        self.finished.setdefault(group, 0)
+
+    def load_image(self, group, path, callback, size=None, alpha=True):
+        def finish(surface):
+            callback(None if surface is None else store_image(path, size, alpha, surface))
+        self._submit(group, lambda: decode_image(path, size), finish)
+
+    def load_animation(self, group, path, callback):
+        def finish(frames):
+            callback(None if frames is None else [frame.convert_alpha() for frame in frames])
+        self._submit(group, lambda: decode_animation(path), finish)
+
+    def load_sound(self, group, path, callback):
+        # O mixer só é ligado quando o primeiro som é pedido (e na thread principal)
+        if not subsystems.init_mixer():
+            self._submit(group, None, lambda result: callback(None))
+            return
+        self._submit(group, lambda: pygame.mixer.Sound(path), callback)
+
+    def call(self, group, function):
+        """Roda function() na thread principal, depois de tudo o que foi pedido antes."""
+        self._submit(group, None, lambda result: function())
+
+    def _finish_next(self):
+        group, future, finish = self.queue.popleft()
+        try:
+            result = future.result() if future else None
+        except (pygame.error, OSError, ImportError) as e:
+            print(f"WARNING: Could not load an asset in the background. Error: {e}")
+            result = None
+        finish(result)
+        self.finished[group] += 1
+
+    def poll(self, budget=ASSET_LOADER_FRAME_BUDGET):
+        """Termina os pedidos prontos, em ordem, por até budget segundos."""
+        deadline = time.perf_counter() + budget
+        while self.queue and (self.queue[0][1] is None or self.queue[0][1].done()):
+            self._finish_next()
+            if time.perf_counter() >= deadline: break
+
+    def wait(self, group=None):
+        """Termina agora (bloqueando) tudo o que falta do grupo (ou de todos)."""
+        while not self.is_done(group): self._finish_next()
+
+    def is_done(self, group=None):
+        if group is None: return not self.queue
+        return self.finished.get(group, 0) >= self.totals.get(group, 0)
+
+    def progress(self, group=None):
+        total = sum(self.totals.values()) if group is None else self.totals.get(group, 0)
+        finished = sum(self.finished.values()) if group is None else self.finished.get(group, 0)
+        return finished / total if total else 1.0
+
+# ======================================================================================
+# --- COMMAND LINE ---
+# ======================================================================================
+def main(argv=None):
+    import argparse  # Só a linha de comando usa; o jogo não paga por ele
+    parser = argparse.ArgumentParser(description="Compila as imagens de Assets/ num pacote de pixels crus")
+    parser.add_argument("--check", action="store_true", help="só informa se o pacote existe e está em dia")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        bundle = AssetBundle()
+        if bundle.data is None:
+            print("Pacote não encontrado.")
+            return 1
+        print(f"{len(bundle.images)} imagens, {len(bundle.stale_sources)} origem(ns) desatualizada(s).")
+        return 1 if bundle.stale_sources else 0
+
+    start = time.perf_counter()
+    manifest = compile_assets()
+    frames = sum(len(frames) for frames in manifest["animations"].values())
+    print(f"{len(manifest['images'])} imagens e {frames} quadros de animação em {ASSET_BUNDLE_FILE} "
+          f"({os.path.getsize(ASSET_BUNDLE_FILE) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
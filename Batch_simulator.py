@@ -0,0 +1,428 @@
+# batch_simulator.py
+import math
+import numpy as np
+from Constants import *
+from Asset_loader import image_size
+from Broadphase import swept_aabb, wall_contact
+
+# ======================================================================================
+# --- BATCHED SIMULATION (NUMPY) ---
+# ======================================================================================
+# Estados de cada partida no lote (equivalentes a GameState.PLAYING/GOAL/GAME_OVER)
+PLAYING, GOAL, GAME_OVER = 0, 1, 2
+# Tipos de power-up no lote (índices de POWERUP_TYPES)
+POWERUP_TYPES = ("SPEED_BOOST", "SLOW_BALL")
+SPEED_BOOST, SLOW_BALL = 0, 1
+
+def load_entity_sizes():
+    """Lê o tamanho (largura, altura) da bola e de cada personagem (do manifesto, se em dia)."""
+    ball_size = image_size(BALL_IMAGE)
+    character_sizes = [image_size(char["image_path"]) for char in CHARACTERS]
+    return ball_size, character_sizes
+
+def bounce_off_paddle(bounce, x, y, vx, vy, ball_w, ball_h, px, py, pw, ph):
+    """Ball._bounce_off_paddle em colunas: devolve (x, vx, vy), alterados só onde bounce."""
+    current_speed = np.sqrt(vx**2 + vy**2)
+    new_x = np.where(vx < 0, px + pw, px - ball_w)
+    new_vx = vx * -1
+    offset = (y + ball_h / 2) - (py + ph / 2)
+    normalized_offset = offset / (ph / 2)
+    new_vy = current_speed * normalized_offset * BALL_DEFLECTION_FACTOR
+    new_magnitude = np.sqrt(new_vx**2 + new_vy**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        renormalize = new_magnitude > 0
+        new_vx = np.where(renormalize, new_vx / new_magnitude * current_speed, new_vx)
+        new_vy = np.where(renormalize, new_vy / new_magnitude * current_speed, new_vy)
+    return np.where(bounce, new_x, x), np.where(bounce, new_vx, vx), np.where(bounce, new_vy, vy)
+
+class BatchSimulator:
+    """
+    Simula N partidas IA vs IA ao mesmo tempo, com cada grandeza guardada
+    como uma coluna numpy. As regras espelham Ball.move (com a colisão
+    contínua contra paredes e jogadores), AI.move, PowerUp.apply_effect e
+    Game.update/_update_powerups, um tick de SIM_DELTA_TIME por step().
+    """
+    def __init__(self, n, p1_char_index=0, p2_char_index=1, p1_difficulty="Hard", p2_difficulty="Hard",
+                 seed=None, entity_sizes=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        (ball_w, ball_h), character_sizes = entity_sizes or load_entity_sizes()
+        self.ball_w, self.ball_h = float(ball_w), float(ball_h)
+
+        # Personagens e dificuldades podem ser um valor só ou um por partida
+        sizes = np.array(character_sizes, dtype=np.float64)
+        p1_chars = np.broadcast_to(np.asarray(p1_char_index), (n,))
+        p2_chars = np.broadcast_to(np.asarray(p2_char_index), (n,))
+        self.p1_w, self.p1_h = sizes[p1_chars, 0], sizes[p1_chars, 1]
+        self.p2_w, self.p2_h = sizes[p2_chars, 0], sizes[p2_chars, 1]
+        self.p1_x = np.full(n, float(PLAYER_OFFSET_X))
+        self.p2_x = WINDOW_WIDTH - self.p2_w - PLAYER_OFFSET_X
+        self.p1_factor = self._difficulty_column(p1_difficulty)
+        self.p2_factor = self._difficulty_column(p2_difficulty)
+
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.ball_vx = np.zeros(n)
+        self.ball_vy = np.zeros(n)
+        self.p1_y = np.zeros(n)
+        self.p2_y = np.zeros(n)
+
+        self.state = np.zeros(n, dtype=np.int8)
+        self.score_left = np.zeros(n, dtype=np.int32)
+        self.score_right = np.zeros(n, dtype=np.int32)
+        self.serve_direction = np.ones(n)  # 1 = bola sai para a direita (last_scorer == "right")
+        self.match_time = np.zeros(n)
+        self.goal_pause_timer = np.zeros(n)
+        self.hits = np.zeros(n, dtype=np.int32)
+
+        self.powerup_active = np.zeros(n, dtype=bool)
+        self.powerup_type = np.zeros(n, dtype=np.int8)
+        self.powerup_x = np.zeros(n)
+        self.powerup_y = np.zeros(n)
+        self.powerup_spawn_timer = np.zeros(n)
+        self.powerup_on_screen_timer = np.zeros(n)
+        self.path = []
+        self.reset()
+
+    def _difficulty_column(self, difficulty):
+        if isinstance(difficulty, str):
+            return np.full(self.n, DIFFICULTY_SETTINGS[difficulty])
+        return np.array([DIFFICULTY_SETTINGS[d] for d in difficulty], dtype=np.float64)
+
+    # ----------------------------------------------------------------------------------
+    # Reset (Game.reset_game / Game.reset_round)
+    # ----------------------------------------------------------------------------------
+    def reset(self):
+        self.state[:] = PLAYING
+        self.score_left[:] = 0
+        self.score_right[:] = 0
+        self.match_time[:] = 0
+        self.hits[:] = 0
+        self.powerup_active[:] = False
+        self.powerup_spawn_timer[:] = 0
+        self.powerup_on_screen_timer[:] = 0
+        self._reset_round(np.ones(self.n, dtype=bool))
+
+    def _reset_round(self, mask):
+        count = int(mask.sum())
+        if count == 0: return
+        angle = self.rng.uniform(-BALL_MAX_SERVE_ANGLE, BALL_MAX_SERVE_ANGLE, count)
+        self.ball_x[mask] = WINDOW_WIDTH / 2 - self.ball_w / 2
+        self.ball_y[mask] = WINDOW_HEIGHT / 2 - self.ball_h / 2
+        self.ball_vx[mask] = BALL_INITIAL_SPEED * np.cos(angle) * self.serve_direction[mask]
+        self.ball_vy[mask] = BALL_INITIAL_SPEED * np.sin(angle)
+        self.p1_y[mask] = (WINDOW_HEIGHT / 2) - (self.p1_h[mask] / 2)
+        self.p2_y[mask] = (WINDOW_HEIGHT / 2) - (self.p2_h[mask] / 2)
+        self.powerup_active[mask] = False
+
+    # ----------------------------------------------------------------------------------
+    # Tick
+    # ----------------------------------------------------------------------------------
+    def step(self, delta_time=SIM_DELTA_TIME):
+        playing = self.state == PLAYING
+        in_goal_pause = self.state == GOAL
+
+        # Pausa depois do gol: o tick que termina a pausa só recomeça a rodada
+        self.goal_pause_timer = np.where(in_goal_pause, self.goal_pause_timer - delta_time, self.goal_pause_timer)
+        resume = in_goal_pause & (self.goal_pause_timer <= 0)
+        self.state[resume] = PLAYING
+        self._reset_round(resume)
+
+        self.match_time = np.where(playing, self.match_time + delta_time, self.match_time)
+        self._move_ai(playing, delta_time)
+        scored = self._move_ball(playing, delta_time)
+        self._update_powerups(playing & ~scored, delta_time)
+
+    def run(self, max_ticks, delta_time=SIM_DELTA_TIME):
+        """Avança até todas as partidas acabarem ou max_ticks; retorna os ticks dados."""
+        for tick in range(max_ticks):
+            if self.finished(): return tick
+            self.step(delta_time)
+        return max_ticks
+
+    def finished(self):
+        return bool((self.state == GAME_OVER).all())
+
+    def _move_ai(self, playing, delta_time):
+        target_y = self.ball_y + self.ball_h / 2
+        for y, h, factor in ((self.p1_y, self.p1_h, self.p1_factor), (self.p2_y, self.p2_h, self.p2_factor)):
+            diff = target_y - (y + h / 2)
+            move_speed = PLAYER_INITIAL_SPEED * factor * delta_time
+            step = np.where(np.abs(diff) > AI_DEAD_ZONE, np.where(diff > 0, move_speed, -move_speed), 0.0)
+            moved = np.clip(y + step, 0, WINDOW_HEIGHT - h)
+            y[:] = np.where(playing, moved, y)
+
+    def _move_ball(self, playing, delta_time):
+        """Ball.move com colisão contínua: até BALL_MAX_CONTACTS_PER_TICK contatos por tick."""
+        bw, bh = self.ball_w, self.ball_h
+        remaining = np.full(self.n, delta_time)
+        hit_p1 = np.zeros(self.n, dtype=bool)
+        hit_p2 = np.zeros(self.n, dtype=bool)
+        # Só as partidas que ainda têm caminho a percorrer seguem para o próximo trecho
+        moving = np.flatnonzero(playing)
+        self.path = []  # (partidas, x, y, dx, dy) de cada trecho, para a coleta dos power-ups
+        for _ in range(BALL_MAX_CONTACTS_PER_TICK):
+            if moving.size == 0: break
+            x, y, vx, vy = self.ball_x[moving], self.ball_y[moving], self.ball_vx[moving], self.ball_vy[moving]
+            dx = vx * remaining[moving]
+            dy = vy * remaining[moving]
+            # Primeiro contato do trecho: 0 = parede, 1 e 2 = jogadores. Empates ficam
+            # com a parede, depois com o jogador 1 (mesma ordem de Ball.move)
+            contact = wall_contact(y, dy, bh)
+            obstacle = np.zeros(moving.size, dtype=np.int8)
+            paddles = ((1, hit_p1, self.p1_x[moving], self.p1_y[moving], self.p1_w[moving], self.p1_h[moving]),
+                       (2, hit_p2, self.p2_x[moving], self.p2_y[moving], self.p2_w[moving], self.p2_h[moving]))
+            for number, hit, px, py, pw, ph in paddles:
+                paddle_time = np.where(hit[moving], np.inf, swept_aabb(x, y, bw, bh, dx, dy, px, py, pw, ph))
+                first = paddle_time < contact
+                contact = np.where(first, paddle_time, contact)
+                obstacle[first] = number
+
+            touching = contact != np.inf
+            t = np.where(touching, contact, 1.0)
+            self.path.append((moving, x, y, dx * t, dy * t))
+            x = x + dx * t
+            y = y + dy * t
+            remaining[moving] = np.where(touching, remaining[moving] * (1 - contact), remaining[moving])
+
+            wall = touching & (obstacle == 0)
+            y = np.where(wall, np.where(vy < 0, 0.0, WINDOW_HEIGHT - bh), y)
+            vy = np.where(wall, -vy, vy)
+            for number, hit, px, py, pw, ph in paddles:
+                bounce = touching & (obstacle == number)
+                if bounce.any():
+                    x, vx, vy = bounce_off_paddle(bounce, x, y, vx, vy, bw, bh, px, py, pw, ph)
+                    hit[moving] |= bounce
+            self.ball_x[moving], self.ball_y[moving], self.ball_vx[moving], self.ball_vy[moving] = x, y, vx, vy
+            moving = moving[touching]
+
+        self.hits += hit_p1 | hit_p2
+
+        # Bola saiu pela esquerda: gol do lado direito (e vice-versa)
+        goal_right = playing & (self.ball_x + self.ball_w < 0)
+        goal_left = playing & (self.ball_x > WINDOW_WIDTH) & ~goal_right
+        self.score_left += goal_left
+        self.score_right += goal_right
+        # Quem sofreu o gol sai com a bola: gol da esquerda → last_scorer "right" → direção 1
+        self.serve_direction = np.where(goal_left, 1.0, np.where(goal_right, -1.0, self.serve_direction))
+        scored = goal_left | goal_right
+        over = scored & ((self.score_left >= MAX_SCORE) | (self.score_right >= MAX_SCORE))
+        self.state[scored] = GOAL
+        self.state[over] = GAME_OVER
+        self.goal_pause_timer = np.where(scored & ~over, GOAL_PAUSE_DURATION, self.goal_pause_timer)
+        return scored
+
+    def _update_powerups(self, live, delta_time):
+        on_screen = live & self.powerup_active
+        self.powerup_on_screen_timer = np.where(on_screen, self.powerup_on_screen_timer + delta_time,
+                                                self.powerup_on_screen_timer)
+        expired = on_screen & (self.powerup_on_screen_timer >= POWERUP_ON_SCREEN_DURATION)
+        self.powerup_active &= ~expired
+        self.powerup_on_screen_timer[expired] = 0
+
+        waiting = live & ~on_screen
+        self.powerup_spawn_timer = np.where(waiting, self.powerup_spawn_timer + delta_time, self.powerup_spawn_timer)
+        spawn = waiting & (self.powerup_spawn_timer >= POWERUP_SPAWN_TIME)
+        count = int(spawn.sum())
+        if count:
+            self.powerup_spawn_timer[spawn] = 0
+            self.powerup_on_screen_timer[spawn] = 0
+            speed = np.sqrt(self.ball_vx[spawn]**2 + self.ball_vy[spawn]**2)
+            boosted = speed > BALL_INITIAL_SPEED * POWERUP_BOOSTED_THRESHOLD
+            slow_roll = self.rng.random(count) >= POWERUP_WEIGHTS["SPEED_BOOST"]
+            self.powerup_type[spawn] = np.where(boosted & slow_roll, SLOW_BALL, SPEED_BOOST)
+            pw, ph = POWERUP_SIZE
+            # Mesmos intervalos (inclusivos) de random.randint em PowerUp.spawn
+            self.powerup_x[spawn] = self.rng.integers(int(WINDOW_WIDTH * 0.25), int(WINDOW_WIDTH * 0.75) - pw, count, endpoint=True)
+            self.powerup_y[spawn] = self.rng.integers(int(WINDOW_HEIGHT * 0.1), int(WINDOW_HEIGHT * 0.9) - ph, count, endpoint=True)
+            self.powerup_active |= spawn
+
+        # A bola pega o power-up se passou por ele em qualquer trecho do tick (Ball.path_collided)
+        pw, ph = POWERUP_SIZE
+        touched = np.zeros(self.n, dtype=bool)
+        for moved, x, y, dx, dy in self.path:
+            hit = swept_aabb(x, y, self.ball_w, self.ball_h, dx, dy, self.powerup_x[moved], self.powerup_y[moved], pw, ph)
+            touched[moved[hit != np.inf]] = True
+        pickup = live & self.powerup_active & touched
+        if not pickup.any(): return
+        self.powerup_active &= ~pickup
+        self.powerup_on_screen_timer[pickup] = 0
+        vx, vy = self.ball_vx, self.ball_vy
+        magnitude = np.sqrt(vx**2 + vy**2)
+        boost = self.powerup_type == SPEED_BOOST
+        new_speed = np.where(boost, magnitude * POWERUP_SPEED_FACTOR,
+                             np.maximum(magnitude / POWERUP_SPEED_FACTOR, BALL_INITIAL_SPEED))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            apply = pickup & (magnitude != 0)
+            self.ball_vx = np.where(apply, vx / magnitude * new_speed, vx)
+            self.ball_vy = np.where(apply, vy / magnitude * new_speed, vy)
+
+    # ----------------------------------------------------------------------------------
+    # Ponte com as entidades escalares (usada na verificação de paridade)
+    # ----------------------------------------------------------------------------------
+    def load_from_game(self, i, game):
+        """Copia o estado de um Game (modo EVE) para a partida i do lote."""
+        ball, p1, p2 = game.ball, game.player1, game.player2
+        self.ball_x[i], self.ball_y[i] = ball.x, ball.y
+        self.ball_vx[i], self.ball_vy[i] = ball.velocity_x, ball.velocity_y
+        self.p1_y[i], self.p2_y[i] = p1.y, p2.y
+        self.state[i] = {GameState.PLAYING: PLAYING, GameState.GOAL: GOAL}.get(game.state, GAME_OVER)
+        self.score_left[i], self.score_right[i] = game.scores["left"], game.scores["right"]
+        self.serve_direction[i] = 1.0 if game.last_scorer == "right" else -1.0
+        self.match_time[i] = game.match_time
+        self.goal_pause_timer[i] = game.goal_pause_timer
+        powerup = game.active_powerup
+        self.powerup_active[i] = bool(powerup and powerup.is_active)
+        if powerup:
+            self.powerup_type[i] = POWERUP_TYPES.index(powerup.type)
+            self.powerup_x[i], self.powerup_y[i] = powerup.x, powerup.y
+        self.powerup_spawn_timer[i] = game.powerup_spawn_timer
+        self.powerup_on_screen_timer[i] = game.powerup_on_screen_timer
+
+    def diff_with_game(self, i, game, include_random=True, tolerance=1e-9):
+        """
+        Compara a partida i com um Game e devolve os campos divergentes.
+        include_random=False ignora o que depende de sorteio (saque da bola e
+        posição/tipo do power-up), para ticks em que algum dos lados sorteou.
+        """
+        ball, p1, p2 = game.ball, game.player1, game.player2
+        state = {GameState.PLAYING: PLAYING, GameState.GOAL: GOAL}.get(game.state, GAME_OVER)
+        powerup = game.active_powerup
+        expected = {
+            "state": (self.state[i], state),
+            "score_left": (self.score_left[i], game.scores["left"]),
+            "score_right": (self.score_right[i], game.scores["right"]),
+            "match_time": (self.match_time[i], game.match_time),
+            "goal_pause_timer": (self.goal_pause_timer[i], game.goal_pause_timer),
+            "p1_y": (self.p1_y[i], p1.y),
+            "p2_y": (self.p2_y[i], p2.y),
+            "powerup_spawn_timer": (self.powerup_spawn_timer[i], game.powerup_spawn_timer),
+            "powerup_on_screen_timer": (self.powerup_on_screen_timer[i], game.powerup_on_screen_timer),
+        }
+        if include_random:
+            expected.update({
+                "ball_x": (self.ball_x[i], ball.x), "ball_y": (self.ball_y[i], ball.y),
+                "ball_vx": (self.ball_vx[i], ball.velocity_x), "ball_vy": (self.ball_vy[i], ball.velocity_y),
+                "powerup_active": (self.powerup_active[i], bool(powerup and powerup.is_active)),
+            })
+            if powerup and powerup.is_active:
+                expected["powerup_x"] = (self.powerup_x[i], powerup.x)
+                expected["powerup_y"] = (self.powerup_y[i], powerup.y)
+        return {name: values for name, values in expected.items() if abs(float(values[0]) - float(values[1])) > tolerance}
+
+# ======================================================================================
+# --- PARITY CHECK ---
+# ======================================================================================
+def check_parity(cases=5000, seed=0, delta_time=SIM_DELTA_TIME):
+    """
+    Sorteia `cases` estados (bola perto dos jogadores, das paredes e dos gols,
+    power-ups prestes a surgir ou a serem pegos...), avança um tick em um Game
+    headless para cada um e um único tick no lote com todos eles, e devolve a
+    lista de (caso, campos divergentes). Precisa de um display (o dummy serve).
+    delta_time maior que SIM_DELTA_TIME testa passos longos (avanço rápido).
+    """
+    import random
+    from Game import Game
+    from Entities import AI
+
+    rng = random.Random(seed)
+    game = Game(headless=True)
+    game.start_headless_match(0, 1, "Hard", "Hard")
+    # Um jogador de cada lado por personagem, reaproveitados entre os casos
+    paddles = {}
+    for index, char in enumerate(CHARACTERS):
+        for side in ("left", "right"):
+            paddles[side, index] = AI(char["image_path"], side, game.window, PLAYER_INITIAL_SPEED, 1.0)
+    sizes = load_entity_sizes()
+    batch = BatchSimulator(cases, seed=seed, entity_sizes=sizes)
+    games_after, randomized = [], []
+
+    for i in range(cases):
+        p1_index, p2_index = rng.randrange(len(CHARACTERS)), rng.randrange(len(CHARACTERS))
+        p1_difficulty, p2_difficulty = rng.choice(list(DIFFICULTY_SETTINGS)), rng.choice(list(DIFFICULTY_SETTINGS))
+        game.player1, game.player2 = paddles["left", p1_index], paddles["right", p2_index]
+        game.player1.difficulty = DIFFICULTY_SETTINGS[p1_difficulty]
+        game.player2.difficulty = DIFFICULTY_SETTINGS[p2_difficulty]
+        _randomize_game_state(game, rng)
+        batch.p1_w[i], batch.p1_h[i] = sizes[1][p1_index]
+        batch.p2_w[i], batch.p2_h[i] = sizes[1][p2_index]
+        batch.p2_x[i] = WINDOW_WIDTH - batch.p2_w[i] - PLAYER_OFFSET_X
+        batch.p1_factor[i] = DIFFICULTY_SETTINGS[p1_difficulty]
+        batch.p2_factor[i] = DIFFICULTY_SETTINGS[p2_difficulty]
+        batch.load_from_game(i, game)
+
+        state_before, spawn_before = game.state, game.powerup_spawn_timer
+        game.update(delta_time)
+        resumed = state_before == GameState.GOAL and game.state == GameState.PLAYING
+        spawned = spawn_before > 0 and game.powerup_spawn_timer == 0
+        randomized.append(resumed or spawned)
+        games_after.append(_copy_match_state(game))
+
+    batch.step(delta_time)
+    failures = []
+    for i, snapshot in enumerate(games_after):
+        _restore_match_state(game, snapshot)
+        diff = batch.diff_with_game(i, game, include_random=not randomized[i])
+        if diff: failures.append((i, diff))
+    return failures
+
+def _randomize_game_state(game, rng):
+    ball, p1, p2 = game.ball, game.player1, game.player2
+    # Metade dos casos começa colada em um jogador, na parede ou na linha do gol
+    target = rng.choice(["free", "p1", "p2", "wall", "goal", "powerup"])
+    ball.x = rng.uniform(-ball.width, WINDOW_WIDTH)
+    ball.y = rng.uniform(0, WINDOW_HEIGHT - ball.height)
+    p1.y = rng.uniform(0, WINDOW_HEIGHT - p1.original_height)
+    p2.y = rng.uniform(0, WINDOW_HEIGHT - p2.original_height)
+    if target == "p1":
+        ball.x = p1.x + p1.width + rng.uniform(-8, 4)
+        ball.y = p1.y + rng.uniform(-ball.height, p1.height)
+    elif target == "p2":
+        ball.x = p2.x - ball.width + rng.uniform(-4, 8)
+        ball.y = p2.y + rng.uniform(-ball.height, p2.height)
+    elif target == "wall":
+        ball.y = rng.choice([rng.uniform(-2, 4), WINDOW_HEIGHT - ball.height + rng.uniform(-4, 2)])
+    elif target == "goal":
+        ball.x = rng.choice([-ball.width + rng.uniform(-4, 4), WINDOW_WIDTH + rng.uniform(-4, 4)])
+
+    # Inclui bolas rápidas o bastante para atravessar um jogador num tick sem a colisão contínua
+    speed = BALL_INITIAL_SPEED * rng.choice([1, 1, POWERUP_SPEED_FACTOR, POWERUP_SPEED_FACTOR ** 3, POWERUP_SPEED_FACTOR ** 10])
+    angle = rng.uniform(-math.pi, math.pi)
+    ball.velocity_x, ball.velocity_y = speed * math.cos(angle), speed * math.sin(angle)
+
+    game.state = rng.choice([GameState.PLAYING] * 4 + [GameState.GOAL])
+    game.goal_pause_timer = rng.choice([rng.uniform(0, GOAL_PAUSE_DURATION), SIM_DELTA_TIME / 2])
+    game.last_scorer = rng.choice(["left", "right"])
+    game.scores = {"left": rng.randrange(MAX_SCORE), "right": rng.randrange(MAX_SCORE)}
+    game.match_time = rng.uniform(0, 300)
+
+    game.powerup_spawn_timer = rng.choice([rng.uniform(0, POWERUP_SPAWN_TIME), POWERUP_SPAWN_TIME - SIM_DELTA_TIME / 2])
+    game.powerup_on_screen_timer = rng.choice([rng.uniform(0, POWERUP_ON_SCREEN_DURATION),
+                                               POWERUP_ON_SCREEN_DURATION - SIM_DELTA_TIME / 2])
+    game.active_powerup = rng.choice([None] + game.powerup_types)
+    if game.active_powerup:
+        game.active_powerup.is_active = rng.random() < 0.7
+        game.active_powerup.x = rng.uniform(WINDOW_WIDTH * 0.25, WINDOW_WIDTH * 0.75)
+        game.active_powerup.y = rng.uniform(WINDOW_HEIGHT * 0.1, WINDOW_HEIGHT * 0.9)
+        if target == "powerup":
+            ball.x = game.active_powerup.x + rng.uniform(-ball.width, game.active_powerup.width)
+            ball.y = game.active_powerup.y + rng.uniform(-ball.height, game.active_powerup.height)
+    for powerup in game.powerup_types:
+        if powerup is not game.active_powerup: powerup.is_active = False
+
+_MATCH_FIELDS = ("state", "match_time", "goal_pause_timer", "last_scorer",
+                 "powerup_spawn_timer", "powerup_on_screen_timer", "active_powerup")
+
+def _copy_match_state(game):
+    ball, p1, p2, powerup = game.ball, game.player1, game.player2, game.active_powerup
+    return ({name: getattr(game, name) for name in _MATCH_FIELDS}, dict(game.scores),
+            (ball.x, ball.y, ball.velocity_x, ball.velocity_y), p1.y, p2.y,
+            (powerup.is_active, powerup.x, powerup.y) if powerup else None)
+
+def _restore_match_state(game, snapshot):
+    fields, scores, ball, p1_y, p2_y, powerup = snapshot
+    for name, value in fields.items(): setattr(game, name, value)
+    game.scores = scores
+    game.ball.x, game.ball.y, game.ball.velocity_x, game.ball.velocity_y = ball
+    game.player1.y, game.player2.y = p1_y, p2_y
+    if powerup: game.active_powerup.is_active, game.active_powerup.x, game.active_powerup.y = powerup
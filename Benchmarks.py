@@ -0,0 +1,615 @@
+# benchmarks.py
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Os benchmarks rodam sem janela e sem som
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# ======================================================================================
+# --- BENCHMARKS ---
+# ======================================================================================
+# Cada benchmark recebe os argumentos da linha de comando e devolve o código de saída
+# (0 = ok, 1 = falhou), para poder ser usado como verificação automática.
+
+def bench_batch(args):
+    """Vazão do simulador em lote, em partidas-tick por segundo."""
+    from Batch_simulator import BatchSimulator
+
+    simulator = BatchSimulator(args.matches, seed=args.seed)
+    simulator.step()  # aquece o numpy antes de medir
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        simulator.step()
+    elapsed = time.perf_counter() - start
+
+    match_ticks_per_second = args.matches * args.ticks / elapsed
+    print(f"batch: {args.matches} partidas x {args.ticks} ticks em {elapsed:.3f}s "
+          f"= {match_ticks_per_second / 1e6:.2f}M partidas-tick/s")
+    if args.min_rate and match_ticks_per_second < args.min_rate:
+        print(f"FALHOU: abaixo do mínimo de {args.min_rate / 1e6:.2f}M partidas-tick/s")
+        return 1
+    return 0
+
+def bench_parity(args):
+    """Compara um tick do simulador em lote com as entidades escalares."""
+    from Batch_simulator import check_parity
+
+    start = time.perf_counter()
+    failures = check_parity(args.cases, args.seed, args.delta_time)
+    elapsed = time.perf_counter() - start
+    for case, diff in failures[:10]:
+        fields = ", ".join(f"{name}: lote={ours} escalar={theirs}" for name, (ours, theirs) in diff.items())
+        print(f"caso {case}: {fields}")
+    print(f"parity: {args.cases - len(failures)}/{args.cases} casos iguais ({elapsed:.1f}s)")
+    return 1 if failures else 0
+
+def bench_alloc(args):
+    """Conta as superfícies alocadas por frame em cada tela, depois do aquecimento."""
+    from Constants import GameState, GameMode, TRAIL_MAX_PARTICLES, TRAIL_LIFESPAN
+    from Game import Game
+    from PPlay.surfacepool import AllocationCounter
+
+    game = Game()
+    game.assets.wait()
+    game.game_mode = GameMode.PVE
+    game.difficulty = "Hard"
+    game.reset_game()
+    game.scores = {"left": 3, "right": 1}
+    for particle in range(TRAIL_MAX_PARTICLES):  # rastro cheio, em vários níveis de transparência
+        game.ball_trail.emit(100 + particle * 20, 200)
+        game.ball_trail.update(TRAIL_LIFESPAN / TRAIL_MAX_PARTICLES)
+    pool = game.window.get_surface_pool()
+    text_renderer = game.window.get_text_renderer()
+
+    # A primeira passada por todas as telas aquece os caches; a segunda é medida,
+    # com a simulação parada (só desenho) para que os frames sejam comparáveis.
+    failures = 0
+    for measured in (False, True):
+        for state in GameState:
+            game.state = state
+            pool_before, misses_before = pool.allocations, text_renderer.misses
+            with AllocationCounter() as counter:
+                for frame in range(args.frames):
+                    game.draw_frame(1 / 60, frame / args.frames)
+            allocations = counter.count + (pool.allocations - pool_before) + (text_renderer.misses - misses_before)
+            if not measured: continue
+            sources = dict(counter.sources, pool=pool.allocations - pool_before, text=text_renderer.misses - misses_before)
+            details = ", ".join(f"{name}={count}" for name, count in sources.items() if count)
+            print(f"{state.name:<20} {allocations / args.frames:6.2f} alocações/frame" + (f" ({details})" if details else ""))
+            if allocations: failures += 1
+
+    print(f"pool: {pool.stats()}")
+    if failures:
+        print(f"FALHOU: {failures} tela(s) alocam superfícies em regime")
+        return 1
+    return 0
+
+def bench_startup(args):
+    """Tempo de abertura até o primeiro frame, o menu e o fim do carregamento, com e sem o pacote de assets."""
+    if args.mode:
+        # Processo filho: mede uma abertura a frio, imports incluídos
+        start = time.perf_counter()
+        import Asset_loader
+        Asset_loader.use_bundle = args.mode == "bundle"
+        from Constants import GameState
+        from Game import Game
+        game = Game()
+        game.draw_frame(0, 0)
+        first_frame = time.perf_counter() - start
+        while game.state == GameState.LOADING:
+            game.update_loading()
+            game.draw_frame(0, 0)
+        game.draw_frame(0, 0)
+        main_menu = time.perf_counter() - start
+        game.assets.wait()
+        print(first_frame, main_menu, time.perf_counter() - start)
+        return 0
+
+    # Sem o pacote (ou com ele desatualizado) a linha "bundle" mediria os arquivos originais
+    from Asset_loader import AssetBundle, compile_assets
+    bundle = AssetBundle()
+    if bundle.data is None or bundle.stale_sources:
+        print("Pacote de assets ausente ou desatualizado: compilando antes de medir")
+        compile_assets()
+
+    results = {}
+    for mode in ("bundle", "source"):
+        command = [sys.executable, os.path.abspath(__file__), "startup", "--mode", mode]
+        runs = [[float(value) for value in subprocess.run(command, capture_output=True, text=True, check=True).stdout.split()[-3:]]
+                for _ in range(args.runs)]
+        results[mode] = [statistics.median(column) for column in zip(*runs)]
+        first_frame, main_menu, everything = (value * 1000 for value in results[mode])
+        print(f"{mode:<7} primeiro frame {first_frame:7.1f} ms | menu {main_menu:7.1f} ms | "
+              f"tudo carregado {everything:7.1f} ms (mediana de {args.runs})")
+    if args.max_ms and results["bundle"][0] * 1000 > args.max_ms:
+        print(f"FALHOU: primeiro frame acima de {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+def _import_times(module):
+    """Roda 'python -X importtime' e devolve (total, {import direto: cumulativo}) em ms."""
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    output = subprocess.run(command, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stderr
+    children = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == module:
+                return int(cumulative) / 1000, children
+            children = {}  # Imports do próprio interpretador (site...)
+        elif depth == 1:
+            children[name] = int(cumulative) / 1000
+    raise RuntimeError(f"'{module}' não apareceu na saída do -X importtime")
+
+def bench_importtime(args):
+    """Custo de 'import Game' (python -X importtime) e verificação de que o modo headless não liga som nem fontes."""
+    if args.child:
+        # Processo filho: o que um worker de simulação paga ao criar o jogo
+        import pygame
+        from Game import Game
+        Game(headless=True)
+        print(bool(pygame.mixer.get_init()), pygame.font.get_init(), "PIL" in sys.modules)
+        return 0
+
+    runs = [_import_times("Game") for _ in range(args.runs)]
+    total = statistics.median(total for total, _ in runs)
+    children = {name: statistics.median(run[1].get(name, 0) for run in runs) for name in runs[0][1]}
+    print(f"import Game: {total:.1f} ms (mediana de {args.runs})")
+    for name, cumulative in sorted(children.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {cumulative:7.1f} ms")
+
+    command = [sys.executable, os.path.abspath(__file__), "importtime", "--child"]
+    mixer, font, pil = subprocess.run(command, capture_output=True, text=True, check=True).stdout.split()[-3:]
+    print(f"headless: mixer {mixer} | fontes {font} | PIL importado {pil}")
+
+    failed = False
+    if "True" in (mixer, font, pil):
+        print("FALHOU: o modo headless inicializou som/fontes ou importou o PIL")
+        failed = True
+    if args.budget_ms and total > args.budget_ms:
+        print(f"FALHOU: import Game acima de {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+def bench_ai(args):
+    """Defesas e custo por decisão de cada política da IA, em chutes aleatórios contra ela."""
+    import math
+    import random
+    from Ai_policy import POLICIES, create_policy
+    from Constants import (AI_MOVE_BUDGET_US, BALL_IMAGE, BALL_INITIAL_SPEED, CHARACTERS, DIFFICULTY_SETTINGS,
+                           PLAYER_INITIAL_SPEED, POWERUP_SPEED_FACTOR, SIM_DELTA_TIME, WINDOW_HEIGHT)
+    from Entities import AI, Ball
+    from Game import Game
+
+    game = Game(headless=True)
+    ball = Ball(BALL_IMAGE)
+    failed = False
+    print(f"{'política':<11} {'dificuldade':<11} {'defesas':>9} {'µs/decisão':>11} {'pior µs':>9} {'acima':>7}")
+    for name in POLICIES:
+        for difficulty in DIFFICULTY_SETTINGS:
+            policy = create_policy(name, difficulty)
+            paddle = AI(CHARACTERS[1]["image_path"], "right", game.window, PLAYER_INITIAL_SPEED,
+                        DIFFICULTY_SETTINGS[difficulty], policy)
+            rng = random.Random(args.seed)  # os mesmos chutes para todas as políticas
+            saves = 0
+            for _ in range(args.shots):
+                # Chute da esquerda, de qualquer altura, até 60° e até três power-ups de velocidade
+                paddle.reset_position()
+                angle = rng.uniform(-math.pi / 3, math.pi / 3)
+                speed = BALL_INITIAL_SPEED * POWERUP_SPEED_FACTOR ** rng.uniform(0, 3)
+                ball.x, ball.y = 100, rng.uniform(0, WINDOW_HEIGHT - ball.height)
+                ball.velocity_x, ball.velocity_y = speed * math.cos(angle), speed * math.sin(angle)
+                while True:
+                    paddle.move(ball, SIM_DELTA_TIME)
+                    status = ball.move(game.window, SIM_DELTA_TIME, (paddle,))
+                    if ball.paddles_hit: saves += 1; break
+                    if status: break
+            stats = policy.stats()
+            over_share = stats["over_budget"] / stats["decisions"]
+            print(f"{name:<11} {difficulty:<11} {saves / args.shots:>9.1%} {stats['mean_us']:>11.3f} "
+                  f"{stats['worst_us']:>9.1f} {over_share:>7.2%}")
+            if over_share > args.max_over: failed = True
+
+    if failed:
+        print(f"FALHOU: mais de {args.max_over:.2%} das decisões acima de {AI_MOVE_BUDGET_US} µs")
+        return 1
+    return 0
+
+def bench_collision(args):
+    """Custo por chamada das colisões (caixas, pixels com e sem o cache de máscaras) e do tick com toque por pixel."""
+    import pygame
+    from Constants import SIM_DELTA_TIME
+    from Game import Game
+    from PPlay.collision import Collision
+
+    game = Game(headless=True)
+    game.start_headless_match(0, 1, "Hard", "Hard")
+    ball, paddle = game.ball, game.player2
+    ball.rect, paddle.rect = ball.image.get_rect(topleft=(paddle.x, paddle.y)), paddle.image.get_rect(topleft=(paddle.x, paddle.y))
+
+    def per_call(function):
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            function()
+        return (time.perf_counter() - start) / args.calls * 1e6
+
+    def uncached():
+        # O que perfect_collision fazia antes: as duas máscaras refeitas a cada teste
+        pygame.mask.from_surface(ball.image).overlap(pygame.mask.from_surface(paddle.image), (0, 0))
+
+    print(f"collided (caixas)          {per_call(lambda: Collision.collided(ball, paddle)):8.3f} µs/chamada")
+    print(f"perfect_collision (cache)  {per_call(lambda: Collision.perfect_collision(ball, paddle)):8.3f} µs/chamada")
+    print(f"máscaras refeitas          {per_call(uncached):8.3f} µs/chamada")
+    print(f"máscaras em cache: {Collision.masks.stats()}")
+
+    for pixel_perfect in (False, True):
+        game.start_headless_match(0, 1, "Hard", "Hard")
+        game.ball.pixel_perfect = pixel_perfect
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            game.update(SIM_DELTA_TIME)
+        elapsed = time.perf_counter() - start
+        print(f"partida headless, toque {'por pixel' if pixel_perfect else 'por caixa'}: {args.ticks / elapsed:9.0f} ticks/s")
+    return 0
+
+def _sprite_swarm_tick(balls, paddles, powerups, window, delta_time):
+    """Referência: um Ball (Sprite) por bola e um teste por par, como no jogo com uma bola só."""
+    touched = 0
+    for ball in balls:
+        ball.move(window, delta_time, paddles)
+        for powerup in powerups:
+            if ball.path_collided(powerup): touched += 1
+    return touched
+
+def bench_multiball(args):
+    """ms por tick do modo multibola: um Sprite por bola x colunas numpy sem grade x com grade, e o custo do desenho."""
+    import pygame
+    from Constants import BALL_IMAGE, SIM_DELTA_TIME, MULTIBALL_POWERUPS, WINDOW_WIDTH, WINDOW_HEIGHT
+    from Entities import Ball, PowerUp
+    from Game import Game
+    from Multiball import BallSwarm
+
+    game = Game(headless=True)
+    game.start_headless_match(0, 1, "Hard", "Hard")
+    paddles = (game.player1, game.player2)
+    ball_size = game.ball.image.get_size()
+    screen = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    ball_image = pygame.Surface(ball_size)
+    powerup_image = pygame.Surface((30, 30))
+
+    def measure(tick):
+        tick()  # aquece
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            tick()
+        return (time.perf_counter() - start) / args.ticks * 1000
+
+    failed = False
+    print(f"{'bolas':>7} {'sprites':>10} {'sem grade':>10} {'com grade':>10} {'desenho':>10}   (ms/tick)")
+    for count in args.counts:
+        sprites = "-"
+        if count <= args.max_sprites:
+            balls = [Ball(BALL_IMAGE) for _ in range(count)]
+            for ball in balls: ball.reset(game.window, 1)
+            powerups = [PowerUp(BALL_IMAGE, "SPEED_BOOST") for _ in range(MULTIBALL_POWERUPS)]
+            for powerup in powerups: powerup.spawn(game.window)
+            sprites = f"{measure(lambda: _sprite_swarm_tick(balls, paddles, powerups, game.window, SIM_DELTA_TIME)):.3f}"
+
+        results = {}
+        for use_grid in (False, True):
+            swarm = BallSwarm(count, ball_size, seed=args.seed, use_grid=use_grid,
+                              images=(ball_image, (powerup_image, powerup_image)))
+            results[use_grid] = measure(lambda: swarm.step(SIM_DELTA_TIME, paddles))
+        draw = measure(lambda: swarm.draw(screen, 0.5))
+        print(f"{count:>7} {sprites:>10} {results[False]:>10.3f} {results[True]:>10.3f} {draw:>10.3f}")
+        if args.max_ms and count == args.counts[0] and results[True] + draw > args.max_ms:
+            failed = True
+
+    # Com e sem grade a simulação tem de dar o mesmo resultado
+    outcomes = []
+    for use_grid in (False, True):
+        swarm = BallSwarm(args.counts[0], ball_size, seed=args.seed, use_grid=use_grid)
+        totals = [0, 0, 0, 0]
+        for _ in range(args.ticks):
+            goals_left, goals_right, hits = swarm.step(SIM_DELTA_TIME, paddles)
+            totals = [a + b for a, b in zip(totals, (goals_left, goals_right, *hits))]
+        outcomes.append((totals, swarm.x.tolist(), swarm.y.tolist()))
+    if outcomes[0] != outcomes[1]:
+        print("FALHOU: a grade mudou o resultado da simulação")
+        return 1
+    print(f"grade x força bruta: mesmo resultado em {args.counts[0]} bolas x {args.ticks} ticks")
+    if failed:
+        print(f"FALHOU: {args.counts[0]} bolas acima de {args.max_ms:.2f} ms por tick (simulação + desenho)")
+        return 1
+    return 0
+
+def bench_netplay(args):
+    """Duas partidas PVP em rede no localhost, com latência e perda de mentira: rollbacks, atraso, custo e dessincronias."""
+    from Constants import SIM_DELTA_TIME, SIM_TICK_RATE
+    from Game import Game
+    from Entities import TrailEmitter
+    from Netplay import LossyTransport, RollbackSession, UdpTransport, ball_follower
+    from Replay import Replay
+
+    # Os dois lados no mesmo processo, cada um com o seu Game e o seu socket (sem o aperto de mãos)
+    host = LossyTransport(UdpTransport(0, bind_host="127.0.0.1"), args.latency_ms, args.jitter_ms, args.loss, seed=1)
+    guest = LossyTransport(UdpTransport(0, ("127.0.0.1", host.port), bind_host="127.0.0.1"),
+                           args.latency_ms, args.jitter_ms, args.loss, seed=2)
+    host.transport.remote = ("127.0.0.1", guest.port)
+    sessions = [RollbackSession(host, "left", args.seed, 0, 1, ball_follower("left")),
+                RollbackSession(guest, "right", args.seed, 0, 1, ball_follower("right"))]
+    games = [Game(headless=True), Game(headless=True)]
+    for game, session in zip(games, sessions):
+        game.start_netplay(session)
+        # Com o rastro da bola, como numa partida com janela: o que é só visual não pode divergir nos rollbacks
+        if args.trail: game.ball_trail = TrailEmitter(game.ball.image)
+
+    frames = int(args.seconds * SIM_TICK_RATE)
+    tick_ms = [[], []]
+    start = time.perf_counter()
+    ticks = 0
+    while min(session.confirmed for session in sessions) < frames:
+        for session, times in zip(sessions, tick_ms):
+            tick_start = time.perf_counter()
+            session.tick()
+            times.append((time.perf_counter() - tick_start) * 1000)
+        ticks += 1
+        ahead = start + ticks * SIM_DELTA_TIME - time.perf_counter()
+        if ahead > 0: time.sleep(ahead)
+
+    failed = False
+    print(f"{args.seconds:.0f}s com {args.latency_ms:.0f} ms (+até {args.jitter_ms:.0f}) por envio e {args.loss:.0%} de perda")
+    print(f"{'lado':<6} {'RTT ms':>7} {'atraso':>7} {'rollbacks':>10} {'refeitos':>9} {'maior':>6} {'segurados':>10} "
+          f"{'ms/tick':>8} {'pior ms':>8} {'divergências':>13}")
+    for session, times in zip(sessions, tick_ms):
+        stats = session.stats()
+        print(f"{stats['side']:<6} {stats['rtt_ms']:>7} {stats['input_delay']:>7} {stats['rollbacks']:>10} "
+              f"{stats['resimulated']:>9} {stats['max_rollback']:>6} {stats['stalls']:>10} "
+              f"{statistics.mean(times):>8.3f} {max(times):>8.3f} {stats['desyncs']:>9}/{stats['checks']}")
+        if stats["desyncs"] or not stats["checks"]: failed = True
+        if args.max_ms and statistics.mean(times) > args.max_ms: failed = True
+
+    # A partida com rollbacks tem que ser a mesma que a simulada direto com as entradas confirmadas
+    session = sessions[0]
+    frame, checksum = session.last_checksum
+    replay = Replay.from_game(games[0], args.seed)
+    for bits in session.tick_bits[:frame]:
+        if not bits & session.NOT_PLAYING: replay.record(bits)
+    straight = Game(headless=True)
+    straight.start_playback(replay, speed=0)
+    straight.run_headless(max_ticks=replay.ticks)
+    same = straight.checksum() == checksum
+    print(f"placar {games[0].scores['left']} x {games[0].scores['right']}; sem rollback: "
+          f"{straight.scores['left']} x {straight.scores['right']} ({'confere' if same else 'DIVERGIU'})")
+    if not same: failed = True
+    for game in games: game.stop_netplay()
+
+    if failed:
+        print("FALHOU: os dois lados (ou a simulação direta) divergiram" + (f" ou o tick passou de {args.max_ms} ms" if args.max_ms else ""))
+        return 1
+    return 0
+
+def bench_spectators(args):
+    """Transmissão para muitos espectadores no localhost, com perda: bytes por quadro, banda por tela e conferência dos quadros."""
+    import asyncio
+    import random
+    from Constants import GameState, SIM_DELTA_TIME, SIM_TICK_RATE
+    from Game import Game
+    from Spectator import SpectatorClient, SpectatorServer
+
+    class LossyClient(SpectatorClient):
+        """Espectador que perde de propósito uma fração dos quadros recebidos."""
+        def __init__(self, seed):
+            super().__init__()
+            self.rng = random.Random(seed)
+
+        def datagram_received(self, data, address):
+            if self.rng.random() >= args.loss: super().datagram_received(data, address)
+
+    game = Game(headless=True)
+    game.spectators = server = SpectatorServer(0, args.rate, bind_host="127.0.0.1")
+    game.start_headless_match(0, 1, "Hard", "Hard", seed=args.seed)
+
+    async def watch_match():
+        loop = asyncio.get_running_loop()
+        clients = []
+        for index in range(args.clients):
+            _, client = await loop.create_datagram_endpoint(lambda: LossyClient(index), remote_addr=("127.0.0.1", server.port))
+            clients.append(client)
+        # Partida em tempo real; os espectadores recebem enquanto o tick espera
+        start = time.perf_counter()
+        for tick in range(int(args.seconds * SIM_TICK_RATE)):
+            if game.state == GameState.GAME_OVER: game.reset_game(args.seed + tick)
+            game.update(SIM_DELTA_TIME)
+            game.publish_tick()
+            now = time.perf_counter()
+            for client in clients: client.maintain(now)
+            await asyncio.sleep(max(0, start + (tick + 1) * SIM_DELTA_TIME - now))
+        await asyncio.sleep(0.2)
+        return clients
+
+    clients = asyncio.run(watch_match())
+    stats = server.stats()
+    server.close()
+
+    # Cada quadro decodificado tem que ser igual ao que o servidor quantizou
+    frames = server.stream.frames
+    wrong = sum(values != frames[sequence] for client in clients
+                for sequence, values in client.frames.items() if sequence in frames)
+    received = sum(client.received for client in clients)
+    kbits = statistics.mean(client.bytes_received for client in clients) * 8 / args.seconds / 1000
+    print(f"{args.clients} espectadores, {args.rate} quadros/s, {args.loss:.0%} de perda, {args.seconds:.0f}s")
+    print(f"quadros: {stats['frames']}; enviados {stats['keyframes']} completos ({stats['keyframe_bytes']} bytes) e "
+          f"{stats['deltas']} diferenças ({stats['delta_bytes']} bytes); {stats['broadcast_us']} µs por envio a todos")
+    print(f"recebidos {received} ({received / max(1, stats['keyframes'] + stats['deltas']):.1%} dos enviados), "
+          f"{sum(client.undecodable for client in clients)} sem base, {wrong} diferentes do servidor; "
+          f"{kbits:.1f} kbit/s por tela")
+    if wrong or not received:
+        print("FALHOU: algum espectador decodificou um quadro diferente do enviado (ou não recebeu nada)")
+        return 1
+    return 0
+
+def bench_matchserver(args):
+    """Servidor de partidas com muitas partidas PVE de jogadores automáticos: tempo do tick, atrasos e carga por processo."""
+    import asyncio
+    import io
+    import json
+    import threading
+    import pygame
+    from Constants import CHARACTERS, SPECTATOR_POSITION_SCALE, GameMode
+    from Match_server import MatchServer, PlayerClient, connect, request_match
+
+    # O jogador automático segue a altura da bola com o centro do seu personagem
+    center = pygame.image.load(CHARACTERS[0]["image_path"]).get_height() / 2 * SPECTATOR_POSITION_SCALE
+    dead_zone = 8 * SPECTATOR_POSITION_SCALE
+
+    def bot_keys(client):
+        if client.frame is None: return 0
+        offset = client.frame["ball_y"] - client.frame["player1_y"] - center
+        return 2 if offset > dead_zone else 1 if offset < -dead_zone else 0
+
+    output = io.StringIO()
+    server = MatchServer(0, args.workers, "127.0.0.1", output, metrics_interval=1.0)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    async def play_matches():
+        while server.transport is None: await asyncio.sleep(0.05)
+        seats = await asyncio.gather(*(request_match("127.0.0.1", server.port, GameMode.PVE, 0, "Hard", timeout=10)
+                                       for _ in range(args.matches)))
+        clients = [(await connect("127.0.0.1", seat))[1] for seat in seats if seat]
+        # As teclas vão a 30 por segundo, como as de uma tela a 30 FPS
+        start = time.perf_counter()
+        step = 0
+        while time.perf_counter() - start < args.seconds:
+            for client in clients: client.send_input(bot_keys(client))
+            step += 1
+            await asyncio.sleep(max(0, start + step / 30 - time.perf_counter()))
+        return clients
+
+    clients = asyncio.run(play_matches())
+    server.stop()
+    thread.join()
+
+    # O primeiro relatório de cada processo inclui a criação das partidas; os seguintes são o regime
+    reports = [json.loads(line) for line in output.getvalue().splitlines()]
+    workers = {}
+    for report in reports:
+        if report["type"] == "worker": workers.setdefault(report["worker"], []).append(report)
+    print(f"{len(clients)}/{args.matches} partidas PVE em {len(workers)} processos, {args.seconds:.0f}s")
+    for index, worker_reports in sorted(workers.items()):
+        steady = worker_reports[1:] or worker_reports
+        print(f"  processo {index}: {max(report['matches'] for report in steady)} partidas, "
+              f"tick médio {statistics.mean(report['tick_ms'] for report in steady):.2f} ms "
+              f"(pior {max(report['worst_tick_ms'] for report in steady):.2f} ms), "
+              f"{sum(report['overruns'] for report in steady)} ticks acima de {1000 / 120:.1f} ms, "
+              f"{sum(report['skipped'] for report in steady)} pulados, carga {statistics.mean(report['load'] for report in steady):.0%} "
+              f"(criação: pior tick {worker_reports[0]['worst_tick_ms']:.1f} ms)")
+    received = [client.received for client in clients]
+    print(f"quadros recebidos por jogador: mínimo {min(received, default=0)}, médio {statistics.mean(received or [0]):.0f}, "
+          f"{sum(client.undecodable for client in clients)} sem base")
+    steady_load = max((statistics.mean(report["load"] for report in worker_reports[1:] or worker_reports)
+                       for worker_reports in workers.values()), default=0)
+    if len(clients) < args.matches or min(received, default=0) == 0:
+        print("FALHOU: alguma partida não foi criada ou algum jogador não recebeu o estado")
+        return 1
+    if args.max_load and steady_load > args.max_load:
+        print(f"FALHOU: carga de um processo acima de {args.max_load:.0%}")
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks e verificações do FutePong")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    batch = subparsers.add_parser("batch", help=bench_batch.__doc__)
+    batch.add_argument("--matches", type=int, default=4096)
+    batch.add_argument("--ticks", type=int, default=2000)
+    batch.add_argument("--seed", type=int, default=0)
+    batch.add_argument("--min-rate", type=float, default=0, help="falha abaixo desta vazão (partidas-tick/s)")
+    batch.set_defaults(run=bench_batch)
+
+    parity = subparsers.add_parser("parity", help=bench_parity.__doc__)
+    parity.add_argument("--cases", type=int, default=5000)
+    parity.add_argument("--seed", type=int, default=0)
+    parity.add_argument("--delta-time", type=float, default=1 / 120, help="duração do tick comparado (passos longos = avanço rápido)")
+    parity.set_defaults(run=bench_parity)
+
+    alloc = subparsers.add_parser("alloc", help=bench_alloc.__doc__)
+    alloc.add_argument("--frames", type=int, default=120)
+    alloc.set_defaults(run=bench_alloc)
+
+    startup = subparsers.add_parser("startup", help=bench_startup.__doc__)
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--max-ms", type=float, default=0, help="falha se o primeiro frame com o pacote passar disso")
+    startup.add_argument("--mode", choices=["bundle", "source"], default=None, help=argparse.SUPPRESS)
+    startup.set_defaults(run=bench_startup)
+
+    importtime = subparsers.add_parser("importtime", help=bench_importtime.__doc__)
+    importtime.add_argument("--runs", type=int, default=5)
+    importtime.add_argument("--top", type=int, default=8, help="quantos imports diretos mostrar")
+    importtime.add_argument("--budget-ms", type=float, default=0, help="falha se 'import Game' passar disso")
+    importtime.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    importtime.set_defaults(run=bench_importtime)
+
+    ai = subparsers.add_parser("ai", help=bench_ai.__doc__)
+    ai.add_argument("--shots", type=int, default=2000)
+    ai.add_argument("--seed", type=int, default=0)
+    ai.add_argument("--max-over", type=float, default=0.001, help="fração máxima de decisões acima do orçamento")
+    ai.set_defaults(run=bench_ai)
+
+    collision = subparsers.add_parser("collision", help=bench_collision.__doc__)
+    collision.add_argument("--calls", type=int, default=20000)
+    collision.add_argument("--ticks", type=int, default=20000)
+    collision.set_defaults(run=bench_collision)
+
+    multiball = subparsers.add_parser("multiball", help=bench_multiball.__doc__)
+    multiball.add_argument("--counts", type=lambda text: [int(value) for value in text.split(",")],
+                           default=[200, 1000, 5000, 20000], help="quantidades de bolas, separadas por vírgula")
+    multiball.add_argument("--ticks", type=int, default=200)
+    multiball.add_argument("--seed", type=int, default=0)
+    multiball.add_argument("--max-sprites", type=int, default=1000, help="maior quantidade medida com um Sprite por bola")
+    multiball.add_argument("--max-ms", type=float, default=0, help="falha se a primeira quantidade passar disso por tick")
+    multiball.set_defaults(run=bench_multiball)
+
+    netplay = subparsers.add_parser("netplay", help=bench_netplay.__doc__)
+    netplay.add_argument("--seconds", type=float, default=10)
+    netplay.add_argument("--latency-ms", type=float, default=50, help="atraso de cada pacote enviado (RTT ~ 2x)")
+    netplay.add_argument("--jitter-ms", type=float, default=10)
+    netplay.add_argument("--loss", type=float, default=0.05)
+    netplay.add_argument("--seed", type=int, default=0)
+    netplay.add_argument("--max-ms", type=float, default=0, help="falha se o tick médio da sessão passar disso")
+    netplay.add_argument("--no-trail", dest="trail", action="store_false",
+                         help="sem o rastro da bola (por padrão cada lado tem um, como com janela)")
+    netplay.set_defaults(run=bench_netplay)
+
+    spectators = subparsers.add_parser("spectators", help=bench_spectators.__doc__)
+    spectators.add_argument("--clients", type=int, default=50)
+    spectators.add_argument("--rate", type=int, default=30, help="quadros de estado por segundo")
+    spectators.add_argument("--seconds", type=float, default=10)
+    spectators.add_argument("--loss", type=float, default=0.05, help="fração dos quadros perdida por cada espectador")
+    spectators.add_argument("--seed", type=int, default=0)
+    spectators.set_defaults(run=bench_spectators)
+
+    matchserver = subparsers.add_parser("matchserver", help=bench_matchserver.__doc__)
+    matchserver.add_argument("--matches", type=int, default=200)
+    matchserver.add_argument("--workers", type=int, default=None, help="processos de partidas (padrão: um por núcleo)")
+    matchserver.add_argument("--seconds", type=float, default=10)
+    matchserver.add_argument("--max-load", type=float, default=0, help="falha se a carga média de um processo passar disso")
+    matchserver.set_defaults(run=bench_matchserver)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
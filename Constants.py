@@ -9,6 +9,19 @@ WINDOW_WIDTH = 900
 WINDOW_HEIGHT = 600
 WINDOW_TITLE = "FutePong"
 FPS_LIMIT = 120
+DIRTY_RECT_RENDERING = True  # Durante a partida, só envia à tela as áreas que mudaram
+
+# SIMULATION
+# A física roda em passos fixos, independente do FPS de renderização
+SIM_TICK_RATE = 120
+SIM_DELTA_TIME = 1 / SIM_TICK_RATE
+MAX_FRAME_TIME = 0.25  # Evita a "espiral da morte" depois de um travamento longo
+PLAYBACK_FRAME_BUDGET = 0.012  # Segundos de simulação por frame ao reproduzir um replay sem limite
+
+# PROFILER
+PROFILER_HISTORY = 600  # Frames guardados no buffer circular (5s a 120 FPS)
+PROFILER_HOTKEY = "F3"  # Mostra/esconde o painel de tempos
+PROFILER_OVERLAY_REFRESH = 15  # O painel é redesenhado a cada N frames
 
 # COLORS
 COLOR_WHITE = (255, 255, 255)
@@ -37,6 +50,15 @@ BOOST_IMAGE = os.path.join(BOOST_PATH, "boost_fogo.png")
 SLOW_BALL_IMAGE = os.path.join(BOOST_PATH, "boost_gelo.png")
 GOAL_ANIMATION_GIF = os.path.join(IMAGE_PATH, "gol_animacao.gif")
 
+# COMPILED ASSETS
+# Gerado por "python Asset_loader.py": pixels crus já no tamanho final + manifesto
+COMPILED_ASSETS_PATH = os.path.join(BASE_ASSETS_PATH, "Compiled/")
+ASSET_BUNDLE_FILE = os.path.join(COMPILED_ASSETS_PATH, "assets.bin")
+ASSET_MANIFEST_FILE = os.path.join(COMPILED_ASSETS_PATH, "manifest.json")
+USE_ASSET_BUNDLE = True  # Sem pacote (ou desatualizado), carrega os arquivos originais
+ASSET_LOADER_WORKERS = 4  # Threads que decodificam os assets em segundo plano
+ASSET_LOADER_FRAME_BUDGET = 0.004  # Segundos por frame convertendo assets já decodificados
+
 # Player Images
 # Corrigido o caminho para a pasta 'Players'
 NEYMAR_IMAGE = os.path.join(PLAYERS_PATH, "neymar.png")
@@ -79,6 +101,13 @@ END_WHISTLE_SOUND = os.path.join(SOUND_PATH, "apito_fim.wav")
 KICK_SOUND = os.path.join(SOUND_PATH, "chute.wav")
 GOAL_SOUND = os.path.join(SOUND_PATH, "gol.wav")
 
+# IMAGE SIZES
+SCOREBOARD_SIZE = (318, 44)
+HUD_FLAG_HEIGHT = 25
+GAME_OVER_FLAG_HEIGHT = 50
+PADDLE_SHADOW_SCALE = 1.2  # Em relação à largura do jogador
+BALL_SHADOW_SCALE = 1.5  # Em relação à largura da bola
+
 # GAME SETTINGS
 MAX_SCORE = 5
 PLAYER_INITIAL_SPEED = 400
@@ -87,10 +116,77 @@ PLAYER_OFFSET_X = 10
 POWERUP_SPAWN_TIME = 10
 POWERUP_ON_SCREEN_DURATION = 7
 TRAIL_EFFECT_DURATION = 2.0
+TRAIL_SPAWN_INTERVAL = 0.02  # Segundos entre partículas do rastro
+TRAIL_LIFESPAN = 0.4  # Segundos até a partícula sumir
+TRAIL_INITIAL_ALPHA = 120
+TRAIL_ALPHA_LEVELS = 8  # Cópias esmaecidas da bola, feitas uma vez só
+TRAIL_MAX_PARTICLES = int(TRAIL_LIFESPAN / TRAIL_SPAWN_INTERVAL) + 2
 DIFFICULTY_SETTINGS = {"Easy": 0.6, "Medium": 0.8, "Hard": 1.0}
+AI_DEAD_ZONE = 5
+AI_POLICY = "predictive"  # Política da IA no modo Jogador vs IA (ver Ai_policy.POLICIES)
+AI_MOVE_BUDGET_US = 50  # Orçamento de cada decisão da IA, em microssegundos
+AI_PREDICTION_ERROR = {"Easy": 120, "Medium": 90, "Hard": 72}  # Erro máximo (px) da IA que prevê a bola
+BALL_MAX_SERVE_ANGLE = 0.7854  # 45° em radianos
+BALL_DEFLECTION_FACTOR = 0.7  # Quanto o ponto de contato no jogador desvia a bola
+BALL_MAX_CONTACTS_PER_TICK = 4  # Contatos (paredes/jogadores) resolvidos dentro de um mesmo tick
+PIXEL_PERFECT_PADDLE_COLLISION = False  # Toque bola x jogador pelos pixels da imagem desenhada (mais caro)
+GOAL_PAUSE_DURATION = 1.5
+POWERUP_SIZE = (40, 40)
+POWERUP_SPEED_FACTOR = 1.3
+POWERUP_BOOSTED_THRESHOLD = 1.2  # SLOW_BALL só aparece acima de 120% da velocidade inicial
+POWERUP_WEIGHTS = {"SPEED_BOOST": 0.65, "SLOW_BALL": 0.35}
 TILT_SPEED = 15
+# Cache de variantes inclinadas/achatadas dos jogadores
+PADDLE_TILT_STEP = 0.5  # graus por variante
+PADDLE_SQUASH_STEPS = 12  # variantes ao longo do achatamento
+PADDLE_TRANSFORM_CACHE_BYTES = 8 * 1024 * 1024  # por imagem de jogador
 GOAL_ANIM_SPEED = 15
 
+# MULTI-BALL MODE
+MULTIBALL_BALLS = 200  # Bolas extras em campo (além da bola principal)
+MULTIBALL_POWERUPS = 6  # Power-ups em campo ao mesmo tempo
+MULTIBALL_POWERUP_RESPAWN = 4.0  # Segundos até um power-up pego reaparecer
+MULTIBALL_MAX_SCORE = 1000  # Com tantas bolas, a partida vai até mais gols
+MULTIBALL_GRID_CELL = 64  # Lado (px) das células da grade da fase larga
+
+# REPLAYS
+REPLAY_RECORDING = True  # Grava as partidas com janela (entradas por tick + seed)
+REPLAY_DIR = "Replays/"
+REPLAY_SPEEDS = (1, 8, 0)  # Velocidades da reprodução (0 = sem limite)
+
+# PARTIDA SALVA
+AUTOSAVE_PATH = "Saves/autosave.fpsv"  # Partida com janela em andamento (python Main.py --resume)
+AUTOSAVE_INTERVAL = 5.0  # Segundos de partida entre dois salvamentos
+
+# NETPLAY (PVP EM REDE, COM ROLLBACK)
+NETPLAY_PORT = 47800
+NETPLAY_INPUT_DELAY = 2  # Atraso inicial das entradas locais, em ticks (depois ajustado pelo RTT)
+NETPLAY_MAX_INPUT_DELAY = 8
+NETPLAY_ROLLBACK_TARGET = 4  # Ticks da latência de ida que o rollback esconde; o resto vira atraso
+NETPLAY_MAX_ROLLBACK = 30  # Ticks previstos sem as entradas do outro lado antes de esperar por elas
+NETPLAY_DELAY_RETUNE = 60  # Ticks entre ajustes do atraso (um tick de atraso por vez)
+NETPLAY_SYNC_TOLERANCE = 2  # Ticks à frente do outro lado tolerados antes de segurar a simulação
+NETPLAY_CHECKSUM_INTERVAL = 30  # Ticks entre as conferências de estado entre os dois lados
+NETPLAY_MAX_INPUTS_PER_PACKET = 240  # Entradas não confirmadas reenviadas em cada pacote
+NETPLAY_TIMEOUT = 5.0  # Segundos sem pacotes até considerar que o outro lado saiu
+NETPLAY_CONNECT_TIMEOUT = 60.0
+
+# ESPECTADORES (TRANSMISSÃO DA PARTIDA PARA OUTRAS TELAS)
+SPECTATOR_PORT = 47900
+SPECTATOR_RATE = 30  # Quadros de estado por segundo enviados a cada espectador
+SPECTATOR_KEYFRAME_INTERVAL = 2.0  # Segundos entre quadros completos (os outros são diferenças)
+SPECTATOR_HISTORY = 64  # Quadros guardados como base das diferenças (além disso, vai um quadro completo)
+SPECTATOR_POSITION_SCALE = 8  # Posições enviadas em 1/8 de pixel
+SPECTATOR_TIMEOUT = 5.0  # Segundos sem notícias até desistir do espectador (ou do servidor)
+
+# SERVIDOR DE PARTIDAS (MUITAS PARTIDAS HEADLESS, UM PROCESSO POR NÚCLEO)
+MATCH_SERVER_PORT = 48000  # Porta de entrada; os processos das partidas usam as seguintes
+MATCH_SERVER_STATE_RATE = 30  # Quadros de estado por segundo enviados a cada jogador
+MATCH_SERVER_CATCH_UP = 5  # Ticks de atraso recuperados de uma vez; além disso, os ticks são pulados
+MATCH_SERVER_METRICS_INTERVAL = 5.0  # Segundos entre dois relatórios de carga dos processos
+MATCH_SERVER_LINGER = 5.0  # Segundos em que a tela de fim de jogo é mantida antes de fechar a partida
+MATCH_SERVER_TIMEOUT = 10.0  # Segundos sem as teclas de um jogador até considerar que ele saiu
+
 # ======================================================================================
 # --- ENUMS (STATES & TYPES) ---
 # ======================================================================================
@@ -103,7 +199,9 @@ class GameState(Enum):
     PAUSED = 6
     GOAL = 7
     GAME_OVER = 8
+    LOADING = 9  # Tela de carregamento mostrada enquanto os assets do menu chegam
 
 class GameMode(Enum):
     PVE = 1
-    PVP = 2
\ No newline at end of file
+    PVP = 2
+    EVE = 3  # IA vs IA (simulação headless)
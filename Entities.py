@@ -2,17 +2,39 @@
 import pygame
 import random
 import math
+import numpy as np
 from PPlay.sprite import *
 from PPlay.gameimage import *
+from PPlay.transformcache import TransformCache
+from PPlay.collision import Collision
 from Constants import *
+from Asset_loader import load_image
+from Ai_policy import ChasePolicy
+
+# Variantes já transformadas (com sombra), compartilhadas por jogadores com a mesma imagem
+_paddle_transform_caches = {}
 
 # ======================================================================================
 # --- ENTITY CLASSES (PLAYERS, BALL, ETC.) ---
 # ======================================================================================
-class Paddle(Sprite):
+# Cada entidade declara o seu estado de simulação: os atributos em STATE_FIELDS, só
+# números, com os códigos do struct em STATE_FORMAT. Game.snapshot copia só esses
+# números para um buffer (imagens, sombras e caches ficam de fora).
+class Interpolated:
+    """Guarda a posição do tick anterior para interpolar a renderização entre ticks."""
+    def store_previous_position(self):
+        self.previous_x, self.previous_y = self.x, self.y
+
+    def render_position(self, alpha):
+        return (self.previous_x + (self.x - self.previous_x) * alpha,
+                self.previous_y + (self.y - self.previous_y) * alpha)
+
+class Paddle(Interpolated, Sprite):
+    STATE_FIELDS = ("x", "y", "previous_x", "previous_y", "squash_timer", "tilt_angle", "is_moving_up", "is_moving_down")
+    STATE_FORMAT = "6d2?"
+
     def __init__(self, image_file, side, window, speed=PLAYER_INITIAL_SPEED):
-        super().__init__(image_file, 1)
-        self.image = self.image.convert_alpha()
+        super().__init__(load_image(image_file), 1)
         self.window = window
         self.original_image = self.image.copy()
         self.original_width = self.width
@@ -31,10 +53,12 @@ class Paddle(Sprite):
         self.speed = speed
         self.side = side
 
-        self.shadow = GameImage(SHADOW_IMAGE)
-        shadow_size = int(self.width * 1.2)
-        self.shadow.image = pygame.transform.scale(self.shadow.image, (shadow_size, shadow_size))
-        self.shadow.width, self.shadow.height = shadow_size, shadow_size
+        shadow_size = int(self.width * PADDLE_SHADOW_SCALE)
+        self.shadow = GameImage(load_image(SHADOW_IMAGE, (shadow_size, shadow_size)))
+        self.transform_cache = _paddle_transform_caches.get(image_file)
+        if self.transform_cache is None:
+            self.transform_cache = TransformCache(PADDLE_TRANSFORM_CACHE_BYTES, pool=window.get_surface_pool())
+            _paddle_transform_caches[image_file] = self.transform_cache
 
         self.reset_position()
 
@@ -44,15 +68,16 @@ class Paddle(Sprite):
         else:
             self.x = WINDOW_WIDTH - self.original_width - PLAYER_OFFSET_X
         self.y = (WINDOW_HEIGHT / 2) - (self.original_height / 2)
+        self.store_previous_position()
 
-    def move(self, up_key, down_key, keyboard):
+    def move(self, up_key, down_key, keyboard, delta_time):
         self.is_moving_up = False
         self.is_moving_down = False
-        if keyboard.key_pressed(up_key):
-            self.y -= self.speed * self.window.delta_time()
+        if keyboard.pressed(up_key):
+            self.y -= self.speed * delta_time
             self.is_moving_up = True
-        if keyboard.key_pressed(down_key):
-            self.y += self.speed * self.window.delta_time()
+        if keyboard.pressed(down_key):
+            self.y += self.speed * delta_time
             self.is_moving_down = True
         self._keep_in_bounds()
 
@@ -75,44 +100,82 @@ class Paddle(Sprite):
             target_angle = -self.max_tilt
         self.tilt_angle += (target_angle - self.tilt_angle) * TILT_SPEED * delta_time
 
-    def draw(self):
-        transformed_image = self.original_image
+    def _transform_key(self):
+        # Inclinação e progresso do achatamento quantizados: (passos de PADDLE_TILT_STEP, faixa do achatamento ou -1)
+        squash_bucket = -1
         if self.squash_timer > 0:
             progress = 1 - (self.squash_timer / self.squash_duration)
+            squash_bucket = min(PADDLE_SQUASH_STEPS - 1, int(progress * PADDLE_SQUASH_STEPS))
+        tilt_bucket = 0
+        if abs(self.tilt_angle) > 0.1:
+            tilt_bucket = round(self.tilt_angle / PADDLE_TILT_STEP)
+        return tilt_bucket, squash_bucket
+
+    def _build_transform(self, key):
+        """Retorna (imagem com a sombra embaixo, deslocamento dela em relação ao jogador, jogador transformado)."""
+        tilt_bucket, squash_bucket = key
+        transformed_image = self.original_image
+        if squash_bucket >= 0:
+            progress = (squash_bucket + 0.5) / PADDLE_SQUASH_STEPS
             factor = math.sin(progress * math.pi)
             scale_x = 1 + self.squash_intensity * factor
             scale_y = 1 - self.squash_intensity * factor
             new_size = (int(self.original_width * scale_x), int(self.original_height * scale_y))
             transformed_image = pygame.transform.scale(transformed_image, new_size)
 
-        if abs(self.tilt_angle) > 0.1:
-            transformed_image = pygame.transform.rotate(transformed_image, self.tilt_angle)
+        if tilt_bucket:
+            transformed_image = pygame.transform.rotate(transformed_image, tilt_bucket * PADDLE_TILT_STEP)
 
-        final_rect = transformed_image.get_rect()
-        final_rect.center = (self.x + self.original_width / 2, self.y + self.original_height / 2)
+        # A sombra fica 4px à direita e com o centro na base do jogador
+        width, height = transformed_image.get_size()
+        shadow_x, shadow_y = 4, int(height - self.shadow.height / 2)
+        left, top = min(0, shadow_x), min(0, shadow_y)
+        right = max(width, shadow_x + self.shadow.width)
+        bottom = max(height, shadow_y + self.shadow.height)
+        composite = self.window.get_surface_pool().acquire((right - left, bottom - top), pygame.SRCALPHA)
+        composite.blit(self.shadow.image, (shadow_x - left, shadow_y - top))
+        composite.blit(transformed_image, (-left, -top))
+        return composite, (left, top), transformed_image
 
-        self.shadow.x = final_rect.x + 4
-        self.shadow.y = final_rect.y + final_rect.height - (self.shadow.height / 2)
-        self.shadow.draw()
+    def collision_mask(self):
+        """(máscara, x, y) do jogador como Paddle.draw o desenha na posição do tick (achatado e inclinado)."""
+        key = self._transform_key()
+        _, _, transformed_image = self.transform_cache.get(key, lambda: self._build_transform(key))
+        width, height = transformed_image.get_size()
+        x = self.x + self.original_width / 2 - width // 2
+        y = self.y + self.original_height / 2 - height // 2
+        return Collision.masks.get(transformed_image, key), x, y
 
-        self.window.screen.blit(transformed_image, final_rect)
+    def draw(self, alpha=1.0):
+        key = self._transform_key()
+        composite, (offset_x, offset_y), transformed_image = self.transform_cache.get(key, lambda: self._build_transform(key))
+
+        render_x, render_y = self.render_position(alpha)
+        final_rect = transformed_image.get_rect()
+        final_rect.center = (render_x + self.original_width / 2, render_y + self.original_height / 2)
+
+        composite_rect = composite.get_rect(topleft=(final_rect.x + offset_x, final_rect.y + offset_y))
+        self.window.screen.blit(composite, composite_rect)
+        self.window.register_dirty_rect(composite_rect)
 
 class AI(Paddle):
-    def __init__(self, image_file, side, window, speed, difficulty):
+    def __init__(self, image_file, side, window, speed, difficulty, policy=None):
         super().__init__(image_file, side, window, speed)
         self.difficulty = difficulty
+        # A política decide o alvo (Ai_policy); a dificuldade só limita a velocidade até ele
+        self.policy = policy or ChasePolicy()
 
-    def move(self, ball):
-        target_y = ball.y + ball.height / 2
+    def move(self, ball, delta_time, target_y=None):
+        # target_y permite seguir outra bola (ex.: a que chega primeiro no modo multibola)
+        if target_y is None: target_y = self.policy.target_y(self, ball)
         paddle_center = self.y + self.original_height / 2
-        dead_zone = 5
         diff = target_y - paddle_center
 
         self.is_moving_up = False
         self.is_moving_down = False
 
-        if abs(diff) > dead_zone:
-            move_speed = self.speed * self.difficulty * self.window.delta_time()
+        if abs(diff) > AI_DEAD_ZONE:
+            move_speed = self.speed * self.difficulty * delta_time
             if diff > 0:
                 self.y += move_speed
                 self.is_moving_down = True
@@ -121,86 +184,151 @@ class AI(Paddle):
                 self.is_moving_up = True
         self._keep_in_bounds()
 
-class Ball(Sprite):
-    def __init__(self, image_file, speed=BALL_INITIAL_SPEED):
-        super().__init__(image_file, 1)
-        self.image = self.image.convert_alpha()
+class Ball(Interpolated, Sprite):
+    STATE_FIELDS = ("x", "y", "previous_x", "previous_y", "velocity_x", "velocity_y")
+    STATE_FORMAT = "6d"
+
+    def __init__(self, image_file, speed=BALL_INITIAL_SPEED, pixel_perfect=PIXEL_PERFECT_PADDLE_COLLISION):
+        super().__init__(load_image(image_file), 1)
+        # Com pixel_perfect, o toque nos jogadores usa os pixels da imagem desenhada e não as caixas
+        self.pixel_perfect = pixel_perfect
         self.initial_speed = speed
         self.velocity_x = speed
         self.velocity_y = speed
-        self.shadow = GameImage(SHADOW_IMAGE)
-        shadow_size = int(self.width * 1.5)
-        self.shadow.image = pygame.transform.scale(self.shadow.image, (shadow_size, shadow_size))
-        self.shadow.width, self.shadow.height = shadow_size, shadow_size
+        shadow_size = int(self.width * BALL_SHADOW_SCALE)
+        self.shadow = GameImage(load_image(SHADOW_IMAGE, (shadow_size, shadow_size)))
+        self.paddles_hit = []
+        self.path = []
+        self.store_previous_position()
 
-    def reset(self, window, direction=1):
+    def reset(self, window, direction=1, rng=random):
         self.x = window.width / 2 - self.width / 2
         self.y = window.height / 2 - self.height / 2
         
         # Definir ângulo aleatório (entre -45° e 45°) para evitar trajetórias muito verticais
-        import random
-        angle = random.uniform(-0.7854, 0.7854)  # -45° a 45° em radianos
+        angle = rng.uniform(-BALL_MAX_SERVE_ANGLE, BALL_MAX_SERVE_ANGLE)
         
         # Calcular velocidades para manter a velocidade total = initial_speed
         self.velocity_x = self.initial_speed * math.cos(angle) * direction
         self.velocity_y = self.initial_speed * math.sin(angle)
+        self.store_previous_position()
+
+    def move(self, window, delta_time, paddles=()):
+        """
+        Move a bola pelo tick com colisão contínua: em vez de testar a sobreposição
+        só no fim do passo, acha o primeiro contato (parede ou jogador) ao longo do
+        caminho, reflete ali e segue com o tempo que sobrou. Assim a bola não atravessa
+        os jogadores nem com muita velocidade ou passos longos. Os jogadores tocados
+        ficam em paddles_hit e os trechos percorridos em path (ver path_collided).
+        """
+        self.paddles_hit = []
+        self.path = []
+        remaining = delta_time
+        for _ in range(BALL_MAX_CONTACTS_PER_TICK):
+            dx = self.velocity_x * remaining
+            dy = self.velocity_y * remaining
+            contact_time, obstacle = self._wall_contact(window, dy), window
+            for paddle in paddles:
+                if paddle in self.paddles_hit: continue
+                if self.pixel_perfect: paddle_time = self._pixel_contact(paddle, dx, dy)
+                else: paddle_time = Collision.swept(self, dx, dy, paddle)
+                if paddle_time is not None and (contact_time is None or paddle_time < contact_time):
+                    contact_time, obstacle = paddle_time, paddle
+            if contact_time is None:
+                self.path.append((self.x, self.y, dx, dy))
+                self.x += dx
+                self.y += dy
+                break
+
+            self.path.append((self.x, self.y, dx * contact_time, dy * contact_time))
+            self.x += dx * contact_time
+            self.y += dy * contact_time
+            remaining *= 1 - contact_time
+            if obstacle is window:
+                self.y = 0 if self.velocity_y < 0 else window.height - self.height
+                self.velocity_y *= -1
+            else:
+                # No modo por pixel a bola já encostou na imagem; não volta para a borda da caixa
+                self._bounce_off_paddle(obstacle, snap=not self.pixel_perfect)
+                self.paddles_hit.append(obstacle)
 
-    def move(self, window):
-        self.x += self.velocity_x * window.delta_time()
-        self.y += self.velocity_y * window.delta_time()
-        if self.y <= 0 or self.y + self.height >= window.height:
-            self.velocity_y *= -1
-            self.y = 0 if self.y <= 0 else window.height - self.height
         if self.x + self.width < 0: return "goal_right"
         if self.x > window.width: return "goal_left"
         return None
 
-    def handle_paddle_collision(self, paddle):
-        if self.collided(paddle):
+    def _wall_contact(self, window, dy):
+        """Fração do passo em que a bola encosta na parede para onde vai (None se não encosta)."""
+        if dy < 0 and self.y + dy <= 0:
+            return max(-self.y / dy, 0.0)
+        bottom = window.height - self.height
+        if dy > 0 and self.y + dy >= bottom:
+            return max((bottom - self.y) / dy, 0.0)
+        return None
+
+    def _pixel_contact(self, paddle, dx, dy):
+        """Fração do passo em que os pixels da bola encostam nos do jogador (None se não encostam)."""
+        # Só conta a bola indo na direção do jogador: depois de rebater ela ainda pode estar sobre a imagem
+        if (paddle.x + paddle.original_width / 2 - self.x - self.width / 2) * dx <= 0: return None
+        paddle_mask, paddle_x, paddle_y = paddle.collision_mask()
+        return Collision.swept_perfect(Collision.masks.get(self.image), self.x, self.y, dx, dy,
+                                       paddle_mask, paddle_x, paddle_y)
+
+    def _bounce_off_paddle(self, paddle, snap=True):
+        if snap:
             if self.velocity_x < 0: self.x = paddle.x + paddle.original_width
             else: self.x = paddle.x - self.width
-            
-            current_speed = math.sqrt(self.velocity_x**2 + self.velocity_y**2)
-            self.velocity_x *= -1
-            
-            offset = (self.y + self.height / 2) - (paddle.y + paddle.original_height / 2)
-            normalized_offset = offset / (paddle.original_height / 2)
-            self.velocity_y = current_speed * normalized_offset * 0.7
-            
-            new_magnitude = math.sqrt(self.velocity_x**2 + self.velocity_y**2)
-            if new_magnitude > 0:
-                dir_x = self.velocity_x / new_magnitude
-                dir_y = self.velocity_y / new_magnitude
-                self.velocity_x = dir_x * current_speed
-                self.velocity_y = dir_y * current_speed
-            return True
+
+        current_speed = math.sqrt(self.velocity_x**2 + self.velocity_y**2)
+        self.velocity_x *= -1
+
+        offset = (self.y + self.height / 2) - (paddle.y + paddle.original_height / 2)
+        normalized_offset = offset / (paddle.original_height / 2)
+        self.velocity_y = current_speed * normalized_offset * BALL_DEFLECTION_FACTOR
+
+        new_magnitude = math.sqrt(self.velocity_x**2 + self.velocity_y**2)
+        if new_magnitude > 0:
+            dir_x = self.velocity_x / new_magnitude
+            dir_y = self.velocity_y / new_magnitude
+            self.velocity_x = dir_x * current_speed
+            self.velocity_y = dir_y * current_speed
+
+    def path_collided(self, obj):
+        """Se a bola passou por obj em algum trecho do último tick (e não só onde parou)."""
+        for x, y, dx, dy in self.path:
+            if Collision.swept_aabb(x, y, self.width, self.height, dx, dy, obj.x, obj.y, obj.width, obj.height) is not None:
+                return True
         return False
 
-    def draw(self):
-        self.shadow.x = self.x + 3
-        self.shadow.y = self.y + 3
+    def draw(self, alpha=1.0):
+        render_x, render_y = self.render_position(alpha)
+        self.shadow.x = render_x + 3
+        self.shadow.y = render_y + 3
         self.shadow.draw()
-        super().draw()
+        self.rect = pygame.Rect(render_x, render_y, self.width, self.height)
+        window.Window.get_screen().blit(self.image, self.rect)
+        window.Window.register_dirty_rect(self.rect)
 
 class PowerUp(Sprite):
-    def __init__(self, image_file, power_type, size=(40, 40)):
+    STATE_FIELDS = ("is_active", "x", "y")
+    STATE_FORMAT = "?2d"
+
+    def __init__(self, image_file, power_type, size=POWERUP_SIZE):
         try:
-            super().__init__(image_file, 1)
-        except pygame.error:
+            super().__init__(load_image(image_file, size), 1)
+        except (pygame.error, FileNotFoundError):
             print(f"WARNING: Image file not found at '{image_file}'.")
-            super().__init__("images/boost/bola.png", 1)
+            # Cópia: a imagem carregada é compartilhada e esta fica invisível
+            super().__init__(load_image(BALL_IMAGE, size).copy(), 1)
             self.image.set_alpha(0)
 
-        self.image = self.image.convert_alpha()
-        self.image = pygame.transform.scale(self.image, size)
         self.width = self.image.get_width()
         self.height = self.image.get_height()
         self.type = power_type
         self.is_active = False
 
-    def spawn(self, window):
-        self.x = random.randint(int(window.width * 0.25), int(window.width * 0.75) - self.width)
-        self.y = random.randint(int(window.height * 0.1), int(window.height * 0.9) - self.height)
+    def spawn(self, window, rng=random):
+        self.x = rng.randint(int(window.width * 0.25), int(window.width * 0.75) - self.width)
+        self.y = rng.randint(int(window.height * 0.1), int(window.height * 0.9) - self.height)
         self.is_active = True
 
     def apply_effect(self, ball):
@@ -214,29 +342,56 @@ class PowerUp(Sprite):
         
         if self.type == 'SPEED_BOOST':
             # Aumenta a velocidade em 30%
-            new_speed = current_velocity_magnitude * 1.3
+            new_speed = current_velocity_magnitude * POWERUP_SPEED_FACTOR
             ball.velocity_x = dir_x * new_speed
             ball.velocity_y = dir_y * new_speed
         elif self.type == 'SLOW_BALL':
             # Diminui a velocidade em 30% (inverso do speed boost)
-            new_speed = current_velocity_magnitude / 1.3
+            new_speed = current_velocity_magnitude / POWERUP_SPEED_FACTOR
             # Garantir que não fique mais lenta que a velocidade inicial
             if new_speed < ball.initial_speed:
                 new_speed = ball.initial_speed
             ball.velocity_x = dir_x * new_speed
             ball.velocity_y = dir_y * new_speed
 
-class BallTrail(Sprite):
-    def __init__(self, image, position):
-        super().__init__("assets/images/boost/bola.png", 1)
-        self.image = image.copy()
-        self.image = self.image.convert_alpha()
-        self.x, self.y = position
-        self.lifespan = 0.4
-        self.initial_alpha = 120
+class TrailEmitter:
+    """
+    Rastro da bola: as partículas ficam em vetores de tamanho fixo, reaproveitados em
+    círculo (a mais antiga dá lugar à nova). A imagem da bola é esmaecida uma vez só,
+    em TRAIL_ALPHA_LEVELS níveis de transparência, e o rastro inteiro é desenhado com
+    uma chamada de blits.
+    """
+    def __init__(self, image, capacity=TRAIL_MAX_PARTICLES, lifespan=TRAIL_LIFESPAN):
+        self.lifespan = lifespan
+        self.frames = []
+        for level in range(1, TRAIL_ALPHA_LEVELS + 1):
+            frame = image.copy()
+            frame.set_alpha(round(TRAIL_INITIAL_ALPHA * level / TRAIL_ALPHA_LEVELS))
+            self.frames.append(frame)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.age = np.full(capacity, lifespan)  # idade >= lifespan = posição livre
+        self.slots = np.arange(capacity)
+        self.next_slot = 0
+
+    def emit(self, x, y):
+        slot = self.next_slot
+        self.x[slot], self.y[slot], self.age[slot] = x, y, 0.0
+        self.next_slot = (slot + 1) % len(self.slots)
 
     def update(self, delta_time):
-        self.lifespan -= delta_time
-        self.alpha = self.initial_alpha * (self.lifespan / 0.4)
-        if self.alpha < 0: self.alpha = 0
-        self.image.set_alpha(self.alpha)
\ No newline at end of file
+        np.minimum(self.age + delta_time, self.lifespan, out=self.age)
+
+    def clear(self):
+        self.age.fill(self.lifespan)
+
+    def draw(self):
+        # Da mais antiga para a mais nova, como as partículas foram lançadas
+        order = np.roll(self.slots, -self.next_slot)
+        alive = order[self.age[order] < self.lifespan]
+        if alive.size == 0: return
+        # Nível de transparência proporcional à vida que resta
+        levels = np.ceil((1 - self.age[alive] / self.lifespan) * len(self.frames)).astype(np.intp) - 1
+        frames = map(self.frames.__getitem__, levels.tolist())
+        rects = window.Window.get_screen().blits(zip(frames, zip(self.x[alive].tolist(), self.y[alive].tolist())))
+        for rect in rects: window.Window.register_dirty_rect(rect)
@@ -1,38 +1,102 @@
 # game.py
 import pygame
-import random
 import math
+import os
+import struct
+import time
+import zlib
+from itertools import chain
+from operator import attrgetter
 from PPlay.window import *
 from Constants import *
 from Entities import *
 from Ui_manager import *
+from Profiler import FrameProfiler
+from Asset_loader import BackgroundLoader, load_image
+from Multiball import BallSwarm
+from Ai_policy import create_policy
+from Replay import RandomStreams, Replay, TickInput, input_bits, new_seed
+from Savegame import read_save, write_save
+
+# Estado de simulação do próprio Game no snapshot (o das entidades vem de STATE_FIELDS,
+# ver Entities). Antes destes campos vêm state, last_scorer, active_powerup, o placar e
+# quantos gols há em goal_log, convertidos em números ("BBbIII").
+_GAME_STATE_FIELDS = ("match_time", "goal_pause_timer", "powerup_spawn_timer", "powerup_on_screen_timer",
+                      "rally_hits", "round_start_time", "trail_spawn_timer", "trail_effect_timer", "screen_shake_timer")
+_GAME_STATE_FORMAT = "BBbIII" + "4dI4d"
+_GAME_STATES = {state.value: state for state in GameState}
+
+def _state_getter(fields):
+    """Lê os campos de uma vez (attrgetter, em C), sempre como tupla."""
+    getter = attrgetter(*fields)
+    return getter if len(fields) > 1 else lambda record: (getter(record),)
+
+_headless_window = None
+
+def _get_headless_window():
+    """
+    Sem tela, a Window só dá às entidades o tamanho do campo (e o formato das imagens):
+    uma por processo basta para todas as partidas headless dele (ver Match_server).
+    """
+    global _headless_window
+    if _headless_window is None: _headless_window = Window(WINDOW_WIDTH, WINDOW_HEIGHT, headless=True)
+    return _headless_window
 
 # ======================================================================================
 # --- MANAGER CLASSES (GAME) ---
 # ======================================================================================
 class Game:
-    def __init__(self):
-        self.window = Window(WINDOW_WIDTH, WINDOW_HEIGHT)
-        self.window.set_title(WINDOW_TITLE)
-        self.keyboard = Window.get_keyboard()
-        pygame.mixer.init()
+    def __init__(self, headless=False):
+        self.headless = headless
+        if headless:
+            # Cada partida headless tem a sua entrada (nenhuma tecla, a não ser que alguém a mude)
+            self.window = _get_headless_window()
+            self.keyboard = TickInput()
+        else:
+            self.window = Window(WINDOW_WIDTH, WINDOW_HEIGHT)
+            self.window.set_title(WINDOW_TITLE)
+            self.window.set_dirty_rect_mode(DIRTY_RECT_RENDERING)
+            self.keyboard = Window.get_keyboard()
 
-        self.state = GameState.MAIN_MENU
+        # Com janela, o jogo abre na tela de carregamento e vai ao menu quando os assets dele chegam
+        self.state = GameState.MAIN_MENU if headless else GameState.LOADING
         self.game_mode = None
         self.difficulty = None
-        self.input_locks = {key: False for key in ['escape', 'p', '1', '2', '3', 'return', 'left', 'right', 'a', 'd', 'r']}
+        self.p1_difficulty = None  # Só usado no modo EVE (IA no lado esquerdo)
+        self.p1_policy = self.p2_policy = "chase"  # Políticas da IA (Ai_policy.POLICIES); o menu do PVE usa AI_POLICY
+
+        # Sorteios da partida, todos derivados de uma seed (ver Replay.RandomStreams)
+        self.rng = RandomStreams(0)
+        # Gravação das entradas de cada tick (só com janela, por padrão) e reprodução de um replay
+        self.record_replays = REPLAY_RECORDING and not headless
+        self.replay_dir = REPLAY_DIR
+        self.replay = None
+        self.playback = None
+        self.playback_speed = 1
+        self.match_input = self.keyboard  # O que Paddle.move consulta: o teclado, o replay ou a rede
+        self.netplay = None  # Netplay.RollbackSession da partida PVP em rede
+        self.resimulating = False  # Ticks refeitos pelo rollback não tocam sons nem soltam rastro
+        self.spectators = None  # Spectator.SpectatorServer que transmite a partida para outras telas
+        # A partida com janela é salva a cada AUTOSAVE_INTERVAL segundos, para continuar depois de um travamento
+        self.autosave_path = None if headless else AUTOSAVE_PATH
+        self.next_autosave = 0
+        self._state_struct = None  # Formato do snapshot da partida atual (ver _build_state_layout)
 
         self.clock = pygame.time.Clock()
-        self.ui_manager = UIManager(self.window)
+        # Sem janela visível não há nada para desenhar nem carregar em segundo plano
+        self.assets = None if headless else BackgroundLoader()
+        self.ui_manager = None if headless else UIManager(self.window, self.assets)
+        self.profiler = None if headless else self._create_profiler()
         self.player1 = None
         self.player2 = None
         self.ball = None
+        self.multiball = 0  # Bolas extras do modo multibola (0 = partida normal)
+        self.swarm = None
+        self.max_score = MAX_SCORE
 
-        # Criar os power-ups com tipos específicos
-        self.speed_boost_powerup = PowerUp(BOOST_IMAGE, 'SPEED_BOOST')
-        self.slow_ball_powerup = PowerUp(SLOW_BALL_IMAGE, 'SLOW_BALL')
-        self.powerup_types = [self.speed_boost_powerup, self.slow_ball_powerup]
-        self.powerup_weights = [0.65, 0.35]  # 65% chance para speed boost, 35% para slow
+        self.speed_boost_powerup = self.slow_ball_powerup = None
+        self.powerup_types = []
+        self.powerup_weights = []
         self.active_powerup = None
         self.scores = {"left": 0, "right": 0}
         self.powerup_spawn_timer = 0
@@ -40,7 +104,10 @@ class Game:
         self.last_scorer = "right"
         self.goal_pause_timer = 0
         self.match_time = 0
-        self.ball_trails = []
+        self.goal_log = []  # (tempo da partida, lado que marcou, duração do lance, toques no lance)
+        self.rally_hits = 0
+        self.round_start_time = 0
+        self.ball_trail = None  # TrailEmitter, criado na primeira partida com janela
         self.trail_spawn_timer = 0
         self.trail_effect_timer = 0
         self.screen_shake_timer = 0
@@ -48,170 +115,510 @@ class Game:
         self.p1_char_index = 0
         self.p2_char_index = 1
         self.selecting_for = 1
-        self._load_sounds()
+        self.start_whistle_sound = self.end_whistle_sound = self.kick_sound = self.goal_sound = None
+        if headless:
+            self._create_powerups()
+        else:
+            self._request_match_assets()
 
-    def _load_sounds(self):
-        try:
-            self.start_whistle_sound = pygame.mixer.Sound(START_WHISTLE_SOUND)
-            self.start_whistle_sound.set_volume(0.1)
-            self.end_whistle_sound = pygame.mixer.Sound(END_WHISTLE_SOUND)
-            self.end_whistle_sound.set_volume(0.1)
-            self.kick_sound = pygame.mixer.Sound(KICK_SOUND)
-            self.kick_sound.set_volume(0.1)
-            self.goal_sound = pygame.mixer.Sound(GOAL_SOUND)
-            self.goal_sound.set_volume(0.1)
-        except pygame.error as e:
-            print(f"WARNING: Could not load one or more audio files. Error: {e}")
-            self.start_whistle_sound = self.end_whistle_sound = self.kick_sound = self.goal_sound = None
-
-    def reset_game(self):
+    def _request_match_assets(self):
+        """Pede ao carregador em segundo plano o que só a partida usa: sons e imagens das entidades."""
+        for attribute, path in (("start_whistle_sound", START_WHISTLE_SOUND), ("end_whistle_sound", END_WHISTLE_SOUND),
+                                ("kick_sound", KICK_SOUND), ("goal_sound", GOAL_SOUND)):
+            self.assets.load_sound("match", path, lambda sound, attribute=attribute: self._set_sound(attribute, sound))
+        for path, size in ((BALL_IMAGE, None), (BOOST_IMAGE, POWERUP_SIZE), (SLOW_BALL_IMAGE, POWERUP_SIZE)):
+            self.assets.load_image("match", path, lambda surface: None, size=size)
+        self.assets.call("match", self._request_shadows)
+        self.assets.call("match", self._create_powerups)
+
+    def _request_shadows(self):
+        # O tamanho das sombras depende das imagens, que a esta altura já foram carregadas
+        sizes = {int(load_image(BALL_IMAGE).get_width() * BALL_SHADOW_SCALE)}
+        for char in CHARACTERS:
+            sizes.add(int(load_image(char["image_path"]).get_width() * PADDLE_SHADOW_SCALE))
+        for size in sorted(sizes):
+            self.assets.load_image("match", SHADOW_IMAGE, lambda surface: None, size=(size, size))
+
+    def _set_sound(self, attribute, sound):
+        if sound is None:
+            print(f"WARNING: Could not load audio file for '{attribute}'.")
+            return
+        sound.set_volume(0.1)
+        setattr(self, attribute, sound)
+
+    def _create_powerups(self):
+        # Criar os power-ups com tipos específicos
+        self.speed_boost_powerup = PowerUp(BOOST_IMAGE, 'SPEED_BOOST')
+        self.slow_ball_powerup = PowerUp(SLOW_BALL_IMAGE, 'SLOW_BALL')
+        self.powerup_types = [self.speed_boost_powerup, self.slow_ball_powerup]
+        self.powerup_weights = [POWERUP_WEIGHTS[p.type] for p in self.powerup_types]  # 65% speed boost, 35% slow
+
+    def update_loading(self):
+        """Termina, dentro do orçamento do frame, os assets que já foram decodificados."""
+        if self.assets is None: return
+        self.assets.poll()
+        if self.state == GameState.LOADING and self.assets.is_done("menu"):
+            self.state = GameState.MAIN_MENU
+
+    def reset_game(self, seed=None):
+        """Começa uma partida; com a mesma seed e as mesmas entradas, a partida se repete igual."""
+        if self.assets: self.assets.wait("match")
+        self._finish_recording()
+        self._discard_autosave()
+        self.rng = RandomStreams(new_seed() if seed is None else seed)
         self.scores = {"left": 0, "right": 0}
+        # Nada da partida anterior pode influir nesta (senão o replay não se repete)
+        self.last_scorer = "right"
+        self.powerup_spawn_timer = self.powerup_on_screen_timer = self.goal_pause_timer = 0
+        self.active_powerup = None
         p1_image = CHARACTERS[self.p1_char_index]["image_path"]
         p2_image = CHARACTERS[self.p2_char_index]["image_path"]
         
-        self.player1 = Paddle(p1_image, "left", self.window)
-        if self.game_mode == GameMode.PVE:
+        if self.game_mode == GameMode.EVE:
+            p1_difficulty = DIFFICULTY_SETTINGS[self.p1_difficulty]
+            self.player1 = AI(p1_image, "left", self.window, PLAYER_INITIAL_SPEED, p1_difficulty, create_policy(self.p1_policy, self.p1_difficulty, self.rng.ai))
+        else:
+            self.player1 = Paddle(p1_image, "left", self.window)
+        if self.game_mode in (GameMode.PVE, GameMode.EVE):
             ai_difficulty = DIFFICULTY_SETTINGS[self.difficulty]
-            self.player2 = AI(p2_image, "right", self.window, PLAYER_INITIAL_SPEED, ai_difficulty)
+            self.player2 = AI(p2_image, "right", self.window, PLAYER_INITIAL_SPEED, ai_difficulty,
+                              create_policy(self.p2_policy, self.difficulty, self.rng.ai))
         elif self.game_mode == GameMode.PVP:
             self.player2 = Paddle(p2_image, "right", self.window)
+        if self.profiler:
+            # As decisões da IA aparecem como uma fase própria no painel de tempos
+            for player in (self.player1, self.player2):
+                if isinstance(player, AI): self.profiler.instrument(player.policy, {"target_y": "ai"})
             
         self.ball = Ball(BALL_IMAGE)
+        self.swarm = self._create_swarm() if self.multiball else None
+        self.max_score = MULTIBALL_MAX_SCORE if self.multiball else MAX_SCORE
         self.state = GameState.PLAYING
         self.match_time = 0
-        self.ball_trails = []
+        self.goal_log = []
+        # O rastro é só visual: no modo headless não há o que desenhar
+        if self.ball_trail is None and not self.headless: self.ball_trail = TrailEmitter(self.ball.image)
+        if self.record_replays and not self.playback: self.replay = Replay.from_game(self, self.rng.seed)
+        self.next_autosave = AUTOSAVE_INTERVAL
         self.reset_round()
+        self._build_state_layout()
+
+    def _create_swarm(self):
+        images = None
+        if not self.headless:
+            images = (self.ball.image, (self.speed_boost_powerup.image, self.slow_ball_powerup.image))
+        return BallSwarm(self.multiball, self.ball.image.get_size(), seed=self.rng.multiball.getrandbits(63), images=images)
 
     def reset_round(self):
         direction = 1 if self.last_scorer == "right" else -1
-        self.ball.reset(self.window, direction)
+        self.ball.reset(self.window, direction, self.rng.serve)
         self.player1.reset_position()
         self.player2.reset_position()
+        self.rally_hits = 0
+        self.round_start_time = self.match_time
         if self.active_powerup: self.active_powerup.is_active = False
         self.trail_effect_timer = 0
-        self.ball_trails.clear()
-        if self.start_whistle_sound: self.start_whistle_sound.play()
+        if self.ball_trail: self.ball_trail.clear()
+        self._play(self.start_whistle_sound)
+
+    def _play(self, sound):
+        if sound and not self.resimulating: sound.play()
+
+    def publish_tick(self):
+        """Depois de cada tick: passa a partida aos espectadores, se ela está sendo transmitida."""
+        if self.spectators: self.spectators.publish(self)
+
+    # ----------------------------------------------------------------------------------
+    # Replays
+    # ----------------------------------------------------------------------------------
+    def _finish_recording(self):
+        """Grava o replay da partida em andamento (terminada ou abandonada), se houver."""
+        if self.replay is None: return
+        replay, self.replay = self.replay, None
+        if replay.ticks == 0: return
+        replay.scores = dict(self.scores)
+        path = replay.save(self.replay_dir)
+        if self.headless: print(f"Replay gravado em {path}")
+
+    def _configure_from(self, replay):
+        """Modo, personagens, dificuldades e políticas do cabeçalho de um replay."""
+        self.game_mode = replay.game_mode
+        self.p1_char_index, self.p2_char_index = replay.p1_char_index, replay.p2_char_index
+        self.p1_difficulty, self.difficulty = replay.p1_difficulty, replay.p2_difficulty
+        self.p1_policy, self.p2_policy = replay.p1_policy, replay.p2_policy
+        self.multiball = replay.multiball
+
+    def start_playback(self, replay, speed=1):
+        """Reproduz um replay: a partida é refeita com a mesma seed e as entradas gravadas."""
+        self._finish_recording()
+        self._configure_from(replay)
+        self.playback = self.match_input = replay.input()
+        self.playback_speed = speed
+        self.reset_game(replay.seed)
 
-    def run(self):
+    def stop_playback(self):
+        self.playback = None
+        self.match_input = self.keyboard
+        self.playback_speed = 1
+
+    # ----------------------------------------------------------------------------------
+    # Partida em rede (rollback)
+    # ----------------------------------------------------------------------------------
+    def start_netplay(self, session):
+        """Partida PVP em rede: cada lado joga com o próprio teclado e a sessão troca as entradas."""
+        self._finish_recording()
+        self.stop_playback()
+        self.game_mode, self.multiball = GameMode.PVP, 0
+        self.p1_char_index, self.p2_char_index = session.p1_char_index, session.p2_char_index
+        self.reset_game(session.seed)
+        # Quem grava é a sessão, só com as entradas que os dois lados já confirmaram
+        self.replay = None
+        self.netplay = session
+        self.match_input = session.input
+        session.start(self)
+
+    def stop_netplay(self):
+        if self.netplay is None: return
+        self.netplay.close()
+        self.netplay = None
+        self.match_input = self.keyboard
+
+    # ----------------------------------------------------------------------------------
+    # Snapshot do estado de simulação
+    # ----------------------------------------------------------------------------------
+    def _build_state_layout(self):
+        """
+        Monta, no começo de cada partida, o formato do snapshot: os campos do Game e os de
+        cada entidade, política da IA e gerador de sorteios da partida, num único struct.
+        O enxame do modo multibola fica de fora (não entra no snapshot).
+        """
+        records = [self.ball, self.player1, self.player2, self.speed_boost_powerup, self.slow_ball_powerup]
+        records += [player.policy for player in (self.player1, self.player2) if isinstance(player, AI)]
+        records += [self.rng.serve, self.rng.powerup, self.rng.ai]
+        records = [record for record in records if record.STATE_FIELDS]
+        self._game_state = _state_getter(_GAME_STATE_FIELDS)
+        self._state_getters = [(record, _state_getter(record.STATE_FIELDS)) for record in records]
+        # Onde os valores de cada registro ficam na tupla do unpack
+        self._state_slices = []
+        position = 6 + len(_GAME_STATE_FIELDS)
+        for record in records:
+            self._state_slices.append((record.__dict__, record.STATE_FIELDS, position, position + len(record.STATE_FIELDS)))
+            position += len(record.STATE_FIELDS)
+        self._state_struct = struct.Struct("<" + _GAME_STATE_FORMAT + "".join(record.STATE_FORMAT for record in records))
+        self._checksum_buffer = self.new_state_buffer()
+
+    @property
+    def state_size(self):
+        return self._state_struct.size
+
+    def new_state_buffer(self):
+        """Buffer para snapshot (alocado uma vez e reaproveitado)."""
+        return bytearray(self._state_struct.size)
+
+    def snapshot(self, buffer=None):
+        """
+        Copia só os números da simulação (nada de imagens nem caches) para buffer, de
+        new_state_buffer, e o devolve. restore(buffer) volta a partida exatamente a este
+        tick: é o que o rollback da rede e o salvamento da partida usam.
+        """
+        if buffer is None: buffer = self.new_state_buffer()
+        powerup = self.powerup_types.index(self.active_powerup) if self.active_powerup else -1
+        self._state_struct.pack_into(
+            buffer, 0, self.state.value, self.last_scorer == "left", powerup, self.scores["left"],
+            self.scores["right"], len(self.goal_log), *self._game_state(self),
+            *chain.from_iterable(get(record) for record, get in self._state_getters))
+        return buffer
+
+    def restore(self, buffer):
+        values = self._state_struct.unpack_from(buffer)
+        state, scorer_left, powerup, left, right, goals = values[:6]
+        self.state = _GAME_STATES[state]
+        self.last_scorer = "left" if scorer_left else "right"
+        self.active_powerup = self.powerup_types[powerup] if powerup >= 0 else None
+        self.scores["left"], self.scores["right"] = left, right
+        del self.goal_log[goals:]
+        self.__dict__.update(zip(_GAME_STATE_FIELDS, values[6:]))
+        for attributes, fields, start, end in self._state_slices:
+            attributes.update(zip(fields, values[start:end]))
+
+    def checksum(self):
+        """CRC32 do snapshot, para os dois lados da rede conferirem que não divergiram."""
+        return zlib.crc32(self.snapshot(self._checksum_buffer))
+
+    # ----------------------------------------------------------------------------------
+    # Partida salva
+    # ----------------------------------------------------------------------------------
+    def save_match(self, path):
+        """Grava a partida em andamento (ver Savegame) para resume_match continuar do mesmo tick."""
+        if self.swarm or self.netplay: raise ValueError("partidas multibola ou em rede não podem ser salvas")
+        replay = self.replay or Replay.from_game(self, self.rng.seed)
+        write_save(path, replay, self.snapshot(), self.goal_log)
+
+    def resume_match(self, path):
+        """Continua uma partida gravada por save_match; com janela, ela volta pausada."""
+        replay, snapshot, goal_log = read_save(path)
+        self._finish_recording()
+        self.stop_playback()
+        self._configure_from(replay)
+        self.reset_game(replay.seed)
+        if len(snapshot) != self.state_size: raise ValueError("a partida salva é de outra versão do jogo")
+        self.restore(snapshot)
+        self.goal_log = goal_log
+        # A gravação continua de onde parou (sem as entradas até aqui, o replay não se repetiria)
+        self.replay = replay if self.replay and replay.ticks else None
+        if self.autosave_path: self._autosave()  # reset_game apagou o autosave de onde ela veio
+        if not self.headless and self.state == GameState.PLAYING: self.state = GameState.PAUSED
+
+    def _autosave(self):
+        self.next_autosave = self.match_time + AUTOSAVE_INTERVAL
+        if self.swarm or self.netplay or self.playback: return
+        self.save_match(self.autosave_path)
+
+    def _discard_autosave(self):
+        """A partida acabou (ou foi abandonada): não há o que continuar."""
+        if self.autosave_path and os.path.exists(self.autosave_path): os.remove(self.autosave_path)
+
+    def _create_profiler(self):
+        """Cronometra as fases do frame e os métodos de desenho do UIManager."""
+        profiler = FrameProfiler()
+        profiler.instrument(self, {"handle_input": "input", "update": "update"})
+        profiler.instrument(self.window, {"update": "present"})
+        profiler.instrument(self.ui_manager, {"draw": "draw",
+                                              "_draw_play_background": "draw.background",
+                                              "_draw_game_elements": "draw.elements",
+                                              "_draw_game_ui": "draw.hud",
+                                              "_draw_text_with_shadow": "draw.text"})
+        return profiler
+
+    def run(self, profile_csv=None):
+        """profile_csv: arquivo onde os tempos dos últimos frames são gravados ao sair."""
+        try:
+            self._run_loop()
+        except SystemExit:
+            # Janela fechada: saída normal. Num travamento o último autosave fica para --resume
+            self._discard_autosave()
+            raise
+        finally:
+            self.stop_netplay()
+            self._finish_recording()
+            if self.spectators: self.spectators.close()
+            if profile_csv: self.profiler.write_csv(profile_csv)
+
+    def _run_loop(self):
+        # Passo fixo: o tempo real de cada frame entra num acumulador, que é
+        # consumido em ticks de SIM_DELTA_TIME; o que sobra vira a interpolação.
+        accumulator = 0
+        previous_time = time.perf_counter()
         while True:
-            delta_time = self.window.delta_time()
             self.clock.tick(FPS_LIMIT)
+            self.profiler.begin_frame()
+            current_time = time.perf_counter()
+            delta_time = min(current_time - previous_time, MAX_FRAME_TIME)
+            previous_time = current_time
 
+            self.update_loading()
             self.handle_input()
-            self.update(delta_time)
+            if self.playback and self.playback_speed == 0:
+                # Replay sem limite: simula o quanto couber no orçamento do frame
+                deadline = time.perf_counter() + PLAYBACK_FRAME_BUDGET
+                while self.playback and self.state in (GameState.PLAYING, GameState.GOAL) and time.perf_counter() < deadline:
+                    self.update(SIM_DELTA_TIME)
+                    self.publish_tick()
+                accumulator = 0
+            else:
+                accumulator += delta_time * (self.playback_speed if self.playback else 1)
+            while accumulator >= SIM_DELTA_TIME:
+                # Em rede, a sessão decide o que simular (e se precisa refazer ticks já simulados)
+                if self.netplay: self.netplay.tick()
+                else: self.update(SIM_DELTA_TIME)
+                self.publish_tick()
+                accumulator -= SIM_DELTA_TIME
+
+            # Fora do PLAYING as posições anteriores não são atualizadas: interpolar faria tudo deslizar e voltar
+            interpolation = accumulator / SIM_DELTA_TIME if self.state == GameState.PLAYING else 1.0
+            self.draw_frame(delta_time, interpolation)
+            self.profiler.end_frame()
+
+    def draw_frame(self, delta_time, interpolation):
+        """Desenha e apresenta um frame do estado atual."""
+        game_data = {
+            "scores": self.scores, "match_time": self.match_time, "player1": self.player1,
+            "player2": self.player2, "ball": self.ball, "swarm": self.swarm, "ball_trail": self.ball_trail,
+            "active_powerup": self.active_powerup, "screen_shake_timer": self.screen_shake_timer,
+            "screen_shake_intensity": self.screen_shake_intensity,
+            "p1_char_index": self.p1_char_index, "p2_char_index": self.p2_char_index,
+            "selecting_for": self.selecting_for, "game_mode": self.game_mode,
+            "delta_time": delta_time, "interpolation": interpolation, "effects_rng": self.rng.effects,
+            "loading_progress": self.assets.progress() if self.assets else 1.0
+        }
+        self.ui_manager.draw(self.state, game_data)
+        if self.profiler and self.profiler.overlay_visible: self.profiler.draw_overlay(self.ui_manager)
 
-            game_data = {
-                "scores": self.scores, "match_time": self.match_time, "player1": self.player1,
-                "player2": self.player2, "ball": self.ball, "ball_trails": self.ball_trails,
-                "active_powerup": self.active_powerup, "screen_shake_timer": self.screen_shake_timer,
-                "screen_shake_intensity": self.screen_shake_intensity,
-                "p1_char_index": self.p1_char_index, "p2_char_index": self.p2_char_index,
-                "selecting_for": self.selecting_for, "game_mode": self.game_mode,
-                "delta_time": delta_time
-            }
-            self.ui_manager.draw(self.state, game_data)
+        self.window.update()
 
-            self.window.update()
+    def start_headless_match(self, p1_char_index, p2_char_index, p1_difficulty, p2_difficulty, multiball=0,
+                             p1_policy="chase", p2_policy="chase", seed=None):
+        """Prepara uma partida IA vs IA, sem passar pelos menus (multiball = bolas extras, seed = sorteios)."""
+        self.game_mode = GameMode.EVE
+        self.multiball = multiball
+        self.p1_policy, self.p2_policy = p1_policy, p2_policy
+        self.p1_char_index, self.p2_char_index = p1_char_index, p2_char_index
+        self.p1_difficulty, self.difficulty = p1_difficulty, p2_difficulty
+        self.reset_game(seed)
+
+    def run_headless(self, max_ticks=None, speed=0):
+        """
+        Simula a partida atual sem desenhar nem limitar o FPS.
+        Cada tick avança SIM_DELTA_TIME segundos de jogo; speed > 0 limita a
+        simulação a speed vezes o tempo real (0 = sem limite).
+        Retorna (ticks simulados, segundos de relógio gastos).
+        """
+        ticks = 0
+        start = time.perf_counter()
+        while self.state != GameState.GAME_OVER and (max_ticks is None or ticks < max_ticks):
+            self.update(SIM_DELTA_TIME)
+            self.publish_tick()
+            ticks += 1
+            if speed > 0:
+                ahead = ticks * SIM_DELTA_TIME / speed - (time.perf_counter() - start)
+                if ahead > 0: time.sleep(ahead)
+        return ticks, time.perf_counter() - start
 
     def handle_input(self):
-        for key in self.input_locks:
-            if not self.keyboard.key_pressed(key.upper()):
-                self.input_locks[key] = False
+        # O teclado é lido uma vez por frame (Window.update); aqui só se consulta o retrato
+        if self.keyboard.just_pressed(PROFILER_HOTKEY) and self.profiler:
+            self.profiler.toggle_overlay()
+            self.window.request_full_update()
 
-        if self._is_key_pressed('escape'):
+        if self.keyboard.just_pressed('escape'):
             if self.state in [GameState.PLAYING, GameState.PAUSED, GameState.GOAL, GameState.GAME_OVER, GameState.RULES, GameState.CHARACTER_SELECTION, GameState.DIFFICULTY_MENU]:
+                self._finish_recording()
+                self._discard_autosave()
+                self.stop_playback()
+                self.stop_netplay()
                 self.state = GameState.MAIN_MENU
                 self.selecting_for = 1
             else:
                 self.window.close()
+
+        if self.playback:
+            # Na reprodução as teclas não movem os jogadores; só escolhem a velocidade
+            for key, speed in zip(('1', '8', '0'), REPLAY_SPEEDS):
+                if self.keyboard.just_pressed(key): self.playback_speed = speed
+            return
+
+        if self.netplay:
+            # Em rede não há pausa nem revanche; se o outro lado sair no meio da partida, volta ao menu
+            if self.netplay.peer_left:
+                match_over = self.netplay.match_over
+                self.stop_netplay()
+                if not match_over:
+                    print("O outro jogador saiu da partida.")
+                    self.state = GameState.MAIN_MENU
+            return
         
         if self.state == GameState.MAIN_MENU:
-            if self._is_key_pressed('1'): self.game_mode, self.state = GameMode.PVE, GameState.CHARACTER_SELECTION
-            elif self._is_key_pressed('2'): self.game_mode, self.state = GameMode.PVP, GameState.CHARACTER_SELECTION
-            elif self._is_key_pressed('3'): self.state = GameState.RULES
+            if self.keyboard.just_pressed('1'): self.game_mode, self.multiball, self.state = GameMode.PVE, 0, GameState.CHARACTER_SELECTION
+            elif self.keyboard.just_pressed('2'): self.game_mode, self.multiball, self.state = GameMode.PVP, 0, GameState.CHARACTER_SELECTION
+            elif self.keyboard.just_pressed('3'): self.state = GameState.RULES
+            elif self.keyboard.just_pressed('4'): self.game_mode, self.multiball, self.state = GameMode.PVE, MULTIBALL_BALLS, GameState.CHARACTER_SELECTION
+            if self.game_mode == GameMode.PVE: self.p2_policy = AI_POLICY
         
         elif self.state == GameState.CHARACTER_SELECTION:
             if self.game_mode == GameMode.PVE: self._handle_pve_character_selection()
             elif self.game_mode == GameMode.PVP: self._handle_pvp_character_selection()
         
         elif self.state == GameState.DIFFICULTY_MENU:
-            if self._is_key_pressed('1'): self.difficulty = "Easy"; self.reset_game()
-            elif self._is_key_pressed('2'): self.difficulty = "Medium"; self.reset_game()
-            elif self._is_key_pressed('3'): self.difficulty = "Hard"; self.reset_game()
+            if self.keyboard.just_pressed('1'): self.difficulty = "Easy"; self.reset_game()
+            elif self.keyboard.just_pressed('2'): self.difficulty = "Medium"; self.reset_game()
+            elif self.keyboard.just_pressed('3'): self.difficulty = "Hard"; self.reset_game()
         
         elif self.state == GameState.PLAYING:
-            self.player1.move("W", "S", self.keyboard)
-            if self.game_mode == GameMode.PVP: self.player2.move("UP", "DOWN", self.keyboard)
-            if self._is_key_pressed('p'): self.state = GameState.PAUSED
+            if self.keyboard.just_pressed('p'): self.state = GameState.PAUSED
         
         elif self.state == GameState.PAUSED:
-            if self._is_key_pressed('p'):
+            if self.keyboard.just_pressed('p'):
                 self.state = GameState.PLAYING
-            if self._is_key_pressed('r'):
+            if self.keyboard.just_pressed('r'):
                 self.reset_game()
             
         elif self.state == GameState.GAME_OVER:
-            if self._is_key_pressed('return'): self.reset_game()
-
-    def _is_key_pressed(self, key):
-        if self.keyboard.key_pressed(key.upper()) and not self.input_locks[key]:
-            self.input_locks[key] = True
-            return True
-        return False
-    
+            if self.keyboard.just_pressed('return'): self.reset_game()
+
     def _handle_pve_character_selection(self):
-        if self._is_key_pressed('right'):
+        if self.keyboard.just_pressed('right'):
             if self.selecting_for == 1: self.p1_char_index = (self.p1_char_index + 1) % len(CHARACTERS)
             elif self.selecting_for == 2: self.p2_char_index = (self.p2_char_index + 1) % len(CHARACTERS)
-        if self._is_key_pressed('left'):
+        if self.keyboard.just_pressed('left'):
             if self.selecting_for == 1: self.p1_char_index = (self.p1_char_index - 1) % len(CHARACTERS)
             elif self.selecting_for == 2: self.p2_char_index = (self.p2_char_index - 1) % len(CHARACTERS)
-        if self._is_key_pressed('return'):
+        if self.keyboard.just_pressed('return'):
             self.selecting_for += 1
             if self.selecting_for > 2:
                 self.state = GameState.DIFFICULTY_MENU
 
     def _handle_pvp_character_selection(self):
-        if self._is_key_pressed('d'): self.p1_char_index = (self.p1_char_index + 1) % len(CHARACTERS)
-        if self._is_key_pressed('a'): self.p1_char_index = (self.p1_char_index - 1) % len(CHARACTERS)
-        if self._is_key_pressed('right'): self.p2_char_index = (self.p2_char_index + 1) % len(CHARACTERS)
-        if self._is_key_pressed('left'): self.p2_char_index = (self.p2_char_index - 1) % len(CHARACTERS)
-        if self._is_key_pressed('return'):
+        if self.keyboard.just_pressed('d'): self.p1_char_index = (self.p1_char_index + 1) % len(CHARACTERS)
+        if self.keyboard.just_pressed('a'): self.p1_char_index = (self.p1_char_index - 1) % len(CHARACTERS)
+        if self.keyboard.just_pressed('right'): self.p2_char_index = (self.p2_char_index + 1) % len(CHARACTERS)
+        if self.keyboard.just_pressed('left'): self.p2_char_index = (self.p2_char_index - 1) % len(CHARACTERS)
+        if self.keyboard.just_pressed('return'):
             self.reset_game()
 
     def update(self, delta_time):
+        # Salva entre dois ticks, com o estado e o replay no mesmo ponto
+        if self.autosave_path and self.state == GameState.PLAYING and self.match_time >= self.next_autosave:
+            self._autosave()
         if self.screen_shake_timer > 0: self.screen_shake_timer -= delta_time
         
+        if self.state in (GameState.PLAYING, GameState.GOAL):
+            # Uma entrada por tick de partida: gravada da entrada da partida (teclado ou rede) ou lida do replay
+            if self.playback:
+                if not self.playback.advance():
+                    # As entradas acabaram antes do fim (partida abandonada na gravação)
+                    self.stop_playback()
+                    self.state = GameState.MAIN_MENU
+                    return
+            elif self.replay:
+                self.replay.record(input_bits(self.match_input))
+
         if self.state == GameState.PLAYING:
             self.match_time += delta_time
-            if self.game_mode == GameMode.PVE: self.player2.move(self.ball)
+            self.ball.store_previous_position()
+            self.player1.store_previous_position()
+            self.player2.store_previous_position()
+
+            # No modo multibola a IA segue a bola (do enxame ou a principal) que chega primeiro
+            if self.game_mode == GameMode.EVE: self.player1.move(self.ball, delta_time, self.swarm and self.swarm.target_y(self.player1, self.ball))
+            else: self.player1.move("W", "S", self.match_input, delta_time)
+            if self.game_mode == GameMode.PVP: self.player2.move("UP", "DOWN", self.match_input, delta_time)
+            else: self.player2.move(self.ball, delta_time, self.swarm and self.swarm.target_y(self.player2, self.ball))
             self.player1.update_effects(delta_time)
             self.player2.update_effects(delta_time)
 
+            # Os tempos do rastro estão no snapshot (e no checksum da rede): avançam em todo tick,
+            # com ou sem janela e também nos ticks refeitos; só as partículas ficam de fora
+            draw_trail = self.ball_trail and not self.resimulating
             if self.trail_effect_timer > 0:
                 self.trail_effect_timer -= delta_time
                 self.trail_spawn_timer += delta_time
-                if self.trail_spawn_timer > 0.02:
-                    self.ball_trails.append(BallTrail(self.ball.image, (self.ball.x, self.ball.y)))
+                if self.trail_spawn_timer > TRAIL_SPAWN_INTERVAL:
+                    if draw_trail: self.ball_trail.emit(self.ball.x, self.ball.y)
                     self.trail_spawn_timer = 0
-            
-            self.ball_trails = [trail for trail in self.ball_trails if trail.lifespan > 0]
-            for trail in self.ball_trails:
-                trail.update(delta_time)
+            if draw_trail: self.ball_trail.update(delta_time)
 
-            ball_status = self.ball.move(self.window)
+            # Os toques nos jogadores são resolvidos dentro do passo, antes de ver se foi gol
+            ball_status = self.ball.move(self.window, delta_time, (self.player1, self.player2))
+            if self.ball.paddles_hit:
+                self.rally_hits += 1
+                for paddle in self.ball.paddles_hit: paddle.trigger_squash()
+                self._play(self.kick_sound)
             if ball_status:
                 self._handle_goal(ball_status)
                 return
 
-            collided_p1 = self.ball.handle_paddle_collision(self.player1)
-            collided_p2 = self.ball.handle_paddle_collision(self.player2)
-            if collided_p1 or collided_p2:
-                if collided_p1: self.player1.trigger_squash()
-                if collided_p2: self.player2.trigger_squash()
-                if self.kick_sound: self.kick_sound.play()
-            
             self._update_powerups(delta_time)
+            if self.swarm: self._update_swarm(delta_time)
             
         elif self.state == GameState.GOAL:
             self.goal_pause_timer -= delta_time
@@ -219,19 +626,36 @@ class Game:
                 self.state = GameState.PLAYING
                 self.reset_round()
 
+    def _update_swarm(self, delta_time):
+        """As bolas extras não pausam a partida: cada gol conta e a bola volta ao meio na hora."""
+        goals_left, goals_right, hits = self.swarm.step(delta_time, (self.player1, self.player2))
+        self.scores["left"] += goals_left
+        self.scores["right"] += goals_right
+        for paddle, count in zip((self.player1, self.player2), hits):
+            if count: paddle.trigger_squash()
+        if any(hits): self._play(self.kick_sound)
+        if max(self.scores.values()) >= self.max_score:
+            self.state = GameState.GAME_OVER
+            self._finish_recording()
+            self._discard_autosave()
+            self._play(self.end_whistle_sound)
+
     def _handle_goal(self, ball_status):
-        if self.goal_sound: self.goal_sound.play()
+        self._play(self.goal_sound)
         self.screen_shake_timer = 0.3
         scoring_side = "left" if ball_status == "goal_left" else "right"
         self.last_scorer = "left" if scoring_side == "right" else "right"
         self.scores[scoring_side] += 1
+        self.goal_log.append((self.match_time, scoring_side, self.match_time - self.round_start_time, self.rally_hits))
         
-        if self.scores[scoring_side] >= MAX_SCORE:
+        if self.scores[scoring_side] >= self.max_score:
             self.state = GameState.GAME_OVER
-            if self.end_whistle_sound: self.end_whistle_sound.play()
+            self._finish_recording()
+            self._discard_autosave()
+            self._play(self.end_whistle_sound)
         else:
             self.state = GameState.GOAL
-            self.goal_pause_timer = 1.5
+            self.goal_pause_timer = GOAL_PAUSE_DURATION
 
     def _update_powerups(self, delta_time):
         if self.active_powerup and self.active_powerup.is_active:
@@ -248,18 +672,18 @@ class Game:
                 # Verificar se a bola está com velocidade maior que a inicial
                 current_speed = math.sqrt(self.ball.velocity_x**2 + self.ball.velocity_y**2)
                 # Só pode aparecer SLOW_BALL se a velocidade for pelo menos 20% maior que a inicial
-                is_boosted = current_speed > self.ball.initial_speed * 1.2
+                is_boosted = current_speed > self.ball.initial_speed * POWERUP_BOOSTED_THRESHOLD
                 
                 if not is_boosted:
                     # Se a bola está na velocidade inicial ou menor, só pode aparecer SPEED_BOOST
                     self.active_powerup = self.speed_boost_powerup
                 else:
                     # Se a bola está boosted, pode aparecer qualquer power-up com as probabilidades normais
-                    self.active_powerup = random.choices(self.powerup_types, self.powerup_weights, k=1)[0]
+                    self.active_powerup = self.rng.powerup.choices(self.powerup_types, self.powerup_weights, k=1)[0]
                 
-                self.active_powerup.spawn(self.window)
+                self.active_powerup.spawn(self.window, self.rng.powerup)
 
-        if self.active_powerup and self.active_powerup.is_active and self.ball.collided(self.active_powerup):
+        if self.active_powerup and self.active_powerup.is_active and self.ball.path_collided(self.active_powerup):
             if self.active_powerup.type == 'SPEED_BOOST':
                 self.trail_effect_timer = TRAIL_EFFECT_DURATION
             self.active_powerup.apply_effect(self.ball)
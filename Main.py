@@ -1,9 +1,290 @@
 # main.py
-from Game import Game
+import argparse
+import os
+import sys
+
+# ======================================================================================
+# --- COMMAND LINE ---
+# ======================================================================================
+def parse_args(argv=None):
+    # Os nomes vêm direto das constantes, mas Constants importa só os/enum (barato)
+    from Constants import (AUTOSAVE_PATH, CHARACTERS, DIFFICULTY_SETTINGS, MATCH_SERVER_PORT, NETPLAY_PORT,
+                           SPECTATOR_PORT, SPECTATOR_RATE)
+    from Ai_policy import POLICIES
+    character_names = [char["name"] for char in CHARACTERS]
+
+    parser = argparse.ArgumentParser(description="FutePong")
+    parser.add_argument("--headless", action="store_true",
+                        help="simula uma partida IA vs IA sem janela, som ou limite de FPS")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help="número máximo de ticks simulados (padrão: até o fim da partida)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="multiplicador do tempo real no modo headless (0 = sem limite)")
+    parser.add_argument("--p1", choices=character_names, default=character_names[0])
+    parser.add_argument("--p2", choices=character_names, default=character_names[1])
+    parser.add_argument("--p1-difficulty", choices=list(DIFFICULTY_SETTINGS), default="Hard")
+    parser.add_argument("--p2-difficulty", choices=list(DIFFICULTY_SETTINGS), default="Hard")
+    parser.add_argument("--p1-policy", choices=list(POLICIES), default="chase", help="política da IA da esquerda")
+    parser.add_argument("--p2-policy", choices=list(POLICIES), default="chase", help="política da IA da direita")
+    parser.add_argument("--multiball", type=int, default=0,
+                        help="bolas extras na partida headless (modo multibola)")
+    parser.add_argument("--tournament", action="store_true",
+                        help="roda todos os confrontos personagens x dificuldades em paralelo e gera NDJSON")
+    parser.add_argument("--matches", type=int, default=4, help="partidas por confronto no torneio")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed da partida headless / seed base do torneio (padrão: sorteada / 0)")
+    parser.add_argument("--record", metavar="PASTA", default=None, help="grava o replay da partida headless nesta pasta")
+    parser.add_argument("--replay", nargs="+", metavar="ARQUIVO", default=None,
+                        help="reproduz replays (com --headless: refaz todos sem limite e confere os placares)")
+    parser.add_argument("--replay-speed", type=int, choices=[1, 8, 0], default=1,
+                        help="velocidade da reprodução com janela (0 = sem limite)")
+    parser.add_argument("--resume", nargs="?", const=AUTOSAVE_PATH, default=None, metavar="ARQUIVO",
+                        help=f"continua uma partida salva (padrão: {AUTOSAVE_PATH}, a última partida com janela interrompida)")
+    parser.add_argument("--host", type=int, nargs="?", const=NETPLAY_PORT, default=None, metavar="PORTA",
+                        help=f"hospeda uma partida PVP em rede nesta porta (padrão: {NETPLAY_PORT}); personagens de --p1/--p2")
+    parser.add_argument("--join", metavar="ENDEREÇO[:PORTA]", default=None, help="entra na partida PVP em rede de outro computador")
+    parser.add_argument("--latency-ms", type=float, default=0, help="atraso de mentira em cada pacote enviado (teste da rede)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="atraso extra sorteado até este valor (teste da rede)")
+    parser.add_argument("--loss", type=float, default=0, help="fração de pacotes enviados perdidos de propósito (teste da rede)")
+    parser.add_argument("--spectate", type=int, nargs="?", const=SPECTATOR_PORT, default=None, metavar="PORTA",
+                        help=f"transmite a partida para telas de espectadores (--watch) nesta porta (padrão: {SPECTATOR_PORT})")
+    parser.add_argument("--spectator-rate", type=int, default=SPECTATOR_RATE, help="quadros de estado por segundo da transmissão")
+    parser.add_argument("--watch", metavar="ENDEREÇO[:PORTA]", default=None,
+                        help="abre uma tela de espectador da partida transmitida por outro computador")
+    parser.add_argument("--server", type=int, nargs="?", const=MATCH_SERVER_PORT, default=None, metavar="PORTA",
+                        help=f"hospeda, sem janela, partidas de muitos jogadores (--play-server) nesta porta (padrão: {MATCH_SERVER_PORT})")
+    parser.add_argument("--play-server", metavar="ENDEREÇO[:PORTA]", default=None,
+                        help="joga uma partida hospedada por um servidor de partidas (personagem de --p1)")
+    parser.add_argument("--mode", choices=["PVE", "PVP"], default="PVE",
+                        help="modo da partida pedida com --play-server (no PVE, a IA usa --p2-difficulty)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos do torneio ou do servidor de partidas (padrão: um por núcleo)")
+    parser.add_argument("--output", default=None,
+                        help="arquivo NDJSON do torneio ou dos relatórios de carga do servidor (padrão: stdout)")
+    parser.add_argument("--profile-csv", default=None,
+                        help="grava os tempos por fase dos últimos frames neste CSV ao sair")
+    args = parser.parse_args(argv)
+    args.p1_index = character_names.index(args.p1)
+    args.p2_index = character_names.index(args.p2)
+    return args
+
+def open_spectators(game, args):
+    """Com --spectate, a partida é transmitida (ver Spectator); sem janela, ela passa a andar em tempo real."""
+    if args.spectate is None: return
+    from Spectator import SpectatorServer
+    game.spectators = SpectatorServer(args.spectate, args.spectator_rate)
+    print(f"Transmitindo para espectadores na porta {game.spectators.port}")
+    if args.speed == 0: args.speed = 1
+
+def close_spectators(game):
+    if game.spectators is None: return
+    stats = game.spectators.stats()
+    game.spectators.close()
+    game.spectators = None
+    print(f"Transmissão: {stats['frames']} quadros; enviados {stats['keyframes']} completos (média de "
+          f"{stats['keyframe_bytes']} bytes) e {stats['deltas']} diferenças (média de {stats['delta_bytes']} bytes), "
+          f"{stats['broadcast_us']} µs por quadro")
+
+def run_headless(args):
+    from Game import Game
+    from Constants import SIM_TICK_RATE
+
+    game = Game(headless=True)
+    if args.record: game.record_replays, game.replay_dir = True, args.record
+    open_spectators(game, args)
+    game.start_headless_match(args.p1_index, args.p2_index, args.p1_difficulty, args.p2_difficulty, args.multiball,
+                              args.p1_policy, args.p2_policy, args.seed)
+    ticks, elapsed = game.run_headless(max_ticks=args.ticks, speed=args.speed)
+    game._finish_recording()  # partida cortada por --ticks também é gravada
+    close_spectators(game)
+
+    simulated_seconds = ticks / SIM_TICK_RATE
+    ticks_per_second = ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"Placar: {args.p1} {game.scores['left']} x {game.scores['right']} {args.p2} "
+          f"({simulated_seconds:.1f}s de jogo)")
+    print(f"{ticks} ticks em {elapsed:.3f}s: {ticks_per_second:.0f} ticks/s "
+          f"({simulated_seconds / elapsed if elapsed > 0 else float('inf'):.0f}x tempo real)")
+    for name, player in ((args.p1, game.player1), (args.p2, game.player2)):
+        stats = player.policy.stats()
+        if not stats["decisions"]:
+            # Ex.: no multibola a IA pode seguir só o enxame (BallSwarm.target_y), sem consultar a política
+            print(f"IA {name} ({stats['policy']}): nenhuma decisão da política")
+            continue
+        print(f"IA {name} ({stats['policy']}): {stats['mean_us']} µs por decisão, pior {stats['worst_us']} µs, "
+              f"{stats['over_budget']}/{stats['decisions']} acima do orçamento")
+
+def run_resumed_headless(args):
+    """Continua uma partida salva sem janela até o fim (ou --ticks)."""
+    from Game import Game
+    from Constants import SIM_TICK_RATE
+
+    game = Game(headless=True)
+    if args.record: game.record_replays, game.replay_dir = True, args.record
+    open_spectators(game, args)
+    game.resume_match(args.resume)
+    resumed_at = game.match_time
+    ticks, elapsed = game.run_headless(max_ticks=args.ticks, speed=args.speed)
+    game._finish_recording()
+    close_spectators(game)
+    print(f"Placar: {game.scores['left']} x {game.scores['right']} "
+          f"(continuada aos {resumed_at:.1f}s, {ticks / SIM_TICK_RATE:.1f}s de jogo em {elapsed:.3f}s)")
+
+def run_replays(args):
+    """Refaz cada replay sem janela e sem limite, e confere o placar com o gravado."""
+    from Game import Game
+    from Replay import Replay
+
+    game = Game(headless=True)
+    diverged = 0
+    for path in args.replay:
+        replay = Replay.load(path)
+        game.start_playback(replay, speed=0)
+        ticks, elapsed = game.run_headless(max_ticks=replay.ticks)
+        game.stop_playback()
+        same = game.scores == replay.scores
+        if not same: diverged += 1
+        print(f"{path}: {game.scores['left']} x {game.scores['right']} "
+              f"({'confere' if same else 'DIVERGIU do gravado ' + str(replay.scores)}), "
+              f"{ticks} ticks em {elapsed:.3f}s")
+    return 1 if diverged else 0
+
+def connect_netplay(args, headless):
+    """Abre a conexão (--host ou --join) e espera o outro lado; devolve a sessão ou None."""
+    from Constants import NETPLAY_PORT
+    from Netplay import LossyTransport, UdpTransport, ball_follower, host_match, join_match, keyboard_input
+
+    if args.host is not None:
+        transport = UdpTransport(args.host)
+        print(f"Esperando o outro jogador na porta {transport.port}...")
+    else:
+        address, _, port = args.join.partition(":")
+        transport = UdpTransport(0, (address, int(port) if port else NETPLAY_PORT))
+        print(f"Conectando a {address}:{port or NETPLAY_PORT}...")
+    if args.latency_ms or args.jitter_ms or args.loss:
+        transport = LossyTransport(transport, args.latency_ms, args.jitter_ms, args.loss)
+
+    # Sem janela, quem joga é um jogador automático
+    side = "left" if args.host is not None else "right"
+    local_input = ball_follower(side) if headless else keyboard_input
+    if args.host is not None: session = host_match(transport, args.p1_index, args.p2_index, args.seed, local_input=local_input)
+    else: session = join_match(transport, local_input=local_input)
+    if session is None:
+        print("O outro jogador não respondeu.")
+        transport.close()
+    return session
+
+def run_netplay_headless(args):
+    """Partida em rede sem janela (em tempo real), para testar a rede entre dois processos."""
+    from Game import Game
+    from Netplay import play_headless
+
+    game = Game(headless=True)
+    if args.record: game.record_replays, game.replay_dir = True, args.record
+    session = connect_netplay(args, headless=True)
+    if session is None: return 1
+    open_spectators(game, args)
+    game.start_netplay(session)
+    play_headless(session, args.ticks)
+    left = session.peer_left and not session.match_over and (args.ticks is None or session.confirmed < args.ticks)
+    stats = session.stats()
+    game.stop_netplay()
+    close_spectators(game)
+
+    print(f"Placar: {game.scores['left']} x {game.scores['right']} ({stats['confirmed']} ticks confirmados)"
+          + (" - o outro jogador saiu antes do fim" if left else ""))
+    print(f"RTT {stats['rtt_ms']} ms, atraso {stats['input_delay']} ticks, {stats['rollbacks']} rollbacks "
+          f"({stats['resimulated']} ticks refeitos, o maior de {stats['max_rollback']}), {stats['stalls']} ticks segurados, "
+          f"{stats['desyncs']}/{stats['checks']} conferências divergentes")
+    return 1 if stats["desyncs"] or left else 0
+
+def run_watch(args):
+    """Tela de espectador (--watch): desenha a partida transmitida por outro FutePong (--spectate)."""
+    import asyncio
+    from Constants import SPECTATOR_PORT
+    from Spectator import watch
+
+    address, _, port = args.watch.partition(":")
+    print(f"Assistindo à transmissão de {address}:{port or SPECTATOR_PORT} (ESC para sair)")
+    asyncio.run(watch(address, int(port) if port else SPECTATOR_PORT))
+
+def run_server(args):
+    """Servidor de partidas (--server): hospeda sem janela as partidas dos jogadores (--play-server)."""
+    from Match_server import MatchServer
+
+    print(f"Servidor de partidas na porta {args.server} (Ctrl+C para sair)", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as output:
+            MatchServer(args.server, args.workers, output=output).run()
+    else:
+        MatchServer(args.server, args.workers).run()
+
+def run_play_server(args):
+    """Joga (com janela) uma partida hospedada por um servidor de partidas (--server)."""
+    import asyncio
+    from Constants import MATCH_SERVER_PORT, GameMode
+    from Match_server import play
+
+    address, _, port = args.play_server.partition(":")
+    print(f"Pedindo uma partida {args.mode} a {address}:{port or MATCH_SERVER_PORT} (ESC para sair)")
+    client = asyncio.run(play(address, int(port) if port else MATCH_SERVER_PORT, GameMode[args.mode],
+                              args.p1_index, args.p2_difficulty))
+    if client is None: sys.exit("O servidor de partidas não respondeu")
+    if client.timed_out: sys.exit("O servidor de partidas parou de responder")
+
+def run_tournament(args):
+    from Tournament import run_tournament
+    from Constants import SIM_TICK_RATE
+
+    # No torneio, --ticks limita cada partida (padrão: 10 minutos de jogo)
+    max_ticks = args.ticks or SIM_TICK_RATE * 600
+    seed = args.seed or 0
+    if args.output:
+        with open(args.output, "w") as output:
+            run_tournament(args.matches, seed, max_ticks, args.workers, output, (args.p1_policy, args.p2_policy))
+    else:
+        run_tournament(args.matches, seed, max_ticks, args.workers, policies=(args.p1_policy, args.p2_policy))
 
 # ======================================================================================
 # --- MAIN EXECUTION ---
 # ======================================================================================
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    args = parse_args()
+    if args.resume and not os.path.exists(args.resume):
+        sys.exit(f"Nenhuma partida salva em {args.resume}")
+    if args.tournament:
+        run_tournament(args)
+    elif args.server is not None:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        run_server(args)
+    elif args.headless:
+        # Precisa ser definido antes do primeiro import do pygame
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        if args.replay: sys.exit(run_replays(args))
+        if args.host is not None or args.join: sys.exit(run_netplay_headless(args))
+        if args.resume: sys.exit(run_resumed_headless(args))
+        run_headless(args)
+    elif args.watch:
+        run_watch(args)
+    elif args.play_server:
+        run_play_server(args)
+    else:
+        from Game import Game
+        game = Game()
+        open_spectators(game, args)
+        if args.host is not None or args.join:
+            game.assets.wait()
+            session = connect_netplay(args, headless=False)
+            if session is None: sys.exit(1)
+            game.start_netplay(session)
+        elif args.replay:
+            from Replay import Replay
+            game.assets.wait()
+            game.start_playback(Replay.load(args.replay[0]), args.replay_speed)
+        elif args.resume:
+            game.assets.wait()
+            game.resume_match(args.resume)
+        elif os.path.exists(game.autosave_path):
+            print("Há uma partida interrompida: python Main.py --resume para continuar")
+        game.run(profile_csv=args.profile_csv)
@@ -0,0 +1,497 @@
+# match_server.py
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+from PPlay.window import *
+from Constants import *
+from Game import Game
+from Netplay import UP, DOWN, held_keys
+from Spectator import BYE, BYE_PACKET, JOIN_INTERVAL, FrameStream, SpectatorClient, open_view, quantize
+
+# ======================================================================================
+# --- PACKETS ---
+# ======================================================================================
+# Pacotes UDP (little-endian); o primeiro byte diz o tipo:
+#   JOIN     jogador -> entrada: modo (GameMode), personagem e dificuldade da IA (PVE),
+#            repetido até chegar o WELCOME
+#   WELCOME  entrada -> jogador: a porta do processo que hospeda a partida, a chave dela e o lado
+#   INPUT    jogador -> processo: as teclas seguradas (UP/DOWN do Netplay), um número crescente
+#            (uma entrada mais velha que a última recebida é ignorada) e o último quadro recebido
+#   FRAME    processo -> jogador: o estado da partida, como na transmissão (Spectator)
+#   BYE      processo -> jogador: a partida acabou
+# Os tipos FRAME e BYE são os do Spectator; o jogador é uma tela de espectador que também joga.
+MATCH_SERVER_VERSION = 1
+JOIN, WELCOME, INPUT = 16, 17, 18
+JOIN_PACKET = struct.Struct("<BBBBB")
+WELCOME_PACKET = struct.Struct("<BHIB")
+INPUT_PACKET = struct.Struct("<BIBBII")
+DIFFICULTIES = list(DIFFICULTY_SETTINGS)
+
+# ======================================================================================
+# --- WORKER PROCESS ---
+# ======================================================================================
+class HostedMatch:
+    """
+    Uma partida hospedada: o Game headless, as teclas de cada lado e quem joga em cada um.
+    No PVE o jogador fica à esquerda e a IA (AI_POLICY) à direita; no PVP a partida só
+    começa quando os dois jogadores mandaram as primeiras teclas. Até lá a partida fica no
+    MAIN_MENU, que a tela do jogador mostra como a espera.
+    """
+    def __init__(self, key, game_mode, p1_char_index, difficulty, seed):
+        self.key = key
+        self.seed = seed
+        self.game = Game(headless=True)
+        self.game.game_mode = game_mode
+        self.game.p1_char_index = p1_char_index
+        self.game.p2_char_index = (p1_char_index + 1) % len(CHARACTERS)  # Até o segundo jogador escolher
+        self.game.difficulty = difficulty
+        self.game.p2_policy = AI_POLICY
+        self.game.reset_game(seed)
+        self.game.state = GameState.MAIN_MENU
+        self.input = self.game.match_input  # TickInput da partida: esquerda nos bits 0-1, direita nos bits 2-3
+        self.seats = 2 if game_mode == GameMode.PVP else 1
+        self.players = [None] * self.seats  # Por lado: [endereço, último quadro confirmado, última entrada, quando chegou]
+        self.keys = [0] * self.seats
+        self.stream = FrameStream(MATCH_SERVER_STATE_RATE, phase=key)
+        self.created = time.perf_counter()
+        self.ended = None
+
+    def seat_rival(self, p2_char_index):
+        """O segundo jogador do PVP chegou: a partida recomeça com o personagem dele."""
+        self.game.p2_char_index = p2_char_index
+        self.game.reset_game(self.seed)
+        self.game.state = GameState.MAIN_MENU
+
+    def seated(self):
+        return all(self.players)
+
+    def set_keys(self, side, bits):
+        self.keys[side] = bits & (UP | DOWN)
+        self.input.bits = self.keys[0] | (self.keys[1] << 2 if self.seats == 2 else 0)
+
+class MatchWorker:
+    """
+    Um processo de partidas: um loop asyncio que, a cada SIM_DELTA_TIME, avança todas as
+    partidas dele, envia os quadros de estado aos jogadores e mede quanto do tick gastou.
+    Os pedidos da entrada (criar partida, sentar o segundo jogador, parar) chegam por um Pipe.
+    """
+    def __init__(self, index, connection, port, bind_host, metrics_interval):
+        self.index = index
+        self.connection = connection
+        self.port = port
+        self.bind_host = bind_host
+        self.metrics_interval = metrics_interval
+        self.matches = {}  # chave -> HostedMatch
+        self.transport = None
+        self.running = True
+        self._reset_metrics(time.perf_counter())
+
+    def _reset_metrics(self, now):
+        self.metrics_start = now
+        self.ticks = self.overruns = self.skipped = 0
+        self.busy = self.worst = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: _WorkerProtocol(self),
+                                                                local_addr=(self.bind_host, self.port))
+        self.connection.send(("ready", self.index, self.transport.get_extra_info("sockname")[1]))
+        next_tick = time.perf_counter()
+        while self.running:
+            start = time.perf_counter()
+            self._read_commands()
+            for match in list(self.matches.values()): self._step(match, start)
+            elapsed = time.perf_counter() - start
+            self.ticks += 1
+            self.busy += elapsed
+            self.worst = max(self.worst, elapsed)
+            if elapsed > SIM_DELTA_TIME: self.overruns += 1
+
+            next_tick += SIM_DELTA_TIME
+            now = time.perf_counter()
+            behind = int((now - next_tick) / SIM_DELTA_TIME)
+            if behind > MATCH_SERVER_CATCH_UP:
+                # Atrasado demais para recuperar: os ticks perdidos são pulados (as partidas ficam mais lentas)
+                self.skipped += behind
+                next_tick = now
+            if now - self.metrics_start >= self.metrics_interval: self._report(now)
+            # Com fork, o processo herda a outra ponta do Pipe e não vê o EOF se a entrada for morta (kill)
+            if self.ticks % SIM_TICK_RATE == 0 and not multiprocessing.parent_process().is_alive(): self.running = False
+            # Os pacotes dos jogadores são recebidos pelo loop enquanto o tick espera
+            await asyncio.sleep(next_tick - now)
+        for match in list(self.matches.values()): self._close(match)
+        self.transport.close()
+
+    def _read_commands(self):
+        while self.connection.poll():
+            try:
+                command, *arguments = self.connection.recv()
+            except EOFError:
+                command = "stop"  # A entrada morreu sem avisar (kill)
+            if command == "create":
+                key, game_mode, p1_char_index, difficulty, seed = arguments
+                self.matches[key] = HostedMatch(key, GameMode(game_mode), p1_char_index, difficulty, seed)
+            elif command == "join":
+                key, p2_char_index = arguments
+                if key in self.matches: self.matches[key].seat_rival(p2_char_index)
+            elif command == "stop":
+                self.running = False
+                return
+
+    def _step(self, match, now):
+        game = match.game
+        for player in match.players:
+            # Quem parou de mandar teclas saiu: a partida acaba sem ele
+            if player and now - player[3] > MATCH_SERVER_TIMEOUT: return self._close(match)
+        if game.state == GameState.GAME_OVER:
+            if match.ended is None: match.ended = now
+            if now - match.ended > MATCH_SERVER_LINGER: return self._close(match)
+        elif not match.seated():
+            # Ainda falta alguém: a partida espera (e fecha se quem a pediu não aparece)
+            if not any(match.players) and now - match.created > MATCH_SERVER_TIMEOUT: return self._close(match)
+        else:
+            if game.state == GameState.MAIN_MENU: game.state = GameState.PLAYING
+            game.update(SIM_DELTA_TIME)
+        # Os quadros seguem durante a espera: são eles que mostram ao jogador que o servidor continua lá
+        if match.stream.due(game.state):
+            match.stream.push(quantize(game))
+            for player in match.players:
+                if player: self.transport.sendto(match.stream.packet(player[1]), player[0])
+
+    def _receive(self, data, address):
+        if len(data) != INPUT_PACKET.size or data[0] != INPUT: return
+        _, key, side, bits, number, acked = INPUT_PACKET.unpack(data)
+        match = self.matches.get(key)
+        if match is None or side >= match.seats: return
+        player = match.players[side]
+        if player is None:
+            player = match.players[side] = [address, 0, 0, 0]
+        elif player[0] != address:
+            return  # Lugar ocupado
+        elif number <= player[2]:
+            return  # Chegou fora de ordem: já há uma entrada mais nova
+        player[1] = match.stream.acknowledge(player[1], acked)
+        player[2] = number
+        player[3] = time.perf_counter()
+        match.set_keys(side, bits)
+
+    def _close(self, match):
+        del self.matches[match.key]
+        for player in match.players:
+            if player is None: continue
+            # Repetido, como em RollbackSession.close: com um BYE perdido o jogador só sairia pelo timeout
+            for _ in range(3): self.transport.sendto(BYE_PACKET.pack(BYE), player[0])
+        self.connection.send(("closed", match.key))
+
+    def _report(self, now):
+        elapsed = now - self.metrics_start
+        players = sum(1 for match in self.matches.values() for player in match.players if player)
+        self.connection.send(("metrics", {
+            "type": "worker", "worker": self.index, "matches": len(self.matches), "players": players,
+            "ticks": self.ticks, "tick_ms": round(self.busy / self.ticks * 1000, 3) if self.ticks else None,
+            "worst_tick_ms": round(self.worst * 1000, 3), "overruns": self.overruns, "skipped": self.skipped,
+            "load": round(self.busy / elapsed, 3)}))
+        self._reset_metrics(now)
+
+class _WorkerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, worker):
+        self.worker = worker
+
+    def datagram_received(self, data, address):
+        self.worker._receive(data, address)
+
+    def error_received(self, error):
+        pass  # (Windows) aviso de porta fechada: o jogador sai sozinho pelo MATCH_SERVER_TIMEOUT
+
+def _run_worker(index, connection, port, bind_host, metrics_interval):
+    """Ponto de entrada de um processo de partidas (sem janela nem som)."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    try:
+        asyncio.run(MatchWorker(index, connection, port, bind_host, metrics_interval).run())
+    except KeyboardInterrupt:
+        pass  # O Ctrl+C chega a todo o grupo de processos; quem encerra os processos é a entrada
+
+# ======================================================================================
+# --- LOBBY ---
+# ======================================================================================
+class _WorkerHandle:
+    def __init__(self, index, process, connection):
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.port = None
+        self.matches = set()  # Chaves das partidas abertas no processo
+        self.metrics = None  # Último relatório do processo
+
+class MatchServer:
+    """
+    Entrada do servidor de partidas: abre um processo de partidas por núcleo (MatchWorker),
+    recebe os pedidos dos jogadores (JOIN), põe cada partida nova no processo com menos
+    partidas e junta os jogadores do PVP dois a dois. Depois do WELCOME o jogador fala
+    direto com o processo da partida. Os relatórios de carga saem em NDJSON em output.
+    """
+    def __init__(self, port=MATCH_SERVER_PORT, workers=None, bind_host="0.0.0.0", output=sys.stdout,
+                 metrics_interval=MATCH_SERVER_METRICS_INTERVAL):
+        self.port = port
+        self.worker_count = workers or os.cpu_count() or 1
+        self.bind_host = bind_host
+        self.output = output
+        self.metrics_interval = metrics_interval
+        self.workers = []
+        self.transport = None
+        self.seats = {}  # endereço do jogador -> pacote WELCOME (o JOIN é repetido até o WELCOME chegar)
+        self.match_players = {}  # chave da partida -> endereços dos jogadores dela
+        self.open_matches = {}  # chave -> processo das partidas PVP que esperam o segundo jogador
+        self.matches_created = 0
+        self.rng = random.Random()
+        self.running = True
+
+    def stop(self):
+        """Pede para o servidor encerrar (pode ser chamado de outra thread)."""
+        self.running = False
+
+    def run(self, max_seconds=None):
+        """Atende até o Ctrl+C (ou max_seconds) e encerra os processos de partidas."""
+        try:
+            asyncio.run(self._serve(max_seconds))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop_workers()
+
+    async def _serve(self, max_seconds):
+        self._start_workers()
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: _LobbyProtocol(self),
+                                                                local_addr=(self.bind_host, self.port))
+        self.port = self.transport.get_extra_info("sockname")[1]
+        self._write({"type": "start", "port": self.port, "workers": [worker.port for worker in self.workers]})
+        start = time.perf_counter()
+        next_report = start + self.metrics_interval
+        try:
+            while self.running and (max_seconds is None or time.perf_counter() - start < max_seconds):
+                self._read_workers()
+                now = time.perf_counter()
+                if now >= next_report:
+                    self._report(now - start)
+                    next_report += self.metrics_interval
+                await asyncio.sleep(0.01)
+        finally:
+            self.transport.close()
+
+    def _start_workers(self):
+        for index in range(self.worker_count):
+            parent, child = multiprocessing.Pipe()
+            # Com a porta 0, cada processo pega uma porta livre e informa qual
+            port = self.port + 1 + index if self.port else 0
+            process = multiprocessing.Process(target=_run_worker, name=f"match-worker-{index}", daemon=True,
+                                              args=(index, child, port, self.bind_host, self.metrics_interval))
+            process.start()
+            child.close()  # Só o processo fica com a ponta dele: se ele morrer, a entrada vê o EOF
+            self.workers.append(_WorkerHandle(index, process, parent))
+        for worker in self.workers:
+            if not worker.connection.poll(NETPLAY_CONNECT_TIMEOUT):
+                raise RuntimeError(f"O processo de partidas {worker.process.name} não respondeu")
+            _, _, worker.port = worker.connection.recv()
+
+    def _stop_workers(self):
+        for worker in self.workers:
+            try:
+                worker.connection.send(("stop",))
+            except OSError:
+                pass  # Processo já encerrado
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive(): worker.process.terminate()
+        self.workers = []
+
+    def _read_workers(self):
+        for worker in list(self.workers):
+            try:
+                while worker.connection.poll():
+                    message, *arguments = worker.connection.recv()
+                    if message == "metrics":
+                        worker.metrics = arguments[0]
+                        self._write(worker.metrics)
+                    elif message == "closed":
+                        worker.matches.discard(arguments[0])
+                        self._release(arguments[0])
+            except (EOFError, OSError):
+                self._lose_worker(worker)
+
+    def _lose_worker(self, worker):
+        """O processo morreu: as partidas dele acabaram (os jogadores saem pelo MATCH_SERVER_TIMEOUT)."""
+        self.workers.remove(worker)
+        for key in worker.matches: self._release(key)
+        self._write({"type": "worker_lost", "worker": worker.index, "matches": len(worker.matches),
+                     "exitcode": worker.process.exitcode})
+        if not self.workers: self.running = False
+
+    def _release(self, key):
+        """A partida fechou: os jogadores dela podem pedir outra."""
+        self.open_matches.pop(key, None)
+        for address in self.match_players.pop(key, ()): self.seats.pop(address, None)
+
+    def _receive(self, data, address):
+        if len(data) != JOIN_PACKET.size or data[0] != JOIN: return
+        welcome = self.seats.get(address)
+        if welcome is None:
+            # Uma partida que o processo acabou de fechar (ou de um processo morto) não pode receber ninguém
+            self._read_workers()
+            if not self.workers: return
+            _, version, game_mode, character, difficulty = JOIN_PACKET.unpack(data)
+            if version != MATCH_SERVER_VERSION or character >= len(CHARACTERS): return
+            if game_mode == GameMode.PVP.value:
+                welcome = self._seat_pvp(address, character)
+            elif game_mode == GameMode.PVE.value and difficulty < len(DIFFICULTIES):
+                welcome = self._seat_new(address, GameMode.PVE, character, DIFFICULTIES[difficulty])
+            else:
+                return
+            self.seats[address] = welcome
+        self.transport.sendto(welcome, address)
+
+    def _create(self, address, game_mode, character, difficulty=None):
+        """Cria a partida no processo com menos partidas, com o jogador do lado esquerdo; devolve (processo, chave)."""
+        worker = min(self.workers, key=lambda worker: len(worker.matches))
+        key = 0
+        while key == 0 or key in self.match_players: key = self.rng.getrandbits(32)
+        worker.connection.send(("create", key, game_mode.value, character, difficulty, self.rng.getrandbits(63)))
+        worker.matches.add(key)
+        self.matches_created += 1
+        self.match_players[key] = [address]
+        return worker, key
+
+    def _seat_new(self, address, game_mode, character, difficulty):
+        worker, key = self._create(address, game_mode, character, difficulty)
+        return WELCOME_PACKET.pack(WELCOME, worker.port, key, 0)
+
+    def _seat_pvp(self, address, character):
+        """O primeiro jogador do PVP abre uma partida; o próximo a pedir PVP entra nela, do lado direito."""
+        if not self.open_matches:
+            worker, key = self._create(address, GameMode.PVP, character)
+            self.open_matches[key] = worker
+            return WELCOME_PACKET.pack(WELCOME, worker.port, key, 0)
+        key, worker = self.open_matches.popitem()
+        worker.connection.send(("join", key, character))
+        self.match_players[key].append(address)
+        return WELCOME_PACKET.pack(WELCOME, worker.port, key, 1)
+
+    def _report(self, uptime):
+        reports = [worker.metrics for worker in self.workers if worker.metrics]
+        self._write({"type": "server", "uptime": round(uptime, 1), "workers": len(self.workers),
+                     "matches": sum(len(worker.matches) for worker in self.workers), "created": self.matches_created,
+                     "players": sum(report["players"] for report in reports),
+                     "overruns": sum(report["overruns"] for report in reports),
+                     "skipped": sum(report["skipped"] for report in reports),
+                     "max_load": max((report["load"] for report in reports), default=None)})
+
+    def _write(self, record):
+        self.output.write(json.dumps(record) + "\n")
+        self.output.flush()
+
+class _LobbyProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server._receive(data, address)
+
+    def error_received(self, error):
+        pass
+
+# ======================================================================================
+# --- PLAYER CLIENT ---
+# ======================================================================================
+class _SeatRequest(asyncio.DatagramProtocol):
+    def __init__(self, welcome):
+        self.welcome = welcome
+
+    def datagram_received(self, data, address):
+        if len(data) == WELCOME_PACKET.size and data[0] == WELCOME and not self.welcome.done():
+            self.welcome.set_result(WELCOME_PACKET.unpack(data)[1:])
+
+    def error_received(self, error):
+        pass  # Entrada ainda fechada: os JOIN continuam
+
+async def request_match(host, port=MATCH_SERVER_PORT, game_mode=GameMode.PVE, p1_char_index=0, difficulty="Hard",
+                        timeout=NETPLAY_CONNECT_TIMEOUT):
+    """Pede uma partida à entrada do servidor: (porta do processo, chave, lado), ou None sem resposta."""
+    loop = asyncio.get_running_loop()
+    welcome = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _SeatRequest(welcome), remote_addr=(host, port))
+    packet = JOIN_PACKET.pack(JOIN, MATCH_SERVER_VERSION, game_mode.value, p1_char_index,
+                              DIFFICULTIES.index(difficulty) if difficulty else 0)
+    deadline = loop.time() + timeout
+    try:
+        while not welcome.done() and loop.time() < deadline:
+            transport.sendto(packet)
+            await asyncio.wait([welcome], timeout=JOIN_INTERVAL)
+    finally:
+        transport.close()
+    return welcome.result() if welcome.done() else None
+
+class PlayerClient(SpectatorClient):
+    """
+    Jogador de uma partida do servidor: recebe o estado como uma tela de espectador e manda
+    só as teclas, junto com o último quadro recebido (o ACK dos quadros vai nas teclas).
+    """
+    def __init__(self, key, side):
+        super().__init__()
+        self.key = key
+        self.side = side
+        self.inputs = 0
+        self.connected_at = 0
+        self.closed = False  # A partida acabou: BYE do processo ou nada dele por MATCH_SERVER_TIMEOUT
+        self.timed_out = False
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self.connected_at = time.perf_counter()
+
+    def datagram_received(self, data, address):
+        if data and data[0] == BYE: self.closed = True
+        super().datagram_received(data, address)
+
+    def acknowledge(self, sequence):
+        pass  # Vai com as próximas teclas
+
+    def maintain(self, now):
+        """Chamado a cada frame: sem quadros do processo por MATCH_SERVER_TIMEOUT (nem o primeiro), a partida acabou."""
+        if now - max(self.received_at, self.connected_at) > MATCH_SERVER_TIMEOUT:
+            self.closed = self.timed_out = True
+
+    def send_input(self, bits):
+        self.inputs += 1
+        self.transport.sendto(INPUT_PACKET.pack(INPUT, self.key, self.side, bits, self.inputs, self.sequence))
+
+async def connect(host, seat, client_class=PlayerClient):
+    """Abre a conexão com o processo que hospeda a partida do WELCOME seat; devolve (transport, cliente)."""
+    worker_port, key, side = seat
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(lambda: client_class(key, side), remote_addr=(host, worker_port))
+
+async def play(host, port=MATCH_SERVER_PORT, game_mode=GameMode.PVE, p1_char_index=0, difficulty="Hard"):
+    """Joga uma partida do servidor com janela (W/S ou as setas) até ela acabar (ou o servidor sumir) ou o ESC."""
+    view = open_view(f"{WINDOW_TITLE} - Servidor")
+    keyboard = Window.get_keyboard()
+    seat = await request_match(host, port, game_mode, p1_char_index, difficulty)
+    if seat is None: return None
+    transport, client = await connect(host, seat)
+    previous_time = time.perf_counter()
+    try:
+        while not client.closed and not keyboard.just_pressed("escape"):
+            now = time.perf_counter()
+            client.maintain(now)
+            client.send_input(held_keys(keyboard))
+            view.draw(client, min(now - previous_time, MAX_FRAME_TIME))
+            previous_time = now
+            await asyncio.sleep(max(0, 1 / FPS_LIMIT - (time.perf_counter() - now)))
+    finally:
+        transport.close()
+    return client
@@ -0,0 +1,195 @@
+# multiball.py
+from itertools import repeat
+import numpy as np
+from Constants import *
+from Broadphase import UniformGrid, swept_aabb, wall_contact
+from Batch_simulator import bounce_off_paddle, SPEED_BOOST, SLOW_BALL
+
+# ======================================================================================
+# --- MULTI-BALL MODE ---
+# ======================================================================================
+class BallSwarm:
+    """
+    Bolas extras do modo multibola, guardadas em colunas numpy (posição e velocidade)
+    em vez de um Sprite por bola, e vários power-ups em campo ao mesmo tempo. Cada bola
+    segue as regras de Ball.move (colisão contínua com paredes e jogadores); as bolas
+    que podem encostar em cada jogador ou power-up saem de uma grade uniforme, então o
+    custo cresce com as bolas perto deles e não com todos os pares.
+    use_grid=False testa todas as bolas contra tudo (referência para o benchmark).
+    images: (imagem da bola, imagens dos power-ups na ordem de POWERUP_TYPES), só para desenhar.
+    """
+    def __init__(self, count, ball_size, powerup_count=MULTIBALL_POWERUPS, seed=None, use_grid=True, images=None):
+        self.count = count
+        self.ball_w, self.ball_h = float(ball_size[0]), float(ball_size[1])
+        self.rng = np.random.default_rng(seed)
+        self.use_grid = use_grid
+        self.grid = UniformGrid(WINDOW_WIDTH, WINDOW_HEIGHT, MULTIBALL_GRID_CELL)
+        self.images = images
+
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.previous_x = np.zeros(count)
+        self.previous_y = np.zeros(count)
+        self.serve(np.arange(count))
+
+        # Os power-ups surgem em momentos diferentes para não aparecerem todos juntos
+        self.powerup_x = np.zeros(powerup_count)
+        self.powerup_y = np.zeros(powerup_count)
+        self.powerup_type = np.zeros(powerup_count, dtype=np.int8)
+        self.powerup_active = np.zeros(powerup_count, dtype=bool)
+        self.powerup_timer = self.rng.uniform(0, MULTIBALL_POWERUP_RESPAWN, powerup_count)
+
+    def serve(self, indices):
+        """Recoloca as bolas no meio do campo, com ângulo e lado sorteados (como Ball.reset)."""
+        count = len(indices)
+        if count == 0: return
+        angle = self.rng.uniform(-BALL_MAX_SERVE_ANGLE, BALL_MAX_SERVE_ANGLE, count)
+        direction = np.where(self.rng.random(count) < 0.5, -1.0, 1.0)
+        self.x[indices] = WINDOW_WIDTH / 2 - self.ball_w / 2
+        self.y[indices] = self.rng.uniform(WINDOW_HEIGHT * 0.1, WINDOW_HEIGHT * 0.9 - self.ball_h, count)
+        self.vx[indices] = BALL_INITIAL_SPEED * np.cos(angle) * direction
+        self.vy[indices] = BALL_INITIAL_SPEED * np.sin(angle)
+        self.previous_x[indices] = self.x[indices]
+        self.previous_y[indices] = self.y[indices]
+
+    # ----------------------------------------------------------------------------------
+    # Tick
+    # ----------------------------------------------------------------------------------
+    def step(self, delta_time, paddles):
+        """Avança um tick; devolve (gols da esquerda, gols da direita, toques em cada jogador)."""
+        self.previous_x[:] = self.x
+        self.previous_y[:] = self.y
+        bw, bh = self.ball_w, self.ball_h
+
+        # Fase larga: cada bola entra na grade com a caixa que ela pode varrer no tick
+        reach = np.sqrt(self.vx**2 + self.vy**2) * delta_time
+        if self.use_grid:
+            self.grid.build(self.x - reach, self.y - reach, bw + 2 * reach, bh + 2 * reach)
+        near_paddles = [self._candidates(paddle.x, paddle.y, paddle.width, paddle.height) for paddle in paddles]
+
+        remaining = np.full(self.count, delta_time)
+        hits = [np.zeros(self.count, dtype=bool) for _ in paddles]
+        moving = np.arange(self.count)
+        path = []  # (bolas, x, y, dx, dy) de cada trecho, para a coleta dos power-ups
+        for _ in range(BALL_MAX_CONTACTS_PER_TICK):
+            if moving.size == 0: break
+            x, y, vx, vy = self.x[moving], self.y[moving], self.vx[moving], self.vy[moving]
+            dx = vx * remaining[moving]
+            dy = vy * remaining[moving]
+            # Primeiro contato do trecho: 0 = parede, j + 1 = jogador j (mesma ordem de Ball.move)
+            contact = wall_contact(y, dy, bh)
+            obstacle = np.zeros(moving.size, dtype=np.int8)
+            for number, (paddle, near, hit) in enumerate(zip(paddles, near_paddles, hits), 1):
+                candidates = np.flatnonzero(near[moving] & ~hit[moving])
+                if candidates.size == 0: continue
+                times = swept_aabb(x[candidates], y[candidates], bw, bh, dx[candidates], dy[candidates],
+                                   paddle.x, paddle.y, paddle.width, paddle.height)
+                first = times < contact[candidates]
+                contact[candidates[first]] = times[first]
+                obstacle[candidates[first]] = number
+
+            touching = contact != np.inf
+            t = np.where(touching, contact, 1.0)
+            path.append((moving, x, y, dx * t, dy * t))
+            x = x + dx * t
+            y = y + dy * t
+            remaining[moving] = np.where(touching, remaining[moving] * (1 - contact), remaining[moving])
+
+            wall = touching & (obstacle == 0)
+            y = np.where(wall, np.where(vy < 0, 0.0, WINDOW_HEIGHT - bh), y)
+            vy = np.where(wall, -vy, vy)
+            for number, (paddle, hit) in enumerate(zip(paddles, hits), 1):
+                bounce = np.flatnonzero(touching & (obstacle == number))
+                if bounce.size:
+                    x[bounce], vx[bounce], vy[bounce] = bounce_off_paddle(
+                        True, x[bounce], y[bounce], vx[bounce], vy[bounce], bw, bh,
+                        paddle.x, paddle.y, paddle.original_width, paddle.original_height)
+                    hit[moving[bounce]] = True
+            self.x[moving], self.y[moving], self.vx[moving], self.vy[moving] = x, y, vx, vy
+            moving = moving[touching]
+
+        self._update_powerups(delta_time, path)
+
+        # Bola que sai do campo marca para o outro lado e volta ao meio na hora (sem pausa)
+        goal_right = self.x + bw < 0
+        goal_left = (self.x > WINDOW_WIDTH) & ~goal_right
+        self.serve(np.flatnonzero(goal_left | goal_right))
+        return int(goal_left.sum()), int(goal_right.sum()), [int(hit.sum()) for hit in hits]
+
+    def _candidates(self, x, y, width, height):
+        """Máscara das bolas que podem tocar o retângulo neste tick."""
+        if not self.use_grid: return np.ones(self.count, dtype=bool)
+        near = np.zeros(self.count, dtype=bool)
+        near[self.grid.query(x, y, x + width, y + height)] = True
+        return near
+
+    def _update_powerups(self, delta_time, path):
+        waiting = ~self.powerup_active
+        self.powerup_timer[waiting] -= delta_time
+        spawn = np.flatnonzero(waiting & (self.powerup_timer <= 0))
+        if spawn.size:
+            pw, ph = POWERUP_SIZE
+            # Mesmos intervalos de PowerUp.spawn
+            self.powerup_x[spawn] = self.rng.integers(int(WINDOW_WIDTH * 0.25), int(WINDOW_WIDTH * 0.75) - pw, spawn.size, endpoint=True)
+            self.powerup_y[spawn] = self.rng.integers(int(WINDOW_HEIGHT * 0.1), int(WINDOW_HEIGHT * 0.9) - ph, spawn.size, endpoint=True)
+            slow = self.rng.random(spawn.size) >= POWERUP_WEIGHTS["SPEED_BOOST"]
+            self.powerup_type[spawn] = np.where(slow, SLOW_BALL, SPEED_BOOST)
+            self.powerup_active[spawn] = True
+
+        pw, ph = POWERUP_SIZE
+        for powerup in np.flatnonzero(self.powerup_active):
+            px, py = self.powerup_x[powerup], self.powerup_y[powerup]
+            near = self._candidates(px, py, pw, ph)
+            # Se várias bolas passarem pelo power-up no mesmo tick, fica com a de menor índice
+            taker = self.count
+            for moving, x, y, dx, dy in path:
+                candidates = np.flatnonzero(near[moving])
+                if candidates.size == 0: continue
+                times = swept_aabb(x[candidates], y[candidates], self.ball_w, self.ball_h,
+                                   dx[candidates], dy[candidates], px, py, pw, ph)
+                touched = moving[candidates[times != np.inf]]
+                if touched.size: taker = min(taker, int(touched.min()))
+            if taker < self.count:
+                self._apply_powerup(taker, self.powerup_type[powerup])
+                self.powerup_active[powerup] = False
+                self.powerup_timer[powerup] = MULTIBALL_POWERUP_RESPAWN
+
+    def _apply_powerup(self, ball, powerup_type):
+        """PowerUp.apply_effect para uma bola do enxame."""
+        magnitude = np.hypot(self.vx[ball], self.vy[ball])
+        if magnitude == 0: return
+        if powerup_type == SPEED_BOOST:
+            new_speed = magnitude * POWERUP_SPEED_FACTOR
+        else:
+            new_speed = max(magnitude / POWERUP_SPEED_FACTOR, BALL_INITIAL_SPEED)
+        self.vx[ball] = self.vx[ball] / magnitude * new_speed
+        self.vy[ball] = self.vy[ball] / magnitude * new_speed
+
+    def target_y(self, paddle, ball):
+        """Centro vertical da bola (do enxame ou a principal) que chega primeiro ao jogador, para a IA."""
+        if paddle.side == "right":
+            toward, distance = self.vx > 0, paddle.x - (self.x + self.ball_w)
+            ball_time = (paddle.x - (ball.x + ball.width)) / ball.velocity_x if ball.velocity_x > 0 else np.inf
+        else:
+            toward, distance = self.vx < 0, self.x - (paddle.x + paddle.original_width)
+            ball_time = (ball.x - (paddle.x + paddle.original_width)) / -ball.velocity_x if ball.velocity_x < 0 else np.inf
+        with np.errstate(divide="ignore", invalid="ignore"):
+            times = np.where(toward & (distance > -self.ball_w), distance / np.abs(self.vx), np.inf)
+        if self.count:
+            first = int(np.argmin(times))
+            if times[first] < ball_time: return self.y[first] + self.ball_h / 2
+        return ball.y + ball.height / 2
+
+    # ----------------------------------------------------------------------------------
+    # Desenho
+    # ----------------------------------------------------------------------------------
+    def draw(self, screen, alpha=1.0):
+        """Desenha as bolas (interpoladas entre ticks) e os power-ups com uma chamada de blits cada."""
+        ball_image, powerup_images = self.images
+        for powerup in np.flatnonzero(self.powerup_active):
+            screen.blit(powerup_images[self.powerup_type[powerup]], (self.powerup_x[powerup], self.powerup_y[powerup]))
+        render_x = (self.previous_x + (self.x - self.previous_x) * alpha).tolist()
+        render_y = (self.previous_y + (self.y - self.previous_y) * alpha).tolist()
+        screen.blits(zip(repeat(ball_image), zip(render_x, render_y)), doreturn=False)
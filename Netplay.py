@@ -0,0 +1,450 @@
+# netplay.py
+import heapq
+import math
+import random
+import socket
+import struct
+import time
+from Constants import *
+from Replay import Replay, TickInput, input_bits, new_seed
+
+# ======================================================================================
+# --- PACKETS ---
+# ======================================================================================
+# Pacotes UDP (little-endian); o primeiro byte diz o tipo:
+#   HELLO  convidado -> anfitrião, repetido até chegar o START
+#   START  anfitrião -> convidado: seed e personagens da partida
+#   INPUT  as entradas locais que o outro lado ainda não confirmou (um byte por tick, a
+#          partir do tick first), o tick atual de quem envia, quantas entradas do outro
+#          lado já chegaram (ack), carimbos de tempo para medir o RTT e o checksum do
+#          último tick múltiplo de NETPLAY_CHECKSUM_INTERVAL confirmado pelos dois lados
+#   BYE    saída da partida
+NETPLAY_VERSION = 1
+HELLO, START, INPUT, BYE = 1, 2, 3, 4
+HELLO_PACKET = struct.Struct("<BB")
+START_PACKET = struct.Struct("<BBQBB")
+INPUT_PACKET = struct.Struct("<BBIIIIIII")
+BYE_PACKET = struct.Struct("<B")
+MAX_PACKET = INPUT_PACKET.size + 255
+
+# Entrada de um jogador: dois bits, qualquer que seja o lado (no tick, o da direita vai para os bits 2 e 3)
+UP, DOWN = 1, 2
+TICK_MS = SIM_DELTA_TIME * 1000
+
+def _stamp(now):
+    """Carimbo em milissegundos (32 bits, nunca 0: 0 quer dizer "sem carimbo")."""
+    return int(now * 1000) & 0xFFFFFFFF or 1
+
+# ======================================================================================
+# --- TRANSPORTS ---
+# ======================================================================================
+class UdpTransport:
+    """
+    Socket UDP sem bloqueio. Sem remote (o anfitrião), o par passa a ser o primeiro
+    endereço que mandar um pacote; pacotes de outros endereços são ignorados.
+    """
+    def __init__(self, port=0, remote=None, bind_host="0.0.0.0"):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind((bind_host, port))
+        # Resolvido agora, para comparar com o endereço que recvfrom devolve
+        self.remote = (socket.gethostbyname(remote[0]), remote[1]) if remote else None
+
+    @property
+    def port(self):
+        return self.socket.getsockname()[1]
+
+    def send(self, data):
+        if self.remote is None: return
+        try:
+            self.socket.sendto(data, self.remote)
+        except OSError:
+            pass  # Para o jogo, um envio que falhou é só um pacote perdido
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(MAX_PACKET)
+            except BlockingIOError:
+                return packets
+            except ConnectionError:
+                continue  # (Windows) aviso de porta fechada de um envio anterior
+            if self.remote is None: self.remote = address
+            if address == self.remote: packets.append(data)
+
+    def close(self):
+        self.socket.close()
+
+class LossyTransport:
+    """
+    Rede ruim de mentira por cima de outro transporte, para testar no localhost: cada
+    pacote enviado se perde com probabilidade loss ou sai latency_ms + até jitter_ms
+    depois (então pode chegar fora de ordem). Com os dois lados assim, o RTT fica em
+    torno de 2 * latency_ms. Os pacotes atrasados saem nas chamadas de send/receive.
+    """
+    def __init__(self, transport, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        self.transport = transport
+        self.latency_ms, self.jitter_ms, self.loss = latency_ms, jitter_ms, loss
+        self.rng = random.Random(seed)
+        self.queue = []  # (quando sai, ordem de envio, pacote)
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def port(self):
+        return self.transport.port
+
+    def send(self, data):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+        else:
+            due = time.perf_counter() + (self.latency_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+            heapq.heappush(self.queue, (due, self.sent, data))
+        self.flush()
+
+    def flush(self):
+        now = time.perf_counter()
+        while self.queue and self.queue[0][0] <= now:
+            self.transport.send(heapq.heappop(self.queue)[2])
+
+    def receive(self):
+        self.flush()
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+# ======================================================================================
+# --- LOCAL INPUT ---
+# ======================================================================================
+def held_keys(keyboard):
+    """UP/DOWN de um jogador que usa W/S ou as setas (tanto faz o lado do campo)."""
+    bits = input_bits(keyboard)
+    return (bits | bits >> 2) & (UP | DOWN)
+
+def keyboard_input(game):
+    """Entrada do jogador local: W/S ou as setas, qualquer que seja o seu lado do campo."""
+    return held_keys(game.keyboard)
+
+def ball_follower(side, miss=40):
+    """
+    Entrada de um jogador automático (para testes sem janela): segue a bola quando ela
+    vem, mirando com um erro de até 2 * miss pixels que muda a cada toque (para haver gols).
+    """
+    def follow(game):
+        ball = game.ball
+        paddle = game.player1 if side == "left" else game.player2
+        coming = (ball.velocity_x < 0) == (side == "left")
+        error = ((game.rally_hits * 3 + (side == "left")) % 5 - 2) * miss
+        target = ball.y + ball.height / 2 + error if coming else WINDOW_HEIGHT / 2
+        diff = target - (paddle.y + paddle.original_height / 2)
+        if diff < -AI_DEAD_ZONE * 4: return UP
+        if diff > AI_DEAD_ZONE * 4: return DOWN
+        return 0
+    return follow
+
+# ======================================================================================
+# --- CONNECTION ---
+# ======================================================================================
+def host_match(transport, p1_char_index, p2_char_index, seed=None, timeout=NETPLAY_CONNECT_TIMEOUT, **session_options):
+    """Espera um convidado (HELLO) e manda a partida (START). Devolve a sessão do lado esquerdo, ou None."""
+    seed = new_seed() if seed is None else seed
+    start = START_PACKET.pack(START, NETPLAY_VERSION, seed, p1_char_index, p2_char_index)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        for data in transport.receive():
+            if len(data) == HELLO_PACKET.size and data[0] == HELLO and data[1] == NETPLAY_VERSION:
+                # Se o START se perder, o convidado repete o HELLO e a sessão responde de novo
+                transport.send(start)
+                return RollbackSession(transport, "left", seed, p1_char_index, p2_char_index, **session_options)
+        time.sleep(0.01)
+    return None
+
+def join_match(transport, timeout=NETPLAY_CONNECT_TIMEOUT, **session_options):
+    """Pede a partida ao anfitrião até chegar o START. Devolve a sessão do lado direito, ou None."""
+    hello = HELLO_PACKET.pack(HELLO, NETPLAY_VERSION)
+    deadline = time.perf_counter() + timeout
+    next_hello = 0
+    while time.perf_counter() < deadline:
+        if time.perf_counter() >= next_hello:
+            transport.send(hello)
+            next_hello = time.perf_counter() + 0.2
+        for data in transport.receive():
+            if len(data) == START_PACKET.size and data[0] == START and data[1] == NETPLAY_VERSION:
+                _, _, seed, p1_char_index, p2_char_index = START_PACKET.unpack(data)
+                return RollbackSession(transport, "right", seed, p1_char_index, p2_char_index, **session_options)
+        time.sleep(0.01)
+    return None
+
+# ======================================================================================
+# --- ROLLBACK SESSION ---
+# ======================================================================================
+class RollbackSession:
+    """
+    Uma ponta da partida PVP em rede. A partida é a mesma dos dois lados (mesma seed e
+    mesmas entradas por tick), então só as entradas viajam. A entrada local entra com
+    input_delay ticks de atraso; a do outro lado, enquanto não chega, é prevista como a
+    última recebida. Quando ela chega diferente do previsto, a partida volta ao estado
+    salvo antes daquele tick (Game.restore) e refaz os ticks seguintes na hora, então
+    o jogador local nunca espera pela rede enquanto a previsão der conta.
+    O atraso segue o RTT medido: a latência de ida além de NETPLAY_ROLLBACK_TARGET ticks
+    vira atraso, para os rollbacks continuarem curtos com a rede lenta.
+    local_input(game) devolve os bits (UP, DOWN) do jogador local neste tick.
+    """
+    def __init__(self, transport, side, seed, p1_char_index, p2_char_index, local_input=keyboard_input):
+        self.transport = transport
+        self.side = side  # "left" (anfitrião) ou "right" (convidado)
+        self.seed = seed
+        self.p1_char_index, self.p2_char_index = p1_char_index, p2_char_index
+        self.local_input = local_input
+        self.input = TickInput()  # O que Paddle.move consulta em cada tick simulado
+        self.game = None
+        self.replay = None
+
+        self.frame = 0  # Próximo tick a simular
+        self.local_inputs = bytearray()  # Entrada local de cada tick (já com o atraso)
+        self.remote_inputs = bytearray()  # Entradas do outro lado recebidas, em ordem de tick
+        self.remote_used = bytearray()  # Entrada do outro lado usada em cada tick simulado (recebida ou prevista)
+        self.tick_bits = bytearray()  # Bits (Replay.INPUT_BITS) de cada tick, NOT_PLAYING fora da partida
+        self.states = []  # Snapshot de antes de cada tick ainda não confirmado (buffers alocados em start)
+        self.confirmed = 0  # Ticks já simulados com as duas entradas conhecidas (não mudam mais)
+        self.acked = 0  # Entradas locais que o outro lado já recebeu
+        self.input_delay = NETPLAY_INPUT_DELAY
+
+        # Tempo
+        self.rtt = None  # ms, média móvel
+        self.remote_frame, self.remote_frame_time = 0, time.perf_counter()
+        self.echo_stamp, self.echo_time = 0, 0
+        self.last_receive = time.perf_counter()
+        self.peer_left = False
+
+        # Conferência de estado: checksums dos ticks múltiplos de NETPLAY_CHECKSUM_INTERVAL
+        self.frame_checksums = {}  # Antes de cada tick (refeitos no rollback)
+        self.local_checksums = {}  # Confirmados deste lado
+        self.remote_checksums = {}  # Confirmados do outro lado
+        self.last_checksum = (0, 0)
+        self.checked_frame = 0  # Último tick conferido pelos dois lados
+
+        # Contadores
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_rollback = 0
+        self.stalls = 0
+        self.last_stall = -1
+        self.desyncs = 0
+        self.checks = 0
+
+    NOT_PLAYING = 0x80
+
+    def start(self, game):
+        """Chamado por Game.start_netplay, com a partida já preparada."""
+        self.game = game
+        self.states = [game.new_state_buffer() for _ in range(NETPLAY_MAX_ROLLBACK + 1)]
+        if game.record_replays: self.replay = Replay.from_game(game, self.seed)
+        self.last_receive = time.perf_counter()
+
+    @property
+    def match_over(self):
+        """A partida acabou e todos os ticks até aqui estão confirmados (o placar não muda mais)."""
+        return self.game.state == GameState.GAME_OVER and self.confirmed >= self.frame
+
+    # ----------------------------------------------------------------------------------
+    # Tick
+    # ----------------------------------------------------------------------------------
+    def tick(self):
+        """Um tick de SIM_DELTA_TIME: recebe, corrige o passado se preciso, simula o próximo tick e envia."""
+        now = time.perf_counter()
+        self._receive(now)
+        if now - self.last_receive > NETPLAY_TIMEOUT: self.peer_left = True
+        if self.peer_left: return
+
+        if self._must_wait(now):
+            self.stalls += 1
+        else:
+            target = self.frame + self.input_delay
+            if len(self.local_inputs) <= target:
+                # Se o atraso aumentou, a entrada vale também para o tick que ficaria vazio;
+                # se diminuiu, o tick já tem entrada e a deste frame fica para o próximo
+                bits = self.local_input(self.game)
+                self.local_inputs.extend(bytes((bits,)) * (target + 1 - len(self.local_inputs)))
+            self._simulate(self.frame)
+            self.frame += 1
+            if self.frame % NETPLAY_DELAY_RETUNE == 0: self._tune_delay()
+        self._confirm()
+        self._send(now)
+
+    def _simulate(self, frame):
+        game = self.game
+        game.snapshot(self.states[frame % len(self.states)])
+        if frame % NETPLAY_CHECKSUM_INTERVAL == 0: self.frame_checksums[frame] = game.checksum()
+
+        if frame < len(self.remote_inputs): remote = self.remote_inputs[frame]
+        else: remote = self.remote_inputs[-1] if self.remote_inputs else 0  # Previsão: repete a última
+        if frame < len(self.remote_used): self.remote_used[frame] = remote
+        else: self.remote_used.append(remote)
+
+        local = self.local_inputs[frame]
+        left, right = (local, remote) if self.side == "left" else (remote, local)
+        bits = left | right << 2
+        if game.state not in (GameState.PLAYING, GameState.GOAL): bits |= self.NOT_PLAYING
+        if frame < len(self.tick_bits): self.tick_bits[frame] = bits
+        else: self.tick_bits.append(bits)
+
+        self.input.bits = bits
+        game.update(SIM_DELTA_TIME)
+
+    def _rollback(self, frame):
+        """Volta ao estado de antes do tick frame e refaz até o tick atual com as entradas corrigidas."""
+        depth = self.frame - frame
+        self.rollbacks += 1
+        self.resimulated += depth
+        self.max_rollback = max(self.max_rollback, depth)
+        self.game.restore(self.states[frame % len(self.states)])
+        self.game.resimulating = True
+        try:
+            for resimulated_frame in range(frame, self.frame):
+                self._simulate(resimulated_frame)
+        finally:
+            self.game.resimulating = False
+
+    def _must_wait(self, now):
+        # Prever mais longe tornaria o rollback longo (e caro) demais: espera as entradas
+        if self.frame - len(self.remote_inputs) >= NETPLAY_MAX_ROLLBACK: return True
+        # Se este lado está à frente do outro, segura um tick para os dois se encontrarem
+        if self.rtt is None: return False
+        remote_now = self.remote_frame + ((now - self.remote_frame_time) * 1000 + self.rtt / 2) / TICK_MS
+        if self.frame - remote_now > NETPLAY_SYNC_TOLERANCE and self.last_stall != self.frame:
+            self.last_stall = self.frame  # No máximo um tick segurado a cada tick simulado
+            return True
+        return False
+
+    def _tune_delay(self):
+        if self.rtt is None: return
+        wanted = math.ceil(self.rtt / 2 / TICK_MS) - NETPLAY_ROLLBACK_TARGET
+        wanted = min(max(wanted, 0), NETPLAY_MAX_INPUT_DELAY)
+        if wanted > self.input_delay: self.input_delay += 1
+        elif wanted < self.input_delay: self.input_delay -= 1
+
+    def _confirm(self):
+        """Avança os ticks confirmados: vão para o replay e para a conferência de estado."""
+        confirmed = min(len(self.remote_inputs), self.frame)
+        if confirmed <= self.confirmed: return
+        if self.replay:
+            for frame in range(self.confirmed, confirmed):
+                bits = self.tick_bits[frame]
+                if not bits & self.NOT_PLAYING: self.replay.record(bits)
+
+        interval = NETPLAY_CHECKSUM_INTERVAL
+        for frame in range(self.confirmed // interval * interval + interval, confirmed + 1, interval):
+            # O estado depois de confirmed ticks é o atual se ainda não houve o tick seguinte
+            checksum = self.frame_checksums.pop(frame) if frame < self.frame else self.game.checksum()
+            self.local_checksums[frame] = checksum
+            self.last_checksum = (frame, checksum)
+            self._compare_checksum(frame)
+        self.confirmed = confirmed
+        for frame in [frame for frame in self.frame_checksums if frame < confirmed]:
+            del self.frame_checksums[frame]
+
+    def _compare_checksum(self, frame):
+        if frame in self.local_checksums and frame in self.remote_checksums:
+            self.checks += 1
+            if self.local_checksums[frame] != self.remote_checksums[frame]:
+                self.desyncs += 1
+                print(f"AVISO: partida em rede dessincronizada no tick {frame}")
+            # Cada lado só manda o último checksum: os mais velhos que este não vão mais ser conferidos
+            self.checked_frame = frame
+            for checksums in (self.local_checksums, self.remote_checksums):
+                for old in [old for old in checksums if old <= frame]: del checksums[old]
+
+    # ----------------------------------------------------------------------------------
+    # Rede
+    # ----------------------------------------------------------------------------------
+    def _receive(self, now):
+        rollback_to = None
+        for data in self.transport.receive():
+            if not data: continue
+            self.last_receive = now
+            kind = data[0]
+            if kind == HELLO and self.side == "left" and len(data) >= HELLO_PACKET.size:
+                self.transport.send(START_PACKET.pack(START, NETPLAY_VERSION, self.seed,
+                                                      self.p1_char_index, self.p2_char_index))
+                continue
+            if kind == BYE:
+                self.peer_left = True
+                continue
+            if kind != INPUT or len(data) < INPUT_PACKET.size: continue
+
+            _, count, first, frame, ack, stamp, echo, checksum_frame, checksum = INPUT_PACKET.unpack_from(data)
+            self.acked = max(self.acked, ack)
+            if frame >= self.remote_frame: self.remote_frame, self.remote_frame_time = frame, now
+            self.echo_stamp, self.echo_time = stamp, now
+            if echo:
+                sample = (_stamp(now) - echo) & 0xFFFFFFFF
+                self.rtt = sample if self.rtt is None else self.rtt + (sample - self.rtt) / 8
+            # O mesmo checksum vem repetido em todo pacote até o próximo; os já conferidos não contam
+            if checksum_frame > self.checked_frame:
+                self.remote_checksums[checksum_frame] = checksum
+                self._compare_checksum(checksum_frame)
+
+            # Só entra o que continua a sequência já recebida (o resto vem de novo num próximo pacote)
+            skip = len(self.remote_inputs) - first
+            if skip < 0: continue
+            for bits in data[INPUT_PACKET.size + skip:INPUT_PACKET.size + count]:
+                tick = len(self.remote_inputs)
+                self.remote_inputs.append(bits)
+                if rollback_to is None and tick < self.frame and self.remote_used[tick] != bits:
+                    rollback_to = tick
+        if rollback_to is not None: self._rollback(rollback_to)
+
+    def _send(self, now):
+        first = self.acked
+        inputs = self.local_inputs[first:first + NETPLAY_MAX_INPUTS_PER_PACKET]
+        # O carimbo do outro lado volta somado ao tempo que ficou aqui, para o RTT não contar a espera pelo tick
+        echo = (self.echo_stamp + int((now - self.echo_time) * 1000)) & 0xFFFFFFFF if self.echo_stamp else 0
+        self.transport.send(INPUT_PACKET.pack(INPUT, len(inputs), first, self.frame, len(self.remote_inputs),
+                                              _stamp(now), echo, *self.last_checksum) + inputs)
+
+    def close(self):
+        """Avisa o outro lado, grava o replay com os ticks confirmados e fecha o transporte."""
+        for _ in range(3): self.transport.send(BYE_PACKET.pack(BYE))
+        if isinstance(self.transport, LossyTransport):
+            # Os pacotes atrasados de mentira ainda precisam sair antes de fechar
+            deadline = time.perf_counter() + (self.transport.latency_ms + self.transport.jitter_ms) / 1000
+            while self.transport.queue and time.perf_counter() < deadline:
+                time.sleep(0.001)
+                self.transport.flush()
+        if self.replay and self.replay.ticks:
+            self.replay.scores = dict(self.game.scores)
+            path = self.replay.save(self.game.replay_dir)
+            if self.game.headless: print(f"Replay gravado em {path}")
+        self.replay = None
+        self.transport.close()
+
+    def stats(self):
+        return {"side": self.side, "frames": self.frame, "confirmed": self.confirmed,
+                "rtt_ms": round(self.rtt, 1) if self.rtt is not None else None, "input_delay": self.input_delay,
+                "rollbacks": self.rollbacks, "resimulated": self.resimulated, "max_rollback": self.max_rollback,
+                "stalls": self.stalls, "checks": self.checks, "desyncs": self.desyncs}
+
+def play_headless(session, max_frames=None):
+    """
+    Joga a sessão (já começada) sem janela, em tempo real, até max_frames ticks ou o fim
+    da partida. Só sai quando os dois lados têm tudo confirmado até ali (ou o outro saiu),
+    para nenhum dos dois ficar sem as últimas entradas. Devolve os ticks de relógio gastos.
+    """
+    start = time.perf_counter()
+    ticks = 0
+    goal = None
+    while not session.peer_left:
+        if goal is None and (session.match_over or max_frames is not None and session.confirmed >= max_frames):
+            goal = session.frame
+        if goal is not None and session.confirmed >= goal and session.remote_frame >= goal and session.acked >= goal:
+            break
+        session.tick()
+        session.game.publish_tick()
+        ticks += 1
+        ahead = start + ticks * SIM_DELTA_TIME - time.perf_counter()
+        if ahead > 0: time.sleep(ahead)
+    return ticks
@@ -6,8 +6,6 @@ from . import window
 from . import gameimage
 from pygame.locals import *
 
-# Initializes pygame's modules
-pygame.init()
 
 """An Animation class for frame-control."""
 class Animation(gameimage.GameImage):
@@ -102,6 +100,7 @@ class Animation(gameimage.GameImage):
 
             # Blits the image with the rect and clip_rect clipped
             window.Window.get_screen().blit(self.image, self.rect, area=clip_rect)
+            window.Window.register_dirty_rect(self.rect)
         
     
     #----------------------PLAYING CONTROL METHODS----------------------
@@ -1,6 +1,6 @@
 # Modules import
-from . import point
-import pygame
+import math
+from . import maskcache
 
 """A simple class to deal with basic collision methods"""
 """
@@ -22,26 +22,100 @@ class Collision():
         return True
 
     """
-    args[0]: the origin GameObject
-    args[1]: the target GameObject
+    Overlap of the boxes (x1, y1, width1, height1) and (x2, y2, width2, height2),
+    with plain numbers so nothing is allocated per check
     """
     @classmethod
-    def collided(cls, *args):
-        """
-        if(len(args) == 2
-        and isinstance(args[0], GameObject)
-        and isinstance(args[1], GameObject)):
-        """
-        game_object1_min = point.Point(args[0].x, args[0].y)
-        game_object1_max = point.Point(args[0].x + args[0].width,
-                                 args[0].y + args[0].height)
+    def overlap(cls, x1, y1, width1, height1, x2, y2, width2, height2):
+        return (x1 < x2 + width2 and x1 + width1 > x2
+                and y1 < y2 + height2 and y1 + height1 > y2)
+
+    """
+    game_object1: the origin GameObject
+    game_object2: the target GameObject
+    """
+    @classmethod
+    def collided(cls, game_object1, game_object2):
+        return Collision.overlap(game_object1.x, game_object1.y, game_object1.width, game_object1.height,
+                                 game_object2.x, game_object2.y, game_object2.width, game_object2.height)
+
+    """
+    Continuous (swept) collision between a moving box and a static one.
+    The box (x1, y1, width1, height1) moves by (dx, dy) during the step.
+    Returns the time of impact in [0, 1) - the fraction of the step at
+    which the boxes start to overlap, 0 if they already do - or None
+    if they don't overlap at any moment of the step.
+    Like collided(), touching edges are not a collision.
+    """
+    @classmethod
+    def swept_aabb(cls, x1, y1, width1, height1, dx, dy, x2, y2, width2, height2):
+        entry_x, exit_x = Collision._axis_overlap(x1, width1, dx, x2, width2)
+        entry_y, exit_y = Collision._axis_overlap(y1, height1, dy, y2, height2)
+        entry = max(entry_x, entry_y)
+        exit = min(exit_x, exit_y)
+        if(entry >= exit or entry >= 1 or exit <= 0):
+            return None
+        return max(entry, 0.0)
 
-        game_object2_min = point.Point(args[1].x, args[1].y)
-        game_object2_max = point.Point(args[1].x + args[1].width,
-                                 args[1].y + args[1].height)
+    """
+    swept_aabb for GameObjects: args[0] moves by (dx, dy), args[1] is static
+    """
+    @classmethod
+    def swept(cls, game_object1, dx, dy, game_object2):
+        return Collision.swept_aabb(game_object1.x, game_object1.y,
+                                    game_object1.width, game_object1.height, dx, dy,
+                                    game_object2.x, game_object2.y,
+                                    game_object2.width, game_object2.height)
 
-        return (Collision.collided_rect(game_object1_min, game_object1_max,
-                                        game_object2_min, game_object2_max))
+    """
+    The times (entry, exit) during which the moving segment [a, a + size_a]
+    overlaps [b, b + size_b] on one axis
+    """
+    @classmethod
+    def _axis_overlap(cls, a, size_a, d, b, size_b):
+        if(d == 0):
+            if(a < b + size_b and a + size_a > b):
+                return -math.inf, math.inf
+            return math.inf, -math.inf
+        near = (b - a - size_a) / d
+        far = (b + size_b - a) / d
+        if(d > 0):
+            return near, far
+        return far, near
+
+    """
+    Masks of the surfaces checked pixel by pixel, built once per surface
+    (and transform bucket) instead of on every check
+    """
+    masks = maskcache.MaskCache()
+
+    """
+    Pixel overlap of two masks placed with their top left at (x1, y1)
+    and (x2, y2)
+    """
+    @classmethod
+    def mask_overlap(cls, mask1, x1, y1, mask2, x2, y2):
+        return mask1.overlap(mask2, (round(x2 - x1), round(y2 - y1))) is not None
+
+    """
+    Pixel-accurate swept_aabb: mask1 at (x1, y1) moves by (dx, dy), mask2
+    at (x2, y2) is static. The boxes are swept first, then the step is
+    walked from the box contact on, at most one pixel per sample, until
+    the opaque pixels touch. Returns the time of impact in [0, 1) or None.
+    """
+    @classmethod
+    def swept_perfect(cls, mask1, x1, y1, dx, dy, mask2, x2, y2):
+        width1, height1 = mask1.get_size()
+        width2, height2 = mask2.get_size()
+        start = Collision.swept_aabb(x1, y1, width1, height1, dx, dy, x2, y2, width2, height2)
+        if(start is None):
+            return None
+        steps = max(1, math.ceil(max(abs(dx), abs(dy)) * (1 - start)))
+        for step in range(steps):
+            time = start + (1 - start) * step / steps
+            if(Collision.mask_overlap(mask1, x1 + dx * time, y1 + dy * time, mask2, x2, y2)):
+                return time
+        return None
 
     """
     Perfect-pixel collision using masks.
@@ -52,15 +126,8 @@ class Collision():
         Both objects must extend a GameImage, 
         since it has the pygame.mask and pygame.Rect
         """
-        offset_x = (gameimage2.rect.left - gameimage1.rect.left)
-        offset_y = (gameimage2.rect.top - gameimage1.rect.top)
-        
-        mask_1 = pygame.mask.from_surface(gameimage1.image)
-        mask_2 = pygame.mask.from_surface(gameimage2.image)
-        
-        if(mask_1.overlap(mask_2, (offset_x, offset_y)) != None):
-            return True
-        return False
+        return Collision.mask_overlap(Collision.masks.get(gameimage1.image), gameimage1.rect.left, gameimage1.rect.top,
+                                      Collision.masks.get(gameimage2.image), gameimage2.rect.left, gameimage2.rect.top)
 
     """
     Perfect collision aux - is called by GameImage
@@ -68,7 +135,3 @@ class Collision():
     @classmethod
     def collided_perfect(cls, gameimage1, gameimage2):
         return (Collision.perfect_collision(gameimage1, gameimage2))
-                      
-            
-        
-    
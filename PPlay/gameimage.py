@@ -5,8 +5,6 @@ from pygame.locals import *
 from . import window
 from . import gameobject
 
-# Initializes pygame's modules
-pygame.init()
 
 # Loads an image (with colorkey and alpha)
 def load_image(name, colorkey=None, alpha=False):
@@ -25,13 +23,17 @@ class GameImage(gameobject.GameObject):
     """
     Creates a GameImage from the specified file.
     The width and height are obtained based on the image file.
+    image_file may also be an already loaded pygame.Surface, which is used as is.
     """
     def __init__(self, image_file):
         # Parent constructor must be called first
         gameobject.GameObject.__init__(self)
         
-        # Loads image from the source, converts to fast-blitting format
-        self.image = pygame.image.load(image_file).convert_alpha()
+        if isinstance(image_file, pygame.Surface):
+            self.image = image_file
+        else:
+            # Loads image from the source, converts to fast-blitting format
+            self.image = pygame.image.load(image_file).convert_alpha()
         # Gets the image pygame.Rect
         self.rect = self.image.get_rect()
         
@@ -49,6 +51,7 @@ class GameImage(gameobject.GameObject):
         # draw_rect is necessary to readjust the image position given .x and .y
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
         window.Window.get_screen().blit(self.image, self.rect)
+        window.Window.register_dirty_rect(self.rect)
 
     """Sets the (X,Y) image position on the screen"""
     def set_position(self, x, y):
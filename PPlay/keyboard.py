@@ -1,13 +1,93 @@
 import pygame
 from pygame.locals import *
 
-# Initializes pygame's modules
-pygame.init()
+
+"""Maps every key name accepted by the Keyboard to its pygame key code"""
+def _build_key_codes():
+    codes = {
+        "left": pygame.K_LEFT, "right": pygame.K_RIGHT,
+        "up": pygame.K_UP, "down": pygame.K_DOWN,
+        "enter": pygame.K_RETURN, "return": pygame.K_RETURN,
+        "escape": pygame.K_ESCAPE, "esc": pygame.K_ESCAPE,
+        "space": pygame.K_SPACE,
+        "left_control": pygame.K_LCTRL, "left_shift": pygame.K_LSHIFT,
+    }
+    for letter in "abcdefghijklmnopqrstuvwxyz":
+        codes[letter] = getattr(pygame, "K_" + letter)
+    for digit in "0123456789":
+        codes[digit] = getattr(pygame, "K_" + digit)
+    for number in range(1, 16):
+        codes["f" + str(number)] = getattr(pygame, "K_F" + str(number))
+    # Both "LEFT" and "left" are accepted
+    codes.update({name.upper(): code for name, code in list(codes.items())})
+    return codes
 
 class Keyboard():
+    KEY_CODES = _build_key_codes()
+
+    def __init__(self):
+        # One slot per tracked key code, the states are kept in compact arrays
+        self.codes = sorted(set(Keyboard.KEY_CODES.values()))
+        self.slot_of_code = {code: slot for slot, code in enumerate(self.codes)}
+        self.slots = {name: self.slot_of_code[code] for name, code in Keyboard.KEY_CODES.items()}
+        self.current = bytearray(len(self.codes))
+        self.previous = bytearray(len(self.codes))
+        self.went_down = bytearray(len(self.codes))  # KEYDOWN/KEYUP seen since the last snapshot,
+        self.went_up = bytearray(len(self.codes))    # so taps shorter than a frame aren't lost
+
+    """
+    Takes the per-frame snapshot of the keyboard (Window.update calls it
+    with the events of the frame). pressed/just_pressed/just_released
+    answer from this snapshot until the next one.
+    """
+    def capture(self, events=()):
+        self.previous[:] = self.current
+        self.current[:] = bytes(map(pygame.key.get_pressed().__getitem__, self.codes))
+
+        went_down = self.went_down
+        went_up = self.went_up
+        went_down[:] = went_up[:] = bytes(len(went_down))
+        for event in events:
+            if event.type == KEYDOWN or event.type == KEYUP:
+                slot = self.slot_of_code.get(event.key)
+                if slot is not None:
+                    if event.type == KEYDOWN: went_down[slot] = 1
+                    else: went_up[slot] = 1
+
+    """Returns the slot of a key name (or pygame key code), tracking new codes"""
+    def _slot(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slot_of_code.get(key)
+            if slot is None:
+                # A key code without a name: tracked from the next snapshot on
+                slot = len(self.codes)
+                self.codes.append(key)
+                self.slot_of_code[key] = slot
+                for states in (self.current, self.previous, self.went_down, self.went_up):
+                    states.append(0)
+            self.slots[key] = slot
+        return slot
+
+    """Returns True if the key is held down (or was tapped) in this frame's snapshot"""
+    def pressed(self, key):
+        slot = self._slot(key)
+        return bool(self.current[slot] or self.went_down[slot])
+
+    """Returns True only in the frame the key went down"""
+    def just_pressed(self, key):
+        slot = self._slot(key)
+        return bool(self.went_down[slot] or (self.current[slot] and not self.previous[slot]))
+
+    """Returns True only in the frame the key went up"""
+    def just_released(self, key):
+        slot = self._slot(key)
+        return bool(self.went_up[slot] or (self.previous[slot] and not self.current[slot]))
+
     """
     Returns True if the key IS pressed, it means
     the press-check occurs every frame
+    (live query, prefer pressed() once per frame)
     """
     def key_pressed(self, key):
         key = self.to_pattern(key)
@@ -16,38 +96,14 @@ class Keyboard():
             return True
 
         return False
-    
+
     """Shows the int code of the key"""
     def show_key_pressed(self):
         events = pygame.event.get()
         for event in events:
             if event.type == pygame.KEYDOWN:
                 print(event.key)
-                
+
+    """Returns the pygame key code of a key name (codes are returned as they are)"""
     def to_pattern(self, key):
-        if((key=="LEFT") or (key=="left")):
-            return pygame.K_LEFT
-        elif((key=="RIGHT") or (key=="right")):
-            return pygame.K_RIGHT
-        elif((key=="UP") or (key=="up")):
-            return pygame.K_UP
-        elif((key=="DOWN") or (key=="down")):
-            return pygame.K_DOWN
-        elif((key=="ENTER") or (key=="enter") or
-             (key=="RETURN") or (key=="return")):
-            return pygame.K_RETURN
-        elif((key=="ESCAPE") or (key=="escape") or
-             (key=="ESC") or (key=="esc")):
-            return pygame.K_ESCAPE
-        elif((key=="SPACE") or (key=="space")):
-            return pygame.K_SPACE
-        elif((key=="LEFT_CONTROL") or (key=="left_control")):
-            return pygame.K_LCTRL
-        elif((key=="LEFT_SHIFT") or (key=="left_shift")):
-            return pygame.K_LSHIFT
-        elif(((key >= "A") and (key <= "Z")) or
-             ((key  >= "a") and (key <= "z"))):
-            return getattr(pygame, "K_" + key.lower())
-        elif((key >= "0") and (key <= "9")):
-            return getattr(pygame, "K_" + key)
-        return key
+        return Keyboard.KEY_CODES.get(key, key)
@@ -0,0 +1,49 @@
+# Pygame and system modules
+from collections import OrderedDict
+import pygame
+
+"""
+An LRU of collision masks keyed by surface identity and transform bucket.
+pygame.mask.from_surface walks every pixel, so a mask is built once per
+surface (and per transform variant the caller names) instead of on every
+check. Each entry keeps a reference to its surface, so an id can't be
+reused by another surface while its mask is cached.
+"""
+class MaskCache():
+    """max_entries: masks kept, the least recently used are dropped first"""
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    """
+    Returns the pygame.mask.Mask of surface.
+    bucket: optional hashable that tells apart variants sharing a surface
+    (e.g. the quantised transform key of a sprite)
+    """
+    def get(self, surface, bucket=None):
+        key = (id(surface), bucket)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is surface:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        mask = pygame.mask.from_surface(surface)
+        self.entries[key] = (surface, mask)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return mask
+
+    """Forgets every mask (e.g. after the surfaces were redrawn in place)"""
+    def clear(self):
+        self.entries.clear()
+
+    """Returns the cache counters"""
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
@@ -2,8 +2,6 @@ import pygame
 from pygame.locals import *
 from .point import *
 
-# Initializes pygame's modules
-pygame.init()
 
 class Mouse():
     def __init__(self):
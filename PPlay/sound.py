@@ -1,21 +1,20 @@
 import pygame
 import pygame.mixer
+from . import subsystems
 
-# Initizalizes pygame's modules
-pygame.init()
 """Sound é uma classe de controle dos sons do jogo - efeitos, música"""
 class Sound():
     """ATENÇÃO! O arquivo passado deve ser .OGG!!! Se não pode gerar problemas."""
     def __init__(self, sound_file):
+        # To reduce audio delay (only the first Sound sets the mixer up)
+        subsystems.init_mixer(frequency=22050, size=-16, channels=2, buffer=512)
+
         self.loop = False
         self.sound_file = sound_file
         self.volume = 50
         self.sound = self.load(sound_file)
         self.set_volume(self.volume)
 
-        # To reduce audio delay
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-
     def load(self, sound_file):
         if(pygame.mixer):
             return pygame.mixer.Sound(sound_file)
@@ -0,0 +1,34 @@
+# Pygame and system modules
+import pygame
+
+"""
+On-demand initialisation of pygame's subsystems.
+Importing PPlay doesn't initialise anything: the video is set up when a
+Window is created, the font module when the first font is loaded and the
+mixer when the first sound is. Each function is cheap to call again.
+"""
+
+"""Initialises the display and the event queue (a Window calls it)"""
+def init_video():
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+"""Initialises the font module (TextRenderer.get_font calls it)"""
+def init_font():
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+"""
+Initialises the mixer, the first caller chooses the settings
+(frequency, size, channels, buffer - see pygame.mixer.init).
+Returns False if there is no audio device.
+"""
+def init_mixer(**settings):
+    if pygame.mixer.get_init():
+        return True
+    try:
+        pygame.mixer.init(**settings)
+    except pygame.error as e:
+        print(f"WARNING: Could not initialise the audio. Error: {e}")
+        return False
+    return True
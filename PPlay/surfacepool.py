@@ -0,0 +1,93 @@
+# Pygame and system modules
+import pygame
+
+"""
+A pool of reusable Surfaces, keyed by (size, SRCALPHA).
+Surfaces are converted to the display format on creation, so a Window
+must exist before the first acquire().
+"""
+class SurfacePool():
+    def __init__(self):
+        self.free = {}
+        self.owned = {}  # id(surface) -> key, for the surfaces handed out
+
+        # Counters
+        self.allocations = 0
+        self.reuses = 0
+
+    """
+    Returns a cleared Surface with the given size and flags (0 or SRCALPHA),
+    reusing a released one when possible.
+    """
+    def acquire(self, size, flags=0):
+        key = ((int(size[0]), int(size[1])), flags & pygame.SRCALPHA)
+        free = self.free.get(key)
+        if free:
+            surface = free.pop()
+            self.reuses += 1
+            surface.set_alpha(None)
+            surface.fill((0, 0, 0, 0))
+        else:
+            self.allocations += 1
+            surface = pygame.Surface(key[0], key[1])
+            surface = surface.convert_alpha() if key[1] else surface.convert()
+        self.owned[id(surface)] = key
+        return surface
+
+    """Gives a Surface back to the pool (surfaces not from the pool are ignored)"""
+    def release(self, surface):
+        key = self.owned.pop(id(surface), None)
+        if key is not None:
+            self.free.setdefault(key, []).append(surface)
+
+    """Returns the pool counters"""
+    def stats(self):
+        return {"allocations": self.allocations, "reuses": self.reuses, "in_use": len(self.owned),
+                "free": sum(len(surfaces) for surfaces in self.free.values())}
+
+"""
+Counts Surface allocations made through pygame.Surface(...) and the
+pygame.transform functions while active (a with-block). Used by the
+benchmarks to prove that a steady-state frame allocates nothing.
+"""
+class AllocationCounter():
+    TRANSFORMS = ("scale", "smoothscale", "rotate", "rotozoom", "flip", "scale2x")
+
+    def __init__(self):
+        self.count = 0
+        self.sources = {}
+        self._originals = {}
+
+    def __enter__(self):
+        counter = self
+        original_surface = pygame.Surface
+
+        class CountingSurface(original_surface):
+            def __init__(self, *args, **kwargs):
+                counter._count("Surface")
+                super().__init__(*args, **kwargs)
+
+        self._originals[(pygame, "Surface")] = original_surface
+        pygame.Surface = CountingSurface
+        for name in self.TRANSFORMS:
+            function = getattr(pygame.transform, name, None)
+            if function is None: continue
+            self._originals[(pygame.transform, name)] = function
+            setattr(pygame.transform, name, self._wrap(name, function))
+        return self
+
+    def __exit__(self, *exc_info):
+        for (module, name), original in self._originals.items():
+            setattr(module, name, original)
+        self._originals.clear()
+        return False
+
+    def _wrap(self, name, function):
+        def counted(*args, **kwargs):
+            self._count(f"transform.{name}")
+            return function(*args, **kwargs)
+        return counted
+
+    def _count(self, source):
+        self.count += 1
+        self.sources[source] = self.sources.get(source, 0) + 1
@@ -0,0 +1,98 @@
+# Pygame and system modules
+import os
+from collections import OrderedDict
+import pygame
+from . import subsystems
+
+"""
+A shared text-rendering service: caches fonts by (name, size, style) and
+the rendered text surfaces (optionally with a drop shadow already
+composited) in a LRU, so static strings are rendered only once.
+"""
+class TextRenderer():
+    """
+    max_entries: how many rendered strings are kept in the LRU
+    pool: optional SurfacePool for the shadowed composites (evicted ones are given back)
+    """
+    def __init__(self, max_entries=256, pool=None):
+        self.max_entries = max_entries
+        self.pool = pool
+        self.surfaces = OrderedDict()
+        self.fonts = {}
+
+        # Counters, see stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """
+    Returns a cached pygame Font.
+    name may be a font file path or a system font name (SysFont).
+    """
+    def get_font(self, name, size, bold=False, italic=False):
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            subsystems.init_font()
+            # Anything with an extension is a font file (missing ones raise)
+            if name is not None and os.path.splitext(name)[1]:
+                font = pygame.font.Font(name, size)
+                font.set_bold(bold)
+                font.set_italic(italic)
+            else:
+                font = pygame.font.SysFont(name, size, bold, italic)
+            self.fonts[key] = font
+        return font
+
+    """
+    Returns the text rendered with the given font and color.
+    If shadow_color is given, the shadow (shifted by offset >= 0 pixels to
+    the bottom right) is composited under the text in the same surface, whose
+    top-left corner is the text's top-left corner.
+    """
+    def render(self, text, font, color, shadow_color=None, offset=0):
+        key = (text, font, tuple(color), shadow_color and tuple(shadow_color), offset)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        text_surface = font.render(text, True, color)
+        if shadow_color is None:
+            surface = text_surface
+        else:
+            shadow_surface = font.render(text, True, shadow_color)
+            width, height = text_surface.get_size()
+            size = (width + offset, height + offset)
+            if self.pool is not None:
+                surface = self.pool.acquire(size, pygame.SRCALPHA)
+            else:
+                surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.blit(shadow_surface, (offset, offset))
+            surface.blit(text_surface, (0, 0))
+
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            _, evicted = self.surfaces.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+        return surface
+
+    """Returns the cache counters"""
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.surfaces), "fonts": len(self.fonts),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    """Drops every cached surface (fonts are kept)"""
+    def clear(self):
+        for surface in self.surfaces.values():
+            self._release(surface)
+        self.surfaces.clear()
+
+    def _release(self, surface):
+        if self.pool is not None:
+            self.pool.release(surface)
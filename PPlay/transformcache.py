@@ -0,0 +1,59 @@
+# Pygame and system modules
+from collections import OrderedDict
+
+"""
+A memory-capped LRU of pre-transformed sprite variants (scaled, rotated,
+composited...). The caller quantises the transform into a hashable key
+and gives a builder that creates the variant on a miss.
+"""
+class TransformCache():
+    """
+    max_bytes: total pixel memory kept, the least recently used variants are dropped first
+    pool: optional SurfacePool, the pooled surfaces of dropped variants are given back
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024, pool=None):
+        self.max_bytes = max_bytes
+        self.pool = pool
+        self.entries = OrderedDict()
+        self.used_bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """
+    Returns the variant for key, calling builder() on a miss.
+    builder must return a tuple whose pygame.Surface items are counted
+    against the memory cap.
+    """
+    def get(self, key, builder):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = builder()
+        self.entries[key] = entry
+        self.used_bytes += self._entry_bytes(entry)
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.used_bytes -= self._entry_bytes(evicted)
+            if self.pool is not None:
+                for item in evicted: self.pool.release(item)
+            self.evictions += 1
+        return entry
+
+    """Returns the cache counters"""
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.used_bytes}
+
+    def _entry_bytes(self, entry):
+        total = 0
+        for item in entry:
+            if hasattr(item, "get_bytesize"):
+                total += item.get_width() * item.get_height() * item.get_bytesize()
+        return total
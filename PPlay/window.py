@@ -4,21 +4,43 @@ import pygame
 from pygame.locals import *
 from . import keyboard
 from . import mouse
+from . import textrenderer
+from . import surfacepool
+from . import subsystems
 
-# Initializes pygame's modules
-pygame.init()
-    
 """A simple Window class, it's the primary Surface(from pygame).
 All the other game's renderable objects will be drawn on it. """
 class Window():
     #A class attribute in Python, this case is similar to Java statics
     screen = None
+
+    # Dirty-rect mode: only the rects drawn this frame and the last one are
+    # sent to the display (see set_dirty_rect_mode)
+    dirty_rect_mode = False
+    dirty_rects = []
+    previous_dirty_rects = []
+    full_update_requested = True
+
+    # Events taken from the queue by the last update()
+    events = []
     
-    """Initialize a Window (width x height)"""
-    def __init__(self, width, height):
+    """
+    Initialize a Window (width x height)
+    headless: never presents frames (use with SDL's dummy video driver)
+    """
+    def __init__(self, width, height, headless=False):
+        # Only the video is needed here: fonts and the mixer are set up on first use
+        subsystems.init_video()
+
         # Input controllers
         Window.keyboard = keyboard.Keyboard()
         Window.mouse = mouse.Mouse()
+
+        # Shared pool of reusable Surfaces (overlays, composites...)
+        Window.surface_pool = surfacepool.SurfacePool()
+
+        # Shared text cache (fonts and rendered strings)
+        Window.text_renderer = textrenderer.TextRenderer(pool=Window.surface_pool)
         
         # Size
         self.width = width
@@ -35,6 +57,9 @@ class Window():
         self.last_time = 0  # last frame time 
         self.total_time = 0  # += curr-last(delta_time), update()
 
+        # Headless windows are never presented
+        self.headless = headless
+
         # Creates the screen (pygame.Surface)
         # There are some useful flags (look pygame's docs)
         # It's like a static attribute in Java
@@ -47,7 +72,8 @@ class Window():
 
         # Updates the entire screen if no arguments are passed
         # Can be used to update portions of the screen (Rect list)
-        pygame.display.update()
+        if not self.headless:
+            pygame.display.update()
 
 #------------------------TODO - VIDEO RESIZE METHODS----------------------
     """Not implemented yet - Sets the Window to Fullscreen"""
@@ -69,19 +95,52 @@ class Window():
 #-----------------------CONTROL METHODS---------------------------
     """Refreshes the Window - makes changes visible, AND updates the Time"""
     def update(self):
-        pygame.display.update()  # refresh
-        
-        for event in pygame.event.get():  # necessary to not get errors
-            if event.type==QUIT:
-                self.close()
+        if not self.headless:
+            if Window.dirty_rect_mode and not Window.full_update_requested:
+                # What moved: where things were last frame + where they are now
+                pygame.display.update(Window.previous_dirty_rects + Window.dirty_rects)
+            else:
+                pygame.display.update()  # refresh
+
+            # The events are kept for the frame (see get_events) and fed to
+            # the keyboard snapshot, so short taps between frames aren't lost
+            Window.events = pygame.event.get()  # necessary to not get errors
+            for event in Window.events:
+                if event.type==QUIT:
+                    self.close()
+            Window.keyboard.capture(Window.events)
+        Window.previous_dirty_rects = Window.dirty_rects
+        Window.dirty_rects = []
+        Window.full_update_requested = False
+
         self.last_time = self.curr_time  # set last frame time
-        self.curr_time = pygame.time.get_ticks()  # since pygame.init()  
+        self.curr_time = pygame.time.get_ticks()  # since the first Window
         self.total_time += (self.curr_time - self.last_time)  # == curr_time
         # curr_time should be the REAL current time, but in Python
         # the method returns the time in seconds.
         # And we DO WANT MILLIseconds :P
         # While REAL time is not necessary, yet..
 
+    """
+    Enables/disables the dirty-rect mode. When enabled, update() only
+    sends to the display the rects registered with register_dirty_rect
+    (this frame and the previous one), unless request_full_update() was
+    called in the frame - e.g. for full-screen effects like screen shake.
+    """
+    def set_dirty_rect_mode(self, enabled):
+        Window.dirty_rect_mode = enabled
+        Window.full_update_requested = True
+
+    """Marks a screen area as changed in this frame"""
+    @classmethod
+    def register_dirty_rect(cls, rect):
+        cls.dirty_rects.append(pygame.Rect(rect))
+
+    """Makes the next update() refresh the entire screen"""
+    @classmethod
+    def request_full_update(cls):
+        cls.full_update_requested = True
+
     """Paints the screen - White - and update"""
     def clear(self):
         self.set_background_color([255,255,255])
@@ -148,13 +207,13 @@ class Window():
     """
     def draw_text(self, text, x, y, size=12, color=(0,0,0),
                  font_name="Arial", bold=False, italic=False):
-        # Creates a Font from the system fonts
+        # Gets a (cached) Font from the system fonts
         # SysFont(name, size, bold=False, italic=False) -> Font
-        font = pygame.font.SysFont(font_name, size, bold, italic)
+        font = Window.text_renderer.get_font(font_name, size, bold, italic)
 
-        # Creates a pygame.Surface with the text rendered on it
+        # Gets a (cached) pygame.Surface with the text rendered on it
         # render(text, antialias, color, background=None)->Surface
-        font_surface = font.render(text, True, color)
+        font_surface = Window.text_renderer.render(text, font, color)
         # That's because pygame does NOT provide a way
         # to directly draw text on an existing Surface.
         # So you must use Font.render() -> Surface and BLIT
@@ -173,10 +232,25 @@ class Window():
     def get_keyboard(cls):
         return cls.keyboard
 
+    """Returns the events taken from the queue by the last update()"""
+    @classmethod
+    def get_events(cls):
+        return cls.events
+
     """Returns the mouse input"""
     @classmethod
     def get_mouse(cls):
         return cls.mouse
+
+    """Returns the shared text renderer"""
+    @classmethod
+    def get_text_renderer(cls):
+        return cls.text_renderer
+
+    """Returns the shared surface pool"""
+    @classmethod
+    def get_surface_pool(cls):
+        return cls.surface_pool
     
 
 
@@ -0,0 +1,141 @@
+# profiler.py
+import csv
+import time
+from array import array
+import pygame
+from Constants import *
+
+# ======================================================================================
+# --- FRAME PROFILER ---
+# ======================================================================================
+# Mede em nanossegundos (perf_counter_ns) quanto cada fase do frame leva: entrada,
+# simulação, desenho (com os métodos de desenho separados) e apresentação. Os tempos
+# ficam num buffer circular pré-alocado, então medir não aloca nada por frame.
+class FrameProfiler:
+    PHASES = ("input", "update", "draw", "present")
+
+    def __init__(self, capacity=PROFILER_HISTORY):
+        self.capacity = capacity
+        self.phases = []
+        self.samples = {}
+        self.frame_times = array("q", [0]) * capacity
+        self.frame_count = 0
+        self.slot = 0
+        self.frame_start = 0
+        for phase in self.PHASES: self.add_phase(phase)
+
+        # Painel na tela (alternado com PROFILER_HOTKEY)
+        self.overlay_visible = False
+        self.overlay_surface = None
+        self.overlay_age = PROFILER_OVERLAY_REFRESH
+
+    def add_phase(self, phase):
+        if phase not in self.samples:
+            self.phases.append(phase)
+            self.samples[phase] = array("q", [0]) * self.capacity
+
+    def instrument(self, obj, methods):
+        """Troca métodos do objeto (nome -> fase) por versões cronometradas."""
+        for name, phase in methods.items():
+            self.add_phase(phase)
+            setattr(obj, name, self.timed(phase, getattr(obj, name)))
+
+    def timed(self, phase, function):
+        samples = self.samples[phase]
+        clock = time.perf_counter_ns
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                # Soma: update roda várias vezes por frame e os métodos de desenho também
+                samples[self.slot] += clock() - start
+        return wrapper
+
+    def begin_frame(self):
+        self.slot = self.frame_count % self.capacity
+        for samples in self.samples.values(): samples[self.slot] = 0
+        self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        self.frame_times[self.slot] = time.perf_counter_ns() - self.frame_start
+        self.frame_count += 1
+
+    # ----------------------------------------------------------------------------------
+    # Estatísticas e exportação
+    # ----------------------------------------------------------------------------------
+    def _ordered_slots(self):
+        """Índices dos frames guardados, do mais antigo para o mais recente."""
+        stored = min(self.frame_count, self.capacity)
+        first = self.frame_count - stored
+        return [(first + i) % self.capacity for i in range(stored)]
+
+    def percentiles(self, phase=None, points=(50, 95, 99)):
+        """Percentis em milissegundos do frame inteiro (phase=None) ou de uma fase."""
+        samples = self.frame_times if phase is None else self.samples[phase]
+        values = sorted(samples[slot] for slot in self._ordered_slots())
+        if not values: return [0.0 for _ in points]
+        return [values[min(len(values) - 1, len(values) * point // 100)] / 1e6 for point in points]
+
+    def write_csv(self, path):
+        """Um frame por linha, em milissegundos, do mais antigo para o mais recente."""
+        first = self.frame_count - min(self.frame_count, self.capacity)
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["frame", "frame_ms"] + [f"{phase}_ms" for phase in self.phases])
+            for frame, slot in enumerate(self._ordered_slots(), first):
+                writer.writerow([frame, f"{self.frame_times[slot] / 1e6:.4f}"] +
+                                [f"{self.samples[phase][slot] / 1e6:.4f}" for phase in self.phases])
+
+    # ----------------------------------------------------------------------------------
+    # Painel na tela
+    # ----------------------------------------------------------------------------------
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_age = PROFILER_OVERLAY_REFRESH
+
+    def draw_overlay(self, ui):
+        """Desenha o painel; o conteúdo só é refeito a cada PROFILER_OVERLAY_REFRESH frames."""
+        if self.overlay_surface is None:
+            line_height = ui.font_body.get_linesize()
+            height = 24 + line_height * (len(self.phases) + 2) + 70
+            self.overlay_surface = ui.surface_pool.acquire((360, height), pygame.SRCALPHA)
+        self.overlay_age += 1
+        if self.overlay_age >= PROFILER_OVERLAY_REFRESH:
+            self.overlay_age = 0
+            self._render_overlay(ui)
+        position = (10, 50)
+        ui.window.screen.blit(self.overlay_surface, position)
+        ui.window.register_dirty_rect(self.overlay_surface.get_rect(topleft=position))
+
+    def _render_overlay(self, ui):
+        surface = self.overlay_surface
+        surface.fill((0, 0, 0, 190))
+        target_ms = 1000 / FPS_LIMIT
+        line_height = ui.font_body.get_linesize()
+
+        p50, p95, p99 = self.percentiles()
+        color = COLOR_WHITE if p95 <= target_ms else COLOR_RED
+        # Render direto: estes textos mudam sempre e não devem ocupar o cache compartilhado
+        surface.blit(ui.font_body.render("p50 / p95 / p99 (ms)", True, COLOR_YELLOW), (8, 6))
+        header = ui.font_body.render(f"frame: {p50:.2f} / {p95:.2f} / {p99:.2f}", True, color)
+        surface.blit(header, (8, 6 + line_height))
+        y = 6 + 2 * line_height
+        for phase in self.phases:
+            p50, p95, p99 = self.percentiles(phase)
+            text = ui.font_body.render(f"{phase}: {p50:.2f} / {p95:.2f} / {p99:.2f}", True, COLOR_WHITE)
+            surface.blit(text, (8, y))
+            y += line_height
+
+        # Gráfico dos últimos frames, com a linha do orçamento de FPS_LIMIT
+        graph = pygame.Rect(8, y + 8, surface.get_width() - 16, 60)
+        pygame.draw.rect(surface, (60, 60, 60, 255), graph, 1)
+        slots = self._ordered_slots()[-graph.width:]
+        scale_ms = max(2 * target_ms, max((self.frame_times[slot] / 1e6 for slot in slots), default=0))
+        target_y = graph.bottom - int(graph.height * target_ms / scale_ms)
+        pygame.draw.line(surface, COLOR_YELLOW, (graph.left, target_y), (graph.right - 1, target_y))
+        for x, slot in enumerate(slots, graph.right - len(slots)):
+            frame_ms = self.frame_times[slot] / 1e6
+            bar_height = max(1, int(graph.height * frame_ms / scale_ms))
+            color = (80, 220, 80, 255) if frame_ms <= target_ms else (230, 70, 70, 255)
+            pygame.draw.line(surface, color, (x, graph.bottom - 1), (x, graph.bottom - bar_height))
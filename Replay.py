@@ -0,0 +1,215 @@
+# replay.py
+import hashlib
+import os
+import random
+import struct
+import time
+import zlib
+from Constants import *
+from Ai_policy import POLICIES
+
+# ======================================================================================
+# --- SEEDED RANDOM STREAMS ---
+# ======================================================================================
+_MASK64 = (1 << 64) - 1
+
+class SplitMix64(random.Random):
+    """
+    random.Random com o SplitMix64 no lugar do Mersenne Twister: o estado inteiro é um
+    contador de 64 bits (STATE_FIELDS), então salvá-lo num snapshot da partida custa um
+    número e não as 625 palavras de getstate(). uniform, randint, choices etc. vêm de
+    random.Random, por cima de random() e getrandbits().
+    """
+    STATE_FIELDS = ("counter",)
+    STATE_FORMAT = "Q"
+
+    def seed(self, a=None, version=2):
+        # Texto/bytes viram 64 bits por hash (o hash() do Python muda a cada processo)
+        if isinstance(a, str): a = a.encode()
+        if isinstance(a, bytes): a = int.from_bytes(hashlib.blake2b(a, digest_size=8).digest(), "little")
+        self.counter = (a if a is not None else random.SystemRandom().getrandbits(64)) & _MASK64
+
+    def _next(self):
+        self.counter = z = (self.counter + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        bits, count = 0, 0
+        while count < k:
+            bits |= self._next() << count
+            count += 64
+        return bits & ((1 << k) - 1)
+
+    def getstate(self):
+        return self.counter
+
+    def setstate(self, state):
+        self.counter = state
+
+class RandomStreams:
+    """
+    Um gerador por assunto, todos derivados da seed da partida. Separados, o sorteio
+    de um (ex.: o tremor da tela, que depende de quantos frames foram desenhados) não
+    muda a sequência dos outros, então a mesma seed + as mesmas entradas = a mesma partida.
+    """
+    NAMES = ("serve", "powerup", "ai", "multiball", "effects")
+    __slots__ = ("seed",) + NAMES
+
+    def __init__(self, seed):
+        self.seed = seed
+        for name in self.NAMES:
+            setattr(self, name, SplitMix64(f"{seed}/{name}"))
+
+def new_seed():
+    return random.SystemRandom().getrandbits(63)
+
+# ======================================================================================
+# --- REPLAY (INPUT LOG) ---
+# ======================================================================================
+# Formato (little-endian): cabeçalho fixo (HEADER) seguido das entradas comprimidas com
+# zlib. As entradas são um campo de bits por tick de simulação (INPUT_BITS), guardado
+# em sequências (bits, repetições em varint): as teclas mudam pouco de um tick para o
+# outro, então uma partida de 10 minutos (72000 ticks) ocupa poucos kilobytes.
+REPLAY_MAGIC = b"FPRP"
+REPLAY_VERSION = 2  # 2: sorteios com SplitMix64 (os replays da versão 1 não se repetem mais)
+HEADER = struct.Struct("<4sBBBBBBBBHQIHH")
+INPUT_BITS = {"W": 1, "S": 2, "UP": 4, "DOWN": 8}
+NONE = 255  # Dificuldade/política de um jogador humano
+
+class Replay:
+    """Cabeçalho da partida (modo, personagens, dificuldades, políticas, seed) e as entradas de cada tick."""
+    def __init__(self, game_mode, p1_char_index, p2_char_index, p1_difficulty, p2_difficulty,
+                 p1_policy, p2_policy, multiball, seed):
+        self.game_mode = game_mode
+        self.p1_char_index, self.p2_char_index = p1_char_index, p2_char_index
+        self.p1_difficulty, self.p2_difficulty = p1_difficulty, p2_difficulty
+        self.p1_policy, self.p2_policy = p1_policy, p2_policy
+        self.multiball = multiball
+        self.seed = seed
+        self.runs = []  # [bits, ticks]
+        self.ticks = 0
+        self.scores = {"left": 0, "right": 0}  # Placar ao fim da gravação, para conferir a reprodução
+
+    @classmethod
+    def from_game(cls, game, seed):
+        # Só o que a partida usa: no PVE a IA é a da direita, no EVE as duas
+        ai_left = game.game_mode == GameMode.EVE
+        ai_right = game.game_mode in (GameMode.PVE, GameMode.EVE)
+        return cls(game.game_mode, game.p1_char_index, game.p2_char_index,
+                   game.p1_difficulty if ai_left else None, game.difficulty if ai_right else None,
+                   game.p1_policy if ai_left else None, game.p2_policy if ai_right else None,
+                   game.multiball, seed)
+
+    def record(self, bits):
+        if self.runs and self.runs[-1][0] == bits:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+        self.ticks += 1
+
+    def input(self):
+        return ReplayInput(self.runs)
+
+    # ----------------------------------------------------------------------------------
+    # Arquivo
+    # ----------------------------------------------------------------------------------
+    def to_bytes(self):
+        difficulties, policies = list(DIFFICULTY_SETTINGS), list(POLICIES)
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.game_mode.value,
+                             self.p1_char_index, self.p2_char_index,
+                             _index(difficulties, self.p1_difficulty), _index(difficulties, self.p2_difficulty),
+                             _index(policies, self.p1_policy), _index(policies, self.p2_policy),
+                             self.multiball, self.seed, self.ticks, self.scores["left"], self.scores["right"])
+        body = bytearray()
+        for bits, count in self.runs:
+            body.append(bits)
+            while count >= 0x80:
+                body.append(count & 0x7F | 0x80)
+                count >>= 7
+            body.append(count)
+        return header + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, version, mode, p1_char_index, p2_char_index, p1_difficulty, p2_difficulty, p1_policy, p2_policy,
+         multiball, seed, ticks, score_left, score_right) = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"não é um replay do FutePong na versão {REPLAY_VERSION}")
+        difficulties, policies = list(DIFFICULTY_SETTINGS), list(POLICIES)
+        replay = cls(GameMode(mode), p1_char_index, p2_char_index,
+                     _name(difficulties, p1_difficulty), _name(difficulties, p2_difficulty),
+                     _name(policies, p1_policy), _name(policies, p2_policy), multiball, seed)
+        body = zlib.decompress(data[HEADER.size:])
+        position = 0
+        while position < len(body):
+            bits = body[position]
+            count, shift = 0, 0
+            while True:
+                position += 1
+                byte = body[position]
+                count |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80: break
+            position += 1
+            replay.runs.append([bits, count])
+        replay.ticks = ticks
+        replay.scores = {"left": score_left, "right": score_right}
+        if sum(count for _, count in replay.runs) != ticks:
+            raise ValueError("replay corrompido: o número de ticks não confere")
+        return replay
+
+    def save(self, directory=REPLAY_DIR):
+        """Grava em directory com um nome único (data, hora e seed) e devolve o caminho."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{self.seed:016x}.fprp")
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+def _index(names, name):
+    return NONE if name is None else names.index(name)
+
+def _name(names, index):
+    return None if index == NONE else names[index]
+
+class TickInput:
+    """Faz o papel do teclado para Paddle.move: pressed() responde com os bits do tick atual."""
+    def __init__(self):
+        self.bits = 0
+
+    def pressed(self, key):
+        return bool(self.bits & INPUT_BITS.get(key, 0))
+
+class ReplayInput(TickInput):
+    """Entradas de um replay, um tick por vez: advance() passa para o próximo tick."""
+    def __init__(self, runs):
+        super().__init__()
+        self.runs = runs
+        self.run = -1
+        self.left_in_run = 0
+
+    def advance(self):
+        """Passa para o próximo tick; devolve False quando as entradas acabaram."""
+        while self.left_in_run == 0:
+            self.run += 1
+            if self.run >= len(self.runs): return False
+            self.bits, self.left_in_run = self.runs[self.run]
+        self.left_in_run -= 1
+        return True
+
+def input_bits(keyboard):
+    """Campo de bits das teclas que movem os jogadores, no retrato do teclado deste frame."""
+    bits = 0
+    for key, bit in INPUT_BITS.items():
+        if keyboard.pressed(key): bits |= bit
+    return bits
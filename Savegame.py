@@ -0,0 +1,53 @@
+# savegame.py
+import os
+import struct
+from Constants import *
+from Replay import Replay
+
+# ======================================================================================
+# --- SAVED MATCH ---
+# ======================================================================================
+# Uma partida em andamento, para continuar depois (ex.: depois de um travamento).
+# Formato (little-endian): cabeçalho fixo (HEADER), o replay da partida até aqui (o
+# cabeçalho dele diz modo, personagens, dificuldades, políticas e seed; as entradas
+# deixam a gravação continuar), o snapshot do estado de simulação (Game.snapshot) e
+# os lances de gol registrados (GOAL).
+SAVE_MAGIC = b"FPSV"
+SAVE_VERSION = 1
+HEADER = struct.Struct("<4sBIII")  # magic, versão, bytes do replay, bytes do snapshot, gols
+GOAL = struct.Struct("<d?dI")  # (tempo da partida, marcou a esquerda, duração do lance, toques)
+
+def write_save(path, replay, snapshot, goal_log):
+    """Grava de forma atômica: um travamento no meio da escrita não estraga o save anterior."""
+    replay_bytes = replay.to_bytes()
+    data = bytearray(HEADER.pack(SAVE_MAGIC, SAVE_VERSION, len(replay_bytes), len(snapshot), len(goal_log)))
+    data += replay_bytes
+    data += snapshot
+    for match_time, side, duration, hits in goal_log:
+        data += GOAL.pack(match_time, side == "left", duration, hits)
+
+    directory = os.path.dirname(path)
+    if directory: os.makedirs(directory, exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+def read_save(path):
+    """Devolve (replay, snapshot, goal_log) de um arquivo gravado por write_save."""
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, replay_size, snapshot_size, goals = HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError(f"não é uma partida salva do FutePong na versão {SAVE_VERSION}")
+    position = HEADER.size
+    replay = Replay.from_bytes(data[position:position + replay_size])
+    position += replay_size
+    snapshot = bytearray(data[position:position + snapshot_size])
+    position += snapshot_size
+    goal_log = []
+    for _ in range(goals):
+        match_time, left, duration, hits = GOAL.unpack_from(data, position)
+        goal_log.append((match_time, "left" if left else "right", duration, hits))
+        position += GOAL.size
+    return replay, snapshot, goal_log
@@ -0,0 +1,332 @@
+# scenes.py
+import pygame
+from Constants import *
+
+# ======================================================================================
+# --- SCENES ---
+# ======================================================================================
+# Cada GameState tem uma cena. O UIManager chama enter() quando o estado muda e
+# draw() a cada frame; tudo o que não muda enquanto a cena está ativa (fundo,
+# painéis translúcidos, textos fixos) é pré-desenhado uma vez numa camada estática.
+class Scene:
+    # Cenas que só mudam em áreas registradas podem usar o modo dirty-rect da janela
+    uses_dirty_rects = False
+    # Grupo de assets (ver UIManager._request_assets) que precisa estar carregado na entrada
+    asset_group = "menu"
+
+    def __init__(self, ui):
+        self.ui = ui
+        self.static_layer = None
+
+    def enter(self, game_data):
+        if self.static_layer is None:
+            self.static_layer = self.build_static_layer(game_data)
+
+    def exit(self):
+        pass
+
+    def build_static_layer(self, game_data):
+        return None
+
+    def draw(self, game_data):
+        self.ui.window.screen.blit(self.static_layer, (0, 0))
+
+    def _new_layer(self, alpha=False):
+        # As camadas vêm do pool de superfícies da janela
+        size = (self.ui.window.width, self.ui.window.height)
+        return self.ui.surface_pool.acquire(size, pygame.SRCALPHA if alpha else 0)
+
+    def _new_menu_layer(self):
+        layer = self._new_layer()
+        if self.ui.menu_background: layer.blit(self.ui.menu_background.image, (0, 0))
+        return layer
+
+    def _blit_panel(self, layer, rect, alpha=150, border_color=None):
+        panel_surface = self.ui.surface_pool.acquire(rect.size)
+        panel_surface.set_alpha(alpha)
+        panel_surface.fill(COLOR_BLACK)
+        if border_color: pygame.draw.rect(panel_surface, border_color, panel_surface.get_rect(), 3)
+        layer.blit(panel_surface, rect.topleft)
+        self.ui.surface_pool.release(panel_surface)
+
+# --------------------------------------------------------------------------------------
+# Menus
+# --------------------------------------------------------------------------------------
+class LoadingScene(Scene):
+    """Só o fundo do menu e uma barra de progresso: não depende de nenhum outro asset."""
+    asset_group = None
+    BAR_SIZE = (400, 16)
+
+    def draw(self, game_data):
+        ui = self.ui
+        screen = ui.window.screen
+        if ui.menu_background: screen.blit(ui.menu_background.image, (0, 0))
+        else: screen.fill(COLOR_BLACK)
+        bar = pygame.Rect((0, 0), self.BAR_SIZE)
+        bar.center = (ui.window.width / 2, ui.window.height * 0.75)
+        pygame.draw.rect(screen, COLOR_BLACK, bar.inflate(8, 8))
+        filled = bar.copy()
+        filled.width = int(bar.width * game_data.get("loading_progress", 0))
+        pygame.draw.rect(screen, COLOR_YELLOW, filled)
+        pygame.draw.rect(screen, COLOR_WHITE, bar, 2)
+
+class MainMenuScene(Scene):
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_menu_layer()
+        panel_width, panel_height = 550, 380
+        self._blit_panel(layer, pygame.Rect((ui.window.width - panel_width) / 2, (ui.window.height - panel_height) / 2,
+                                            panel_width, panel_height))
+
+        ui._draw_text_with_shadow("FutePong", ui.font_main_title, 150, main_color=COLOR_YELLOW, target=layer)
+        ui._draw_text_with_shadow("[1] Jogador vs IA", ui.font_section_title, 240, target=layer)
+        ui._draw_text_with_shadow("[2] Jogador vs Jogador", ui.font_section_title, 285, target=layer)
+        ui._draw_text_with_shadow("[3] Regras do Jogo", ui.font_section_title, 330, target=layer)
+        ui._draw_text_with_shadow("[4] Multibola (Jogador vs IA)", ui.font_section_title, 375, target=layer)
+        ui._draw_text_with_shadow("Pressione ESC para Sair", ui.font_body, 450, main_color=COLOR_RED, target=layer)
+        return layer
+
+class WaitingScene(Scene):
+    """Tela de espectador sem partida para mostrar (ver Spectator.SpectatorView)."""
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_menu_layer()
+        panel_width, panel_height = 550, 200
+        self._blit_panel(layer, pygame.Rect((ui.window.width - panel_width) / 2, (ui.window.height - panel_height) / 2,
+                                            panel_width, panel_height))
+        ui._draw_text_with_shadow("FutePong", ui.font_main_title, ui.window.height / 2 - 30, main_color=COLOR_YELLOW, target=layer)
+        ui._draw_text_with_shadow("Aguardando a partida...", ui.font_section_title, ui.window.height / 2 + 50, target=layer)
+        return layer
+
+class RulesScene(Scene):
+    asset_group = "rules"
+
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_menu_layer()
+        ui._draw_text_with_shadow("Regras do Jogo", ui.font_main_title, 80, main_color=COLOR_YELLOW, target=layer)
+        y_pos = 180
+        ui._draw_text_with_shadow("Controles", ui.font_section_title, y_pos, main_color=COLOR_YELLOW, target=layer)
+        y_pos += 45
+        ui._draw_text_with_shadow("Jogador 1: Teclas W e S", ui.font_body, y_pos, target=layer)
+        y_pos += 30
+        ui._draw_text_with_shadow("Jogador 2: Setas Cima e Baixo", ui.font_body, y_pos, target=layer)
+        y_pos += 30
+        ui._draw_text_with_shadow("Pressione [P] para Pausar o Jogo", ui.font_body, y_pos, target=layer)
+
+        y_pos += 50
+        ui._draw_text_with_shadow("Power-ups", ui.font_section_title, y_pos, main_color=COLOR_YELLOW, target=layer)
+        y_pos += 40
+        if ui.boost_fire_img:
+            layer.blit(ui.boost_fire_img.image, (300, y_pos))
+            ui._draw_text_with_shadow("Aumenta a velocidade da bola", ui.font_body, y_pos + 15, x_center=510, target=layer)
+        y_pos += 40
+        if ui.boost_ice_img:
+            layer.blit(ui.boost_ice_img.image, (280, y_pos))
+            ui._draw_text_with_shadow("Retorna a bola à velocidade inicial", ui.font_body, y_pos + 15, x_center=510, target=layer)
+        y_pos += 60
+        ui._draw_text_with_shadow("Objetivo", ui.font_section_title, y_pos, main_color=COLOR_YELLOW, target=layer)
+        y_pos += 30
+        ui._draw_text_with_shadow(f"Marque {MAX_SCORE} gols para vencer a partida!", ui.font_body, y_pos, target=layer)
+        y_pos += 40
+        ui._draw_text_with_shadow("Pressione ESC para Voltar", ui.font_body, y_pos, main_color=COLOR_RED, target=layer)
+        return layer
+
+class DifficultyMenuScene(Scene):
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_menu_layer()
+        ui._draw_text_with_shadow("Selecione a Dificuldade", ui.font_main_title, 160, main_color=COLOR_YELLOW, target=layer)
+        ui._draw_text_with_shadow("[1] Fácil", ui.font_section_title, 270, target=layer)
+        ui._draw_text_with_shadow("[2] Médio", ui.font_section_title, 320, target=layer)
+        ui._draw_text_with_shadow("[3] Difícil", ui.font_section_title, 370, target=layer)
+        ui._draw_text_with_shadow("Pressione ESC para Voltar", ui.font_body, 440, main_color=COLOR_RED, target=layer)
+        return layer
+
+class CharacterSelectionScene(Scene):
+    asset_group = "characters"
+    # Área de cada caixa de jogador, relativa ao centro horizontal da caixa
+    BOX_HALF_WIDTH = 160
+    BOX_TOP = 140
+    BOX_HEIGHT = 360
+
+    def __init__(self, ui):
+        super().__init__(ui)
+        # (índice do personagem, jogador, selecionado, modo) -> superfície pronta
+        self.selection_boxes = {}
+
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_menu_layer()
+        ui._draw_text_with_shadow("Escolha os Jogadores", ui.font_main_title, 70, main_color=COLOR_YELLOW, target=layer)
+
+        panel_width, panel_height, panel_y = 320, 380, 125
+        for center in (0.25, 0.75):
+            panel_x = (ui.window.width * center) - (panel_width / 2)
+            self._blit_panel(layer, pygame.Rect(panel_x, panel_y, panel_width, panel_height), border_color=COLOR_YELLOW)
+
+        instr_panel_width, instr_panel_height = 350, 90
+        instr_panel = pygame.Rect((ui.window.width - instr_panel_width) / 2, 510, instr_panel_width, instr_panel_height)
+        layer.fill(COLOR_BLACK, instr_panel)
+        ui._draw_text_with_shadow("Pressione ESC para Voltar", ui.font_body, 575, main_color=COLOR_RED, target=layer)
+        return layer
+
+    def draw(self, game_data):
+        super().draw(game_data)
+        ui = self.ui
+        p1_index = game_data.get("p1_char_index", 0)
+        p2_index = game_data.get("p2_char_index", 1)
+        selecting_for = game_data.get("selecting_for", 1)
+        game_mode = game_data.get("game_mode")
+        is_p1_selecting = (selecting_for == 1 or game_mode == GameMode.PVP)
+        is_p2_selecting = (selecting_for == 2 or game_mode == GameMode.PVP)
+
+        for char_index, player_num, is_selected in ((p1_index, 1, is_p1_selecting), (p2_index, 2, is_p2_selecting)):
+            box = self._get_selection_box(char_index, player_num, is_selected, game_mode)
+            box_x_center = ui.window.width * (0.25 if player_num == 1 else 0.75)
+            ui.window.screen.blit(box, (box_x_center - self.BOX_HALF_WIDTH, self.BOX_TOP))
+
+        y_pos_nav, y_pos_action = 525, 550
+        if game_mode == GameMode.PVP:
+            ui._draw_text_with_shadow("A/D e Setas para Mudar", ui.font_body, y_pos_nav)
+            ui._draw_text_with_shadow("Pressione ENTER para Iniciar!", ui.font_body, y_pos_action)
+        else: # PVE
+            if selecting_for > 2:
+                ui._draw_text_with_shadow("Pressione ENTER para escolher a Dificuldade", ui.font_body, y_pos_action)
+            else:
+                ui._draw_text_with_shadow("Setas para Mudar", ui.font_body, y_pos_nav)
+                ui._draw_text_with_shadow("Pressione ENTER para Confirmar", ui.font_body, y_pos_action)
+
+    def _get_selection_box(self, char_index, player_num, is_selected, game_mode):
+        key = (char_index, player_num, is_selected, game_mode)
+        box = self.selection_boxes.get(key)
+        if box is None:
+            box = self._build_selection_box(char_index, player_num, is_selected, game_mode)
+            self.selection_boxes[key] = box
+        return box
+
+    def _build_selection_box(self, char_index, player_num, is_selected, game_mode):
+        ui = self.ui
+        box = ui.surface_pool.acquire((self.BOX_HALF_WIDTH * 2, self.BOX_HEIGHT), pygame.SRCALPHA)
+        char_data = CHARACTERS[char_index]
+        char_img = ui.character_images[char_index]
+        flag_img = ui.flag_images.get(char_data["flag_path"])
+        # Coordenadas da tela original, deslocadas para dentro da caixa
+        x_center = self.BOX_HALF_WIDTH
+        top = self.BOX_TOP
+
+        line_half_width = 150
+        pygame.draw.line(box, COLOR_YELLOW, (x_center - line_half_width, 185 - top), (x_center + line_half_width, 185 - top), 2)
+        pygame.draw.line(box, COLOR_YELLOW, (x_center - line_half_width, 340 - top), (x_center + line_half_width, 340 - top), 2)
+
+        title = f"Jogador {player_num}" if player_num == 1 or game_mode == GameMode.PVP else "Oponente (IA)"
+        ui._draw_text_with_shadow(title, ui.font_body, 160 - top, x_center=x_center, target=box)
+        box.blit(char_img.image, (x_center - char_img.width / 2, 205 - top))
+        ui._draw_text_with_shadow(char_data["name"], ui.font_section_title, 310 - top, x_center=x_center, target=box)
+        if flag_img:
+            box.blit(flag_img.image, (x_center - flag_img.width / 2, 355 - top))
+        ui._draw_text_with_shadow(char_data["team_name"], ui.font_body, 430 - top, x_center=x_center, target=box)
+        if is_selected:
+            ui._draw_text_with_shadow("<   >", ui.font_section_title, 470 - top, x_center=x_center, main_color=COLOR_YELLOW, target=box)
+        return box
+
+# --------------------------------------------------------------------------------------
+# Partida e sobreposições
+# --------------------------------------------------------------------------------------
+class PlayScene(Scene):
+    """Campo, entidades e placar; as sobreposições desenham por cima disso."""
+    uses_dirty_rects = True
+    asset_group = "match"
+
+    def draw(self, game_data):
+        self.ui._draw_play_background(game_data)
+        self.ui._draw_game_elements(game_data)
+        self.ui._draw_game_ui(game_data)
+        if self.static_layer: self.ui.window.screen.blit(self.static_layer, (0, 0))
+
+class PauseScene(PlayScene):
+    uses_dirty_rects = False
+
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_layer(alpha=True)
+        layer.fill((0, 0, 0, 180))
+        ui._draw_text_with_shadow("JOGO PAUSADO", ui.font_main_title, 200, main_color=COLOR_YELLOW, target=layer)
+        ui._draw_text_with_shadow("[P] para Continuar", ui.font_section_title, 300, target=layer)
+        ui._draw_text_with_shadow("[R] para Reiniciar", ui.font_section_title, 350, target=layer)
+        ui._draw_text_with_shadow("[ESC] para Voltar ao Menu", ui.font_section_title, 400, main_color=COLOR_RED, target=layer)
+        return layer
+
+class GoalScene(PlayScene):
+    uses_dirty_rects = False
+
+    def enter(self, game_data):
+        super().enter(game_data)
+        # A animação sempre começa do primeiro quadro
+        self.ui.goal_animation_timer = 0
+
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_layer(alpha=True)
+        layer.fill((0, 0, 0, 180))
+        if not ui.goal_animation_frames:
+            ui._draw_text_with_shadow("GOL!", ui.font_main_title, ui.window.height / 2 - 60, main_color=COLOR_YELLOW, target=layer)
+        return layer
+
+    def draw(self, game_data):
+        super().draw(game_data)
+        ui = self.ui
+        if ui.goal_animation_frames:
+            ui.goal_animation_timer += game_data.get("delta_time", 0) * GOAL_ANIM_SPEED
+            ui.current_goal_frame = int(ui.goal_animation_timer) % len(ui.goal_animation_frames)
+            frame_image = ui.goal_animation_frames[ui.current_goal_frame]
+            frame_rect = frame_image.get_rect(center=(ui.window.width / 2, ui.window.height / 2))
+            ui.window.screen.blit(frame_image, frame_rect)
+
+class GameOverScene(PlayScene):
+    uses_dirty_rects = False
+    FLAG_HEIGHT = GAME_OVER_FLAG_HEIGHT
+
+    def enter(self, game_data):
+        # O resultado não muda enquanto a tela está aberta: a camada é refeita a cada
+        # partida, reaproveitando a superfície da anterior
+        if self.static_layer is not None: self.ui.surface_pool.release(self.static_layer)
+        self.static_layer = self.build_static_layer(game_data)
+
+    def build_static_layer(self, game_data):
+        ui = self.ui
+        layer = self._new_layer(alpha=True)
+        layer.fill((0, 0, 0, 200))
+
+        scores = game_data.get("scores", {"left": 0, "right": 0})
+        p1_data = CHARACTERS[game_data.get("p1_char_index", 0)]
+        p2_data = CHARACTERS[game_data.get("p2_char_index", 1)]
+        winner_name = p1_data["team_name"] if scores['left'] > scores['right'] else p2_data["team_name"]
+        match_time = game_data.get("match_time", 0)
+
+        y_pos = 120
+        ui._draw_text_with_shadow("FIM DE JOGO", ui.font_main_title, y_pos, target=layer)
+        y_pos += 80
+        ui._draw_text_with_shadow(f"{winner_name} VENCEU!", ui.font_section_title, y_pos, main_color=COLOR_YELLOW, target=layer)
+        y_pos += 120
+
+        center_x = ui.window.width / 2
+        score_offset = 60
+        flag_offset = 120
+        for flag_data, x_center in ((p1_data, center_x - flag_offset), (p2_data, center_x + flag_offset)):
+            flag_surface = ui._get_scaled_flag(flag_data["flag_path"], self.FLAG_HEIGHT)
+            if flag_surface:
+                layer.blit(flag_surface, flag_surface.get_rect(center=(x_center, y_pos)))
+
+        for text, x_center in ((str(scores['left']), center_x - score_offset), ("X", center_x),
+                               (str(scores['right']), center_x + score_offset)):
+            surface = ui._render_text(text, ui.font_main_title, COLOR_WHITE)
+            layer.blit(surface, surface.get_rect(center=(x_center, y_pos)))
+
+        y_pos += 80
+        minutes, seconds = divmod(int(match_time), 60)
+        ui._draw_text_with_shadow(f"Tempo de Partida: {minutes:02d}:{seconds:02d}", ui.font_section_title, y_pos, target=layer)
+        y_pos += 80
+        ui._draw_text_with_shadow("Pressione ENTER para Jogar Novamente", ui.font_body, y_pos, target=layer)
+        ui._draw_text_with_shadow("Pressione ESC para o Menu Principal", ui.font_body, y_pos + 40, main_color=COLOR_RED, target=layer)
+        return layer
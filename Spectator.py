@@ -0,0 +1,438 @@
+# spectator.py
+import asyncio
+import random
+import struct
+import threading
+import time
+from PPlay.window import *
+from Constants import *
+from Entities import Ball, Paddle, PowerUp
+from Asset_loader import BackgroundLoader
+from Ui_manager import UIManager
+from Scenes import WaitingScene
+
+# ======================================================================================
+# --- STATE FRAMES ---
+# ======================================================================================
+# O que uma tela de espectador precisa para desenhar a partida, em inteiros (quantizados):
+# posições em 1/SPECTATOR_POSITION_SCALE de pixel, velocidades em pixels/s e o relógio em
+# centésimos de segundo. powerup é 0 (nenhum em campo) ou 1 + o índice em Game.powerup_types.
+FIELDS = ("state", "p1_char_index", "p2_char_index", "score_left", "score_right", "match_time",
+          "ball_x", "ball_y", "ball_velocity_x", "ball_velocity_y", "player1_y", "player2_y",
+          "powerup", "powerup_x", "powerup_y")
+
+def quantize(game):
+    """Quadro da partida atual: uma tupla de inteiros na ordem de FIELDS."""
+    scale = SPECTATOR_POSITION_SCALE
+    ball = game.ball
+    powerup = game.active_powerup
+    shown = powerup is not None and powerup.is_active
+    return (game.state.value, game.p1_char_index, game.p2_char_index, game.scores["left"], game.scores["right"],
+            round(game.match_time * 100), round(ball.x * scale), round(ball.y * scale),
+            round(ball.velocity_x), round(ball.velocity_y),
+            round(game.player1.y * scale), round(game.player2.y * scale),
+            game.powerup_types.index(powerup) + 1 if shown else 0,
+            round(powerup.x * scale) if shown else 0, round(powerup.y * scale) if shown else 0)
+
+# ======================================================================================
+# --- PACKETS ---
+# ======================================================================================
+# Pacotes UDP (little-endian); o primeiro byte diz o tipo:
+#   JOIN   espectador -> servidor, repetido até chegar o primeiro quadro
+#   FRAME  servidor -> espectador: número do quadro e o quadro base. Com base 0 é um quadro
+#          completo (cada campo em varint); senão, uma máscara dos campos que mudaram desde
+#          o quadro base e a diferença de cada um (varint com sinal). O servidor usa como
+#          base o último quadro que o espectador confirmou, então um pacote perdido não
+#          estraga os seguintes; a cada SPECTATOR_KEYFRAME_INTERVAL vão quadros completos
+#   ACK    espectador -> servidor: o último quadro recebido (e sinal de que continua ali)
+#   BYE    saída (do servidor: fim da transmissão)
+SPECTATOR_VERSION = 1
+JOIN, FRAME, ACK, BYE = 1, 2, 3, 4
+JOIN_PACKET = struct.Struct("<BB")
+FRAME_PACKET = struct.Struct("<BII")
+MASK = struct.Struct("<H")
+ACK_PACKET = struct.Struct("<BI")
+BYE_PACKET = struct.Struct("<B")
+JOIN_INTERVAL = 0.5  # Segundos entre dois JOIN enquanto não chega nenhum quadro
+
+def _put_varint(packet, value):
+    # Zigzag: números pequenos, positivos ou negativos, ocupam um byte
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        packet.append(value & 0x7F | 0x80)
+        value >>= 7
+    packet.append(value)
+
+def _get_varint(data, position):
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80: break
+    return (-(value >> 1) - 1 if value & 1 else value >> 1), position
+
+def encode_frame(sequence, values, baseline=0, base=None):
+    """Pacote FRAME: o quadro completo (baseline 0) ou só o que mudou desde base, o quadro baseline."""
+    packet = bytearray(FRAME_PACKET.pack(FRAME, sequence, baseline))
+    if not baseline:
+        for value in values: _put_varint(packet, value)
+        return bytes(packet)
+    mask_position = len(packet)
+    packet += bytes(MASK.size)
+    mask = 0
+    for index, (value, old) in enumerate(zip(values, base)):
+        if value != old:
+            mask |= 1 << index
+            _put_varint(packet, value - old)
+    MASK.pack_into(packet, mask_position, mask)
+    return bytes(packet)
+
+def decode_frame(data, frames):
+    """(número, quadro) de um pacote FRAME; None se o quadro base dele não está em frames."""
+    _, sequence, baseline = FRAME_PACKET.unpack_from(data)
+    position = FRAME_PACKET.size
+    if not baseline:
+        values = []
+        for _ in FIELDS:
+            value, position = _get_varint(data, position)
+            values.append(value)
+        return sequence, tuple(values)
+    base = frames.get(baseline)
+    if base is None: return None
+    mask, = MASK.unpack_from(data, position)
+    position += MASK.size
+    values = list(base)
+    for index in range(len(FIELDS)):
+        if mask >> index & 1:
+            delta, position = _get_varint(data, position)
+            values[index] += delta
+    return sequence, tuple(values)
+
+# ======================================================================================
+# --- SERVER ---
+# ======================================================================================
+class FrameStream:
+    """
+    Os quadros de uma partida transmitida: a cada tick diz se é hora de um quadro (rate por
+    segundo, ou quando o GameState muda), guarda os últimos SPECTATOR_HISTORY como bases e
+    monta o pacote de cada destinatário contra o quadro que ele confirmou. Destinatários em
+    dia confirmaram o mesmo quadro, então cada base é codificada uma vez só por quadro.
+    phase adianta o primeiro quadro, para várias partidas não enviarem todas no mesmo tick.
+    """
+    def __init__(self, rate=SPECTATOR_RATE, phase=0):
+        self.ticks_per_frame = max(1, round(SIM_TICK_RATE / rate))
+        self.keyframe_interval = max(1, round(SPECTATOR_KEYFRAME_INTERVAL * rate))
+        self.ticks = phase % self.ticks_per_frame
+        self.last_state = None
+        self.sequence = 0
+        self.frames = {}  # número -> quadro, os últimos SPECTATOR_HISTORY
+        self.packets = {}  # quadro base -> pacote do último quadro
+        self.keyframes = self.deltas = 0
+        self.keyframe_bytes = self.delta_bytes = 0
+
+    def due(self, state):
+        """Chamado a cada tick: se o quadro deste tick deve ser enviado."""
+        self.ticks += 1
+        if self.ticks < self.ticks_per_frame and state == self.last_state: return False
+        self.ticks = 0
+        self.last_state = state
+        return True
+
+    def push(self, values):
+        self.sequence += 1
+        self.frames[self.sequence] = values
+        self.frames.pop(self.sequence - SPECTATOR_HISTORY, None)
+        self.packets.clear()
+
+    def packet(self, acked):
+        """Pacote do último quadro para quem confirmou o quadro acked (0 = nenhum ainda)."""
+        baseline = 0 if self.sequence % self.keyframe_interval == 0 or acked not in self.frames else acked
+        packet = self.packets.get(baseline)
+        if packet is None:
+            packet = self.packets[baseline] = encode_frame(self.sequence, self.frames[self.sequence], baseline,
+                                                           self.frames.get(baseline))
+        if baseline:
+            self.deltas += 1
+            self.delta_bytes += len(packet)
+        else:
+            self.keyframes += 1
+            self.keyframe_bytes += len(packet)
+        return packet
+
+    def acknowledge(self, acked, sequence):
+        """O quadro confirmado depois de uma confirmação de sequence (as velhas e as desconhecidas não contam)."""
+        return sequence if sequence > acked and sequence in self.frames else acked
+
+    def stats(self):
+        """Quadros enviados e o tamanho médio deles em bytes."""
+        return {"frames": self.sequence, "keyframes": self.keyframes, "deltas": self.deltas,
+                "keyframe_bytes": round(self.keyframe_bytes / self.keyframes, 1) if self.keyframes else None,
+                "delta_bytes": round(self.delta_bytes / self.deltas, 1) if self.deltas else None}
+
+class SpectatorServer:
+    """
+    Transmite a partida para as telas dos espectadores. O laço do jogo é síncrono, então o
+    servidor roda o seu loop asyncio numa thread própria: o jogo chama publish depois de
+    cada tick e, quando é hora de um quadro (ver FrameStream), o quadro quantizado passa
+    para o loop, que monta o pacote de cada espectador e envia.
+    """
+    def __init__(self, port=SPECTATOR_PORT, rate=SPECTATOR_RATE, bind_host="0.0.0.0"):
+        self.rate = rate
+        self.stream = FrameStream(rate)
+        self.clients = {}  # endereço -> [último quadro confirmado, quando chegou o último pacote]
+        self.broadcasts = 0
+        self.broadcast_ns = 0
+
+        self.loop = asyncio.new_event_loop()
+        # A porta é aberta aqui, para um erro (porta em uso) aparecer para quem criou o servidor
+        self.transport, _ = self.loop.run_until_complete(self.loop.create_datagram_endpoint(
+            lambda: _ServerProtocol(self), local_addr=(bind_host, port)))
+        self.port = self.transport.get_extra_info("sockname")[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, name="spectators", daemon=True)
+        self.thread.start()
+
+    def publish(self, game):
+        """Chamado pelo jogo depois de cada tick (na thread do jogo)."""
+        if game.ball is None or self.loop is None: return
+        if self.stream.due(game.state): self.loop.call_soon_threadsafe(self._broadcast, quantize(game))
+
+    def _broadcast(self, values):
+        start = time.perf_counter_ns()
+        self.stream.push(values)
+        now = time.perf_counter()
+        for address, (acked, last_seen) in list(self.clients.items()):
+            if now - last_seen > SPECTATOR_TIMEOUT:
+                del self.clients[address]
+                continue
+            self.transport.sendto(self.stream.packet(acked), address)
+        self.broadcasts += 1
+        self.broadcast_ns += time.perf_counter_ns() - start
+
+    def _receive(self, data, address):
+        if not data: return
+        now = time.perf_counter()
+        if data[0] == JOIN and len(data) == JOIN_PACKET.size:
+            # Um JOIN repetido (ou de um espectador que reabriu) recomeça com um quadro completo
+            if JOIN_PACKET.unpack(data)[1] == SPECTATOR_VERSION: self.clients[address] = [0, now]
+        elif data[0] == ACK and len(data) == ACK_PACKET.size and address in self.clients:
+            client = self.clients[address]
+            client[0] = self.stream.acknowledge(client[0], ACK_PACKET.unpack(data)[1])
+            client[1] = now
+        elif data[0] == BYE:
+            self.clients.pop(address, None)
+
+    def close(self):
+        """Avisa os espectadores (BYE) e para o loop; os quadros já publicados saem antes."""
+        if self.loop is None: return
+        self.loop.call_soon_threadsafe(self._shutdown)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+
+    def _shutdown(self):
+        for address in self.clients: self.transport.sendto(BYE_PACKET.pack(BYE), address)
+        self.transport.close()
+        # O socket só fecha num callback agendado pelo close: o loop para depois dele (senão a porta fica presa)
+        self.loop.call_soon(self.loop.stop)
+
+    def stats(self):
+        """Espectadores conectados, quadros enviados (ver FrameStream.stats) e o custo de cada envio."""
+        return {"clients": len(self.clients), **self.stream.stats(),
+                "broadcast_us": round(self.broadcast_ns / self.broadcasts / 1000, 1) if self.broadcasts else None}
+
+class _ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server._receive(data, address)
+
+    def error_received(self, error):
+        pass  # (Windows) aviso de porta fechada: o espectador some sozinho pelo SPECTATOR_TIMEOUT
+
+# ======================================================================================
+# --- SPECTATOR CLIENT ---
+# ======================================================================================
+class SpectatorClient(asyncio.DatagramProtocol):
+    """
+    Recebe a transmissão: pede para entrar (JOIN), decodifica cada quadro contra o quadro
+    base dele e confirma (ACK) o último. Se o servidor some (BYE, ou SPECTATOR_TIMEOUT sem
+    quadros), volta a pedir para entrar: a tela fica esperando a próxima transmissão.
+    """
+    def __init__(self):
+        self.transport = None
+        self.frames = {}  # número -> quadro, os últimos SPECTATOR_HISTORY recebidos
+        self.sequence = 0
+        self.frame = None  # Último quadro, como dicionário campo -> valor
+        self.previous = None  # O quadro antes dele (a renderização interpola entre os dois)
+        self.received_at = 0
+        self.frame_interval = 1 / SPECTATOR_RATE  # Média do tempo entre dois quadros seguidos
+        self.join_sent = 0
+        self.received = 0
+        self.undecodable = 0
+        self.bytes_received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        if not data: return
+        if data[0] == BYE:
+            self._reset()
+            return
+        if data[0] != FRAME or len(data) < FRAME_PACKET.size: return
+        self.bytes_received += len(data)
+        decoded = decode_frame(data, self.frames)
+        if decoded is None:
+            self.undecodable += 1
+            return
+        sequence, values = decoded
+        if sequence <= self.sequence: return  # Chegou fora de ordem: já há um mais novo
+        self.frames[sequence] = values
+        if len(self.frames) > SPECTATOR_HISTORY: del self.frames[next(iter(self.frames))]
+        now = time.perf_counter()
+        # Só dois quadros seguidos medem o intervalo (no primeiro não há o tempo do anterior)
+        if self.received_at and sequence == self.sequence + 1:
+            self.frame_interval += (now - self.received_at - self.frame_interval) * 0.1
+        self.sequence = sequence
+        self.previous, self.frame = self.frame, dict(zip(FIELDS, values))
+        self.received_at = now
+        self.received += 1
+        self.acknowledge(sequence)
+
+    def acknowledge(self, sequence):
+        self.transport.sendto(ACK_PACKET.pack(ACK, sequence))
+
+    def error_received(self, error):
+        pass  # Servidor ainda fechado: os JOIN continuam
+
+    def maintain(self, now):
+        """Chamado pelo laço do espectador a cada frame: entra (de novo) na transmissão quando preciso."""
+        if self.frame is not None and now - self.received_at > SPECTATOR_TIMEOUT: self._reset()
+        if self.frame is None and now - self.join_sent >= JOIN_INTERVAL:
+            self.transport.sendto(JOIN_PACKET.pack(JOIN, SPECTATOR_VERSION))
+            self.join_sent = now
+
+    def _reset(self):
+        self.frames.clear()
+        self.sequence = 0
+        self.received_at = 0
+        self.frame = self.previous = None
+
+    def leave(self):
+        if self.transport and not self.transport.is_closing(): self.transport.sendto(BYE_PACKET.pack(BYE))
+
+# ======================================================================================
+# --- REFERENCE SPECTATOR SCREEN ---
+# ======================================================================================
+WAITING = "waiting"  # Cena (no UIManager) de quando não há partida para mostrar
+MATCH_STATES = {state.value for state in (GameState.PLAYING, GameState.PAUSED, GameState.GOAL, GameState.GAME_OVER)}
+
+class SpectatorView:
+    """Desenha os quadros recebidos com o UIManager do jogo, como na tela de quem joga."""
+    def __init__(self, window, ui_manager):
+        self.window = window
+        self.ui_manager = ui_manager
+        ui_manager.scenes[WAITING] = WaitingScene(ui_manager)
+        self.sequence = 0
+        self.characters = None
+        self.player1 = self.player2 = None
+        self.ball = Ball(BALL_IMAGE)
+        self.powerup_types = [PowerUp(BOOST_IMAGE, 'SPEED_BOOST'), PowerUp(SLOW_BALL_IMAGE, 'SLOW_BALL')]
+        self.active_powerup = None
+        self.screen_shake_timer = 0
+        self.effects_rng = random.Random()
+
+    def _apply(self, frame, previous):
+        """Passa o quadro para as entidades; o anterior fica como posição de partida da interpolação."""
+        characters = (frame["p1_char_index"], frame["p2_char_index"])
+        new_characters = characters != self.characters
+        if new_characters:
+            self.characters = characters
+            self.player1 = Paddle(CHARACTERS[characters[0]]["image_path"], "left", self.window)
+            self.player2 = Paddle(CHARACTERS[characters[1]]["image_path"], "right", self.window)
+        scale = SPECTATOR_POSITION_SCALE
+        entities = (self.ball, self.player1, self.player2)
+        for entity in entities: entity.store_previous_position()
+        self.ball.x, self.ball.y = frame["ball_x"] / scale, frame["ball_y"] / scale
+        self.ball.velocity_x, self.ball.velocity_y = frame["ball_velocity_x"], frame["ball_velocity_y"]
+        for paddle, y in ((self.player1, frame["player1_y"] / scale), (self.player2, frame["player2_y"] / scale)):
+            # A inclinação do jogador vem do sentido em que ele andou
+            paddle.is_moving_up, paddle.is_moving_down = y < paddle.y, y > paddle.y
+            paddle.y = y
+
+        playing = GameState.PLAYING.value
+        if previous is None or previous["state"] != frame["state"] or new_characters:
+            # Saque, fim do gol ou outra partida: as entidades vão direto para o lugar
+            for entity in entities: entity.store_previous_position()
+        elif frame["state"] == playing and (frame["ball_velocity_x"] > 0) != (previous["ball_velocity_x"] > 0):
+            # A bola trocou de sentido em x: bateu num jogador
+            (self.player1 if frame["ball_velocity_x"] > 0 else self.player2).trigger_squash()
+        if previous is not None and (frame["score_left"], frame["score_right"]) != (previous["score_left"], previous["score_right"]):
+            self.screen_shake_timer = 0.3
+
+        self.active_powerup = self.powerup_types[frame["powerup"] - 1] if frame["powerup"] else None
+        if self.active_powerup:
+            self.active_powerup.x, self.active_powerup.y = frame["powerup_x"] / scale, frame["powerup_y"] / scale
+            self.active_powerup.is_active = True
+
+    def draw(self, client, delta_time):
+        frame = client.frame
+        if frame is None or frame["state"] not in MATCH_STATES:
+            # Sem transmissão, ou o jogo está nos menus
+            self.sequence = 0
+            self.ui_manager.draw(WAITING, {})
+            self.window.update()
+            return
+        if client.sequence != self.sequence:
+            self._apply(frame, client.previous)
+            self.sequence = client.sequence
+
+        for paddle in (self.player1, self.player2): paddle.update_effects(delta_time)
+        if self.screen_shake_timer > 0: self.screen_shake_timer -= delta_time
+        # A tela anda do quadro anterior ao atual no tempo que um quadro leva para chegar
+        interpolation = min(1.0, (time.perf_counter() - client.received_at) / client.frame_interval)
+        game_data = {
+            "scores": {"left": frame["score_left"], "right": frame["score_right"]},
+            "match_time": frame["match_time"] / 100, "player1": self.player1, "player2": self.player2,
+            "ball": self.ball, "active_powerup": self.active_powerup,
+            "screen_shake_timer": self.screen_shake_timer, "screen_shake_intensity": 8,
+            "p1_char_index": self.characters[0], "p2_char_index": self.characters[1],
+            "delta_time": delta_time, "interpolation": interpolation, "effects_rng": self.effects_rng
+        }
+        self.ui_manager.draw(GameState(frame["state"]), game_data)
+        self.window.update()
+
+def open_view(title):
+    """Janela e UIManager (com os assets já carregados) de uma tela que desenha quadros recebidos."""
+    window = Window(WINDOW_WIDTH, WINDOW_HEIGHT)
+    window.set_title(title)
+    window.set_dirty_rect_mode(DIRTY_RECT_RENDERING)
+    assets = BackgroundLoader()
+    ui_manager = UIManager(window, assets)
+    assets.wait()
+    return SpectatorView(window, ui_manager)
+
+async def watch(host, port=SPECTATOR_PORT, max_seconds=None):
+    """Tela de espectador: abre a janela e desenha a transmissão de host até o ESC (ou max_seconds)."""
+    view = open_view(f"{WINDOW_TITLE} - Espectador")
+    keyboard = Window.get_keyboard()
+
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(SpectatorClient, remote_addr=(host, port))
+    start = previous_time = time.perf_counter()
+    try:
+        while not keyboard.just_pressed("escape"):
+            now = time.perf_counter()
+            if max_seconds is not None and now - start > max_seconds: break
+            client.maintain(now)
+            view.draw(client, min(now - previous_time, MAX_FRAME_TIME))
+            previous_time = now
+            # Os pacotes são recebidos pelo loop enquanto o frame espera
+            await asyncio.sleep(max(0, 1 / FPS_LIMIT - (time.perf_counter() - now)))
+    finally:
+        client.leave()
+        transport.close()
+    return client
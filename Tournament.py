@@ -0,0 +1,121 @@
+# tournament.py
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Constants import *
+
+# ======================================================================================
+# --- TOURNAMENT (HEADLESS AI vs AI) ---
+# ======================================================================================
+# Cada processo do pool mantém um único Game headless, criado no initializer,
+# e o reaproveita para todas as partidas que receber.
+_worker_game = None
+
+def _init_worker():
+    global _worker_game
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from Game import Game
+    _worker_game = Game(headless=True)
+
+def play_match(job):
+    """Roda uma partida headless e devolve o resultado como um dicionário serializável."""
+    game = _worker_game
+    game.start_headless_match(job["p1"], job["p2"], job["p1_difficulty"], job["p2_difficulty"],
+                              p1_policy=job["p1_policy"], p2_policy=job["p2_policy"], seed=job["seed"])
+    ticks, elapsed = game.run_headless(max_ticks=job["max_ticks"])
+
+    scores = game.scores
+    finished = game.state == GameState.GAME_OVER
+    winner = None
+    if finished: winner = "left" if scores["left"] > scores["right"] else "right"
+    return {
+        "type": "match", **job,
+        "p1_name": CHARACTERS[job["p1"]]["name"], "p2_name": CHARACTERS[job["p2"]]["name"],
+        "finished": finished, "winner": winner,
+        "score_left": scores["left"], "score_right": scores["right"],
+        "match_time": round(game.match_time, 4), "ticks": ticks, "wall_time": round(elapsed, 4),
+        "p1_ai": game.player1.policy.stats(), "p2_ai": game.player2.policy.stats(),
+        "goals": [{"time": round(t, 4), "side": side, "duration": round(duration, 4), "rally": hits}
+                  for t, side, duration, hits in game.goal_log],
+    }
+
+def build_jobs(matches_per_matchup, seed, max_ticks, policies=("chase", "chase")):
+    """Todas as combinações de personagens x dificuldades, com uma seed por partida (policies: IA da esquerda e da direita)."""
+    difficulties = list(DIFFICULTY_SETTINGS)
+    matchups = itertools.product(range(len(CHARACTERS)), range(len(CHARACTERS)), difficulties, difficulties)
+    jobs = []
+    for p1, p2, p1_difficulty, p2_difficulty in matchups:
+        for _ in range(matches_per_matchup):
+            jobs.append({"p1": p1, "p2": p2, "p1_difficulty": p1_difficulty, "p2_difficulty": p2_difficulty,
+                         "p1_policy": policies[0], "p2_policy": policies[1],
+                         "seed": seed * 1_000_003 + len(jobs), "max_ticks": max_ticks})
+    return jobs
+
+class MatchupStats:
+    """Acumula os resultados de um confronto (personagens + dificuldades)."""
+    def __init__(self, key):
+        self.key = key
+        self.matches = self.unfinished = self.left_wins = self.right_wins = 0
+        self.goal_durations = []
+        self.rallies = []
+        self.match_times = []
+
+    def add(self, result):
+        self.matches += 1
+        if not result["finished"]: self.unfinished += 1
+        elif result["winner"] == "left": self.left_wins += 1
+        else: self.right_wins += 1
+        self.match_times.append(result["match_time"])
+        for goal in result["goals"]:
+            self.goal_durations.append(goal["duration"])
+            self.rallies.append(goal["rally"])
+
+    def to_record(self):
+        p1, p2, p1_difficulty, p2_difficulty = self.key
+        finished = self.matches - self.unfinished
+        mean = lambda values: round(sum(values) / len(values), 4) if values else None
+        return {
+            "type": "matchup", "p1": p1, "p2": p2, "p1_difficulty": p1_difficulty, "p2_difficulty": p2_difficulty,
+            "p1_name": CHARACTERS[p1]["name"], "p2_name": CHARACTERS[p2]["name"],
+            "matches": self.matches, "unfinished": self.unfinished,
+            "p1_win_rate": round(self.left_wins / finished, 4) if finished else None,
+            "p2_win_rate": round(self.right_wins / finished, 4) if finished else None,
+            "mean_goal_time": mean(self.goal_durations), "mean_rally": mean(self.rallies),
+            "max_rally": max(self.rallies) if self.rallies else None,
+            "mean_match_time": mean(self.match_times),
+        }
+
+def run_tournament(matches_per_matchup=4, seed=0, max_ticks=SIM_TICK_RATE * 600, workers=None, output=sys.stdout,
+                   policies=("chase", "chase")):
+    """
+    Distribui as partidas em um pool de processos e escreve NDJSON em `output`:
+    uma linha "match" por partida, na ordem em que terminam, depois uma linha
+    "matchup" por confronto e uma linha "summary" no final.
+    """
+    jobs = build_jobs(matches_per_matchup, seed, max_ticks, policies)
+    stats = {}
+    total_ticks = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(play_match, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            total_ticks += result["ticks"]
+            key = (result["p1"], result["p2"], result["p1_difficulty"], result["p2_difficulty"])
+            stats.setdefault(key, MatchupStats(key)).add(result)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    for key in sorted(stats):
+        output.write(json.dumps(stats[key].to_record()) + "\n")
+    elapsed = time.perf_counter() - start
+    output.write(json.dumps({
+        "type": "summary", "matches": len(jobs), "matchups": len(stats), "workers": workers or os.cpu_count(),
+        "ticks": total_ticks, "wall_time": round(elapsed, 3),
+        "ticks_per_second": round(total_ticks / elapsed) if elapsed > 0 else None,
+    }) + "\n")
+    output.flush()